@@ -0,0 +1,46 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad
+from simba.basic_components import TFunction, Gain, Add
+from simba.core import System
+from simba.core.function_factories.compilation_cache import clear_compiled_functions, compiled_function_count
+
+import time
+
+amplitude = nb.float64([1.0])
+
+
+def torque(t_):
+    return amplitude * np.cos(t_)
+
+
+def create_system(n_blocks):
+    # The torque passes a chain of many small blocks. Each pair of blocks computes 0.5 * (x + x) = x.
+    driving_torque = TFunction(torque)
+    load = RotationalMechanicalLoad()
+    components = [driving_torque, load]
+    signal = driving_torque.outputs['Out']
+    for k in range(n_blocks):
+        gain = Gain(0.5, name=f'gain_{k}')
+        add = Add(name=f'add_{k}')
+        gain(signal)
+        add(gain.outputs['Out0'], gain.outputs['Out0'])
+        signal = add.outputs['Out']
+        components += [gain, add]
+    load.inputs['T'].connect(signal)
+    return System(components)
+
+
+# Without deduplication, every block would compile its own equations, so that the compile time would grow with the
+# number of blocks. With deduplication, all blocks of a type share one compiled equation. Only the generated system
+# equation grows with the system. The first compilation includes the initialization of numba. A second system
+# with the same structure reuses all functions including the system equation.
+print(f'{"blocks":>6} {"reuse":>6} {"compile / s":>12} {"compiled functions":>19}')
+for n_blocks, reuse in ((5, False), (40, False), (40, True)):
+    if not reuse:
+        clear_compiled_functions()
+    system = create_system(n_blocks)
+    begin = time.time()
+    system.compile(numba_compile=True)
+    print(f'{n_blocks:>6} {str(reuse):>6} {time.time() - begin:12.2f} {compiled_function_count():>19}')
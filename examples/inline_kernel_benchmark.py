@@ -0,0 +1,83 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PIController
+from simba.basic_components import Sub, TFunction, Gain, Add
+from simba.core import System
+
+import time
+
+amplitude = nb.float64([100.0])
+n_blocks = 20
+n_calls = 100_000
+simulation_time = 10.0
+step_size = 1e-4
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+@nb.njit
+def call_system_equation(system_equation_inplace, x, dxdt, workspace, extras, n_calls):
+    for i in range(n_calls):
+        system_equation_inplace(i * 1e-6, x, dxdt, workspace, extras)
+
+
+def create_system():
+    reference_generation = TFunction(reference)
+    sub = Sub()
+    pi_controller = PIController(p_gain=1.0, i_gain=2.0)
+    motor = PermanentlyExcitedDCMotor()
+    load_torque = QuadraticLoadTorque()
+    load = RotationalMechanicalLoad()
+    components = [reference_generation, sub, pi_controller, motor, load_torque, load]
+
+    # The speed is measured through a chain of many small blocks. Each pair of blocks computes 0.5 * (x + x) = x.
+    measured_speed = load.outputs['omega']
+    for k in range(n_blocks):
+        gain = Gain(0.5, name=f'gain_{k}')
+        add = Add(name=f'add_{k}')
+        gain(measured_speed)
+        add(gain.outputs['Out0'], gain.outputs['Out0'])
+        measured_speed = add.outputs['Out']
+        components += [gain, add]
+
+    sub(in1=reference_generation.outputs['Out'], in2=measured_speed)
+    pi_controller(error=sub.outputs['Out'])
+    motor(u=pi_controller.outputs['action'], omega=load.outputs['omega'])
+    load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+    load_torque(omega=load.outputs['omega'])
+    return System(components), pi_controller
+
+
+print(f'{"mode":>8} {"compile / s":>12} {"call / ns":>10} {"simulation / s":>15}')
+results = []
+for inline in (False, True):
+    system, pi_controller = create_system()
+    begin = time.time()
+    system.compile(numba_compile=True, inline=inline)
+    compile_time = time.time() - begin
+
+    # One evaluation of the complete system equation
+    x = np.zeros(system.state_length)
+    dxdt = np.zeros(system.state_length)
+    workspace = system.create_workspace()
+    system_equation_inplace = system._compiled_system_equation_inplace
+    call_system_equation(system_equation_inplace, x, dxdt, workspace, system.extras, 1)
+    begin = time.time()
+    call_system_equation(system_equation_inplace, x, dxdt, workspace, system.extras, n_calls)
+    call_time = (time.time() - begin) / n_calls
+
+    # The first simulation includes the compilation of the simulation loop
+    system.simulate((0.0, step_size), np.zeros(system.state_length), step_size, method='rk4')
+    system.extras[pi_controller.extra_index][:] = 0.0
+    begin = time.time()
+    _, states = system.simulate((0.0, simulation_time), np.zeros(system.state_length), step_size, method='rk4')
+    simulation_time_ = time.time() - begin
+    results.append(states)
+    mode = 'inline' if inline else 'calls'
+    print(f'{mode:>8} {compile_time:>12.2f} {call_time * 1e9:>10.1f} {simulation_time_:>15.3f}')
+
+print(f'max deviation of the states: {np.max(np.abs(results[0] - results[1])):.3e}')
@@ -0,0 +1,64 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PController
+from simba.basic_components import Sub, Add, Gain, TFunction
+from simba.core import System
+
+import time
+
+amplitude = nb.float64([100.0])
+p_gain = 1.0
+# Part of the controller action, that couples into the speed measurement without delay
+crosstalk = 0.5
+simulation_time = 10.0
+step_size = 1e-4
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+def create_system(with_loop):
+    reference_generation = TFunction(reference)
+    sub = Sub()
+    motor = PermanentlyExcitedDCMotor()
+    load_torque = QuadraticLoadTorque()
+    load = RotationalMechanicalLoad()
+    components = [reference_generation, sub, motor, load_torque, load]
+    if with_loop:
+        # The measured speed depends on the controller action without a state in between:
+        # action = p_gain * (reference - omega - crosstalk * action)
+        p_controller = PController(p_gain=p_gain)
+        crosstalk_gain = Gain(crosstalk, name='crosstalk')
+        measurement = Add(name='measurement')
+        crosstalk_gain(p_controller.outputs['action'])
+        measurement(load.outputs['omega'], crosstalk_gain.outputs['Out0'])
+        sub(in1=reference_generation.outputs['Out'], in2=measurement.outputs['Out'])
+        components += [p_controller, crosstalk_gain, measurement]
+    else:
+        # The analytic solution of the loop: action = p_gain / (1 + p_gain * crosstalk) * (reference - omega)
+        p_controller = PController(p_gain=p_gain / (1.0 + p_gain * crosstalk))
+        sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+        components.append(p_controller)
+    p_controller(error=sub.outputs['Out'])
+    motor(u=p_controller.outputs['action'], omega=load.outputs['omega'])
+    load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+    load_torque(omega=load.outputs['omega'])
+    return System(components)
+
+
+results = []
+for with_loop in (False, True):
+    system = create_system(with_loop)
+    print(f'algebraic loops: {system.algebraic_loops}')
+    system.compile(numba_compile=True)
+    x0 = np.zeros(system.state_length)
+    system.simulate((0.0, step_size), x0, step_size, method='rk4')
+    begin = time.time()
+    _, states = system.simulate((0.0, simulation_time), x0, step_size, method='rk4')
+    print(f'simulation time: {time.time() - begin:.3f} s')
+    results.append(states)
+
+print(f'max deviation from the analytic solution of the loop: {np.max(np.abs(results[0] - results[1])):.3e}')
@@ -0,0 +1,43 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, DiscreteTimePIController
+from simba.basic_components import Sub, TFunction
+from simba.core import System
+
+amplitude = nb.float64([100.0])
+simulation_time = 10.0
+tau = 1e-3
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+reference_generation = TFunction(reference)
+sub = Sub()
+# The integrator of the controller is updated at the sample hits k * tau
+pi_controller = DiscreteTimePIController(p_gain=1.0, i_gain=2.0, tau=tau)
+motor = PermanentlyExcitedDCMotor()
+load_torque = QuadraticLoadTorque()
+load = RotationalMechanicalLoad()
+sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+pi_controller(error=sub.outputs['Out'])
+motor(u=pi_controller.outputs['action'], omega=load.outputs['omega'])
+load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+load_torque(omega=load.outputs['omega'])
+
+system = System((reference_generation, sub, pi_controller, motor, load_torque, load))
+system.compile(numba_compile=True)
+x0 = np.zeros(system.state_length)
+memory = system.extras[pi_controller.extra_index]
+
+# The fixed step method has to resolve the sample hits with its grid
+t, states = system.simulate((0.0, simulation_time), x0, 1e-5, method='rk4')
+print(f'rk4: {len(t)} steps, final state: {states[-1]}, integrated error: {memory[1]:.6f}')
+
+# The adaptive method stops exactly at the sample hits and steps freely in between
+memory[:] = 0.0
+t, states = system.simulate((0.0, simulation_time), x0, method='dopri5')
+print(f'dopri5: {len(t)} steps, final state: {states[-1]}, integrated error: {memory[1]:.6f}')
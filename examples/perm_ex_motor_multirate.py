@@ -0,0 +1,50 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PController
+from simba.basic_components import Sub, TFunction
+from simba.core import System
+
+import time
+
+amplitude = nb.float64([100.0])
+simulation_time = 5.0
+step_size = 1e-5
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+reference_generation = TFunction(reference)
+sub = Sub()
+p_controller = PController(p_gain=1.0)
+motor = PermanentlyExcitedDCMotor()
+load_torque = QuadraticLoadTorque()
+load = RotationalMechanicalLoad()
+sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+p_controller(error=sub.outputs['Out'])
+motor(u=p_controller.outputs['action'], omega=load.outputs['omega'])
+load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+load_torque(omega=load.outputs['omega'])
+
+system = System((reference_generation, sub, p_controller, motor, load_torque, load))
+system.compile(numba_compile=True)
+x0 = np.zeros(system.state_length)
+
+# The heuristic compares the time constants of the modes, that the states participate in. With the speed feedback of
+# the controller, the current and the speed form a single oscillating mode. So, both get the same step size.
+print('automatic rate groups:', system.find_rate_groups(0.0, x0, step_size))
+
+# The speed is integrated with a 100 times larger step size than the current
+rate_groups = {'PermExDCMotor.State': step_size, 'RotationalLoad.State': 100 * step_size}
+for name, simulate in (
+    ('single rate', lambda: system.simulate((0.0, simulation_time), x0, step_size, method='rk4')),
+    ('multirate', lambda: system.simulate_multirate((0.0, simulation_time), x0, rate_groups=rate_groups)),
+):
+    # The first call compiles the simulation
+    simulate()
+    begin = time.time()
+    t, states = simulate()
+    print(f'{name}: {time.time() - begin:.3f} s, {len(t)} points, state at t=1: {states[np.searchsorted(t, 1.0)]}')
@@ -0,0 +1,34 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad
+from simba.basic_components import TFunction
+from simba.core import System
+
+amplitude = nb.float64([100.0])
+simulation_time = 5.0
+
+
+def torque(t_):
+    return amplitude * np.cos(t_)
+
+
+# Two uncoupled loads in different rate groups read the same time-only output. Their speeds are
+# omega(t) = amplitude / j * sin(t), so that the multirate simulation is exact up to the error of rk4.
+driving_torque = TFunction(torque)
+fast = RotationalMechanicalLoad(name='fast')
+slow = RotationalMechanicalLoad(name='slow')
+fast.inputs['T'].connect(driving_torque.outputs['Out'])
+slow.inputs['T'].connect(driving_torque.outputs['Out'])
+
+system = System((driving_torque, fast, slow))
+system.compile(numba_compile=True)
+x0 = np.zeros(system.state_length)
+
+rate_groups = {'fast.State': 1e-5, 'slow.State': 1e-3}
+t, states = system.simulate_multirate((0.0, simulation_time), x0, rate_groups=rate_groups)
+_, single_rate_states = system.simulate((0.0, simulation_time), x0, 1e-3, method='rk4')
+exact = amplitude[0] / 0.05 * np.sin(t[-1])
+print(f'error of the slow load, multirate: {states[-1, 1] - exact:.3e}, single rate: '
+      f'{single_rate_states[-1, 1] - exact:.3e}')
+print(f'error of the fast load, multirate: {states[-1, 0] - exact:.3e}')
@@ -0,0 +1,50 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PController
+from simba.basic_components import Sub, TFunction
+from simba.core import System
+
+import time
+
+speed_reference = nb.float64([100.0])
+
+
+def reference(t_):
+    return speed_reference.copy()
+
+
+reference_generation = TFunction(reference)
+sub = Sub()
+p_controller = PController(p_gain=1.0)
+motor = PermanentlyExcitedDCMotor()
+load_torque = QuadraticLoadTorque()
+load = RotationalMechanicalLoad()
+sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+p_controller(error=sub.outputs['Out'])
+motor(u=p_controller.outputs['action'], omega=load.outputs['omega'])
+load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+load_torque(omega=load.outputs['omega'])
+
+system = System((reference_generation, sub, p_controller, motor, load_torque, load))
+system.compile(numba_compile=True)
+
+# Operating point at a constant load torque of 2 Nm, compared with the end of a long simulation
+begin = time.time()
+x = system.find_operating_point({'QuadraticLoadTorque.a': 2.0})
+print(f'operating point: {x} ({time.time() - begin:.2f} s including compilation)')
+system.set_parameter('QuadraticLoadTorque.a', 2.0)
+_, states = system.simulate((0.0, 20.0), np.zeros(system.state_length), 1e-4, method='rk4')
+print(f'final state of the simulation: {states[-1]}')
+
+# Operating points over a grid of load torques and controller gains
+load_torques, p_gains = np.meshgrid(np.linspace(0.0, 5.0, 6), np.linspace(0.5, 2.0, 4))
+inputs = {'QuadraticLoadTorque.a': load_torques.ravel(), 'p_controller.p_gain': p_gains.ravel()}
+x_guesses = np.tile(x, (load_torques.size, 1))
+system.find_operating_points(inputs, x_guesses)
+begin = time.time()
+xs, status = system.find_operating_points(inputs, x_guesses)
+print(f'{len(xs)} operating points: {time.time() - begin:.4f} s, converged: {np.all(status == 0)}')
+for a, p_gain, (i_a, omega) in zip(inputs['QuadraticLoadTorque.a'], inputs['p_controller.p_gain'], xs):
+    print(f'T_L,0 = {a:.1f} Nm, p_gain = {p_gain:.1f}: i_a = {i_a:.3f} A, omega = {omega:.3f} 1/s')
@@ -0,0 +1,60 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PController
+from simba.basic_components import Sub, TFunction
+from simba.core import System
+
+import time
+
+amplitude = nb.float64([100.0])
+n_motors = 32
+n_evaluations = 10_000
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+def create_plant():
+    # Each motor is controlled separately, so that the system splits into one independent partition per motor. Only
+    # the time-only reference is shared and computed before the partitions.
+    reference_generation = TFunction(reference, name='reference')
+    components = [reference_generation]
+    for i in range(n_motors):
+        sub = Sub(name=f'sub_{i}')
+        p_controller = PController(name=f'p_controller_{i}', p_gain=1.0)
+        motor = PermanentlyExcitedDCMotor(name=f'motor_{i}')
+        load_torque = QuadraticLoadTorque(name=f'load_torque_{i}')
+        load = RotationalMechanicalLoad(name=f'load_{i}')
+        sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+        p_controller(error=sub.outputs['Out'])
+        motor(u=p_controller.outputs['action'], omega=load.outputs['omega'])
+        load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+        load_torque(omega=load.outputs['omega'])
+        components += [sub, p_controller, motor, load_torque, load]
+    return System(components)
+
+
+x = np.random.default_rng(0).normal(size=2 * n_motors)
+derivatives = dict()
+for parallel in (False, True):
+    system = create_plant()
+    system.compile(numba_compile=True, parallel=parallel)
+    system_equation_inplace = system.system_equation_inplace
+    workspace = system.create_workspace()
+    dx = np.empty(system.state_length)
+    system_equation_inplace(0.0, x, dx, workspace)
+    begin = time.time()
+    for k in range(n_evaluations):
+        system_equation_inplace(k * 1e-4, x, dx, workspace)
+    derivatives[parallel] = dx.copy()
+    mode = 'partitioned' if parallel else 'sequential'
+    duration = (time.time() - begin) / n_evaluations
+    n_threads = nb.get_num_threads() if parallel else 1
+    # The thread time is the cost of an evaluation summed over all threads. The difference to the sequential
+    # evaluation is the overhead of the parallel loop.
+    print(f'{mode}: {duration * 1e6:.1f} us per evaluation on {n_threads} threads, '
+          f'{duration * n_threads * 1e6:.1f} us thread time')
+print('max. difference:', np.max(np.abs(derivatives[True] - derivatives[False])))
@@ -1,9 +1,7 @@
-import numba as nb
 import numpy as np
 
 from simba.core import SystemComponent, Input, Output
-from simba.types import float_array, float_base_type
-from simba.config import get_t_diff
+from simba.types import float_base_type
 
 
 class DiscreteTimePIController(SystemComponent):
@@ -29,7 +27,9 @@ class DiscreteTimePIController(SystemComponent):
             self, name='action', dtype=float_base_type, size=1, signal_names=('action',),
             component_inputs=(error_input,)
         )
-        super().__init__(name, outputs=(output,), inputs=(error_input,))
+        super().__init__(
+            name, outputs=(output,), inputs=(error_input,), parameters={'p_gain': p_gain, 'i_gain': i_gain}
+        )
 
     def __call__(self, error):
         self._inputs['error'].connect(error)
@@ -40,27 +40,20 @@ class DiscreteTimePIController(SystemComponent):
             0.0,  # integrated value
         ])
         self._extra_index = get_extra_index_callback(self._extra)
-        p_gain = self._p_gain
-        i_gain = self._i_gain
         tau = self._tau
-        time_jitter = get_t_diff()
-
-        assert time_jitter < tau, 'The discrete time constant tau has to be greater than the global time jitter.'
 
-        def integrate(t, error, memory):
-            integrated_value = memory[1]
-            integrated_value += error * tau
+        # The integrator is updated at the sample hits t = k * tau. The solvers stop at each sample hit.
+        @self.discrete_update(tau, numba_compile=numba_compile)
+        def integrate(t, parameters, memory, error_input):
             memory[0] = t
-            memory[1] = integrated_value
-            return integrated_value
+            memory[1] += error_input[0] * tau
 
-        if numba_compile:
-            integrate = nb.njit(float_base_type(float_base_type, float_base_type, float_array))(integrate)
+        @self.output_equation('action', numba_compile=numba_compile, scalar=True)
+        def pi_control(t, parameters, memory, error_input):
+            # parameters: p_gain, i_gain
+            return parameters[0] * error_input + parameters[1] * memory[1]
 
-        @self.output_equation('action', numba_compile=numba_compile)
-        def pi_control(t, memory, error_input):
-            last_t = memory[0]
-            if last_t + tau < t - time_jitter:
-                integrate(t, error_input[0], memory)
-            integrated_value = memory[1]
-            return p_gain * error_input + i_gain * integrated_value
+        @self.jacobian_equation('action', numba_compile=numba_compile)
+        def pi_control_jacobian(t, parameters, memory, error_input):
+            # The integrator memory is not part of the system state. Only the proportional path is differentiated.
+            return np.array([[parameters[0]]])
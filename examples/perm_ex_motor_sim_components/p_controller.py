@@ -18,14 +18,17 @@ class PController(SystemComponent):
             self, name='action', dtype=float_base_type, size=1, signal_names=('action',),
             component_inputs=(error_input,)
         )
-        super().__init__(name, outputs=(output,), inputs=(error_input,))
+        super().__init__(name, outputs=(output,), inputs=(error_input,), parameters={'p_gain': p_gain})
 
     def __call__(self, error):
         self._inputs['error'].connect(error)
 
     def compile(self, get_extra_index, numba_compile=True):
-        p_gain = self._p_gain
 
-        @self.output_equation('action', numba_compile=numba_compile)
-        def p_control(t, error_input):
-            return p_gain * error_input
+        @self.output_equation('action', numba_compile=numba_compile, scalar=True)
+        def p_control(t, parameters, error_input):
+            return parameters[0] * error_input
+
+        @self.jacobian_equation('action', numba_compile=numba_compile)
+        def p_control_jacobian(t, parameters, error_input):
+            return np.array([[parameters[0]]])
@@ -34,7 +34,8 @@ class PermanentlyExcitedDCMotor(SystemComponent):
         self._parameter = self._default_motor_parameter.copy()
         self._parameter.update(params)
         super().__init__(
-            name, outputs=(current_output, torque_output), inputs=(voltage_input, speed_input), state=state
+            name, outputs=(current_output, torque_output), inputs=(voltage_input, speed_input), state=state,
+            parameters=self._parameter
         )
 
     def __call__(self, u, omega):
@@ -43,22 +44,32 @@ class PermanentlyExcitedDCMotor(SystemComponent):
 
     def compile(self, get_extra_index, numba_compile=True):
 
-        l_a = self._parameter['l_a']
-        r_a = self._parameter['r_a']
-        psi_e = self._parameter['psi_e']
-        model_parameters = np.array([
-            -psi_e, -r_a, 1.0
-        ]) / l_a
 
-        @self.state_equation(numba_compile=numba_compile)
-        def ode(t, local_state, u, omega):
+        @self.state_equation(numba_compile=numba_compile, scalar=True)
+        def ode(t, local_state, parameters, u, omega):
             # i = local_state[0]
-            return model_parameters[0] * omega + model_parameters[1] * local_state + model_parameters[2] * u
+            # parameters: r_a, l_a, psi_e, j_rotor
+            r_a, l_a, psi_e = parameters[0], parameters[1], parameters[2]
+            return (-psi_e * omega - r_a * local_state + u) / l_a
 
-        @self.output_equation('T', numba_compile=numba_compile)
-        def torque(t, local_state):
-            return psi_e * local_state
+        @self.output_equation('T', numba_compile=numba_compile, scalar=True)
+        def torque(t, local_state, parameters):
+            return parameters[2] * local_state
 
-        @self.output_equation('i', numba_compile=numba_compile)
-        def i(t, local_state):
+        @self.output_equation('i', numba_compile=numba_compile, scalar=True)
+        def i(t, local_state, parameters):
             return local_state
+
+        @self.jacobian_equation(numba_compile=numba_compile)
+        def ode_jacobian(t, local_state, parameters, u, omega):
+            # Columns: i, u, omega
+            r_a, l_a, psi_e = parameters[0], parameters[1], parameters[2]
+            return np.array([[-r_a / l_a, 1.0 / l_a, -psi_e / l_a]])
+
+        @self.jacobian_equation('T', numba_compile=numba_compile)
+        def torque_jacobian(t, local_state, parameters):
+            return np.array([[parameters[2]]])
+
+        @self.jacobian_equation('i', numba_compile=numba_compile)
+        def i_jacobian(t, local_state, parameters):
+            return np.array([[1.0]])
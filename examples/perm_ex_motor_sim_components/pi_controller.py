@@ -22,7 +22,9 @@ class PIController(SystemComponent):
         output = Output(
             self, name='action', dtype=float_base_type, size=1, signal_names=('action',), component_inputs=(error_input,)
         )
-        super().__init__(name, outputs=(output,), inputs=(error_input,))
+        super().__init__(
+            name, outputs=(output,), inputs=(error_input,), parameters={'p_gain': p_gain, 'i_gain': i_gain}
+        )
 
     def __call__(self, error):
         self._inputs['error'].connect(error)
@@ -36,8 +38,6 @@ class PIController(SystemComponent):
         ])
         self._extra_index = get_extra_index(self._extra)
         self._outputs['action'].extra_index = self._extra_index
-        p_gain = self._p_gain
-        i_gain = self._i_gain
 
         def integrate(t, error, memory):
             last_t = memory[0]
@@ -52,7 +52,13 @@ class PIController(SystemComponent):
         if numba_compile:
             integrate = nb.njit(float_base_type(float_base_type, float_base_type, float_array))(integrate)
 
-        @self.output_equation('action', numba_compile=numba_compile)
-        def pi_control(t, memory, error_input):
-            integrated_value = integrate(t, error_input[0], memory)
-            return p_gain * error_input + i_gain * integrated_value
+        @self.output_equation('action', numba_compile=numba_compile, scalar=True)
+        def pi_control(t, parameters, memory, error_input):
+            # parameters: p_gain, i_gain
+            integrated_value = integrate(t, error_input, memory)
+            return parameters[0] * error_input + parameters[1] * integrated_value
+
+        @self.jacobian_equation('action', numba_compile=numba_compile)
+        def pi_control_jacobian(t, parameters, memory, error_input):
+            # The integrator memory is not part of the system state. Only the proportional path is differentiated.
+            return np.array([[parameters[0]]])
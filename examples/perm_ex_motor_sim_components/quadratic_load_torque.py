@@ -17,20 +17,25 @@ class QuadraticLoadTorque(SystemComponent):
         self._c = c
         self._epsilon = epsilon
         super().__init__(
-            name, outputs=(load_torque_output,), inputs=(speed_input,)
+            name, outputs=(load_torque_output,), inputs=(speed_input,), parameters={'a': a, 'b': b, 'c': c}
         )
 
     def __call__(self, omega):
         self._inputs['omega'].connect(omega)
 
     def compile(self, get_extra_index, numba_compile=True):
-        a = self._a
-        b = self._b
-        c = self._c
         epsilon = self._epsilon
 
-        @self.output_equation('T_L', numba_compile=numba_compile)
-        def load_torque(t, omega):
-            om = omega[0]
+        @self.output_equation('T_L', numba_compile=numba_compile, scalar=True)
+        def load_torque(t, parameters, omega):
+            a, b, c = parameters[0], parameters[1], parameters[2]
+            om = omega
             sign_omega = 1 if om > epsilon else -1 if om < -epsilon else 0
             return sign_omega * a + omega * b + sign_omega * omega**2 * c
+
+        @self.jacobian_equation('T_L', numba_compile=numba_compile)
+        def load_torque_jacobian(t, parameters, omega):
+            b, c = parameters[1], parameters[2]
+            om = omega
+            sign_omega = 1 if om > epsilon else -1 if om < -epsilon else 0
+            return np.array([[b + 2.0 * sign_omega * om * c]])
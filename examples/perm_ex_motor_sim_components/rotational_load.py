@@ -21,7 +21,8 @@ class RotationalMechanicalLoad(SystemComponent):
         self._j = j
 
         super().__init__(
-            name, outputs=(speed_output,), inputs=(driving_torque_input, load_torque_input,), state=state
+            name, outputs=(speed_output,), inputs=(driving_torque_input, load_torque_input,), state=state,
+            parameters={'j': j}
         )
 
     def __call__(self, t, t_l):
@@ -29,12 +30,21 @@ class RotationalMechanicalLoad(SystemComponent):
         self._inputs['T_L'].connect(t_l)
 
     def compile(self, get_extra_index, numba_compile=True):
-        j = self._j
 
-        @self.state_equation(numba_compile=numba_compile)
-        def ode(t, state, driving_torque, load_torque):
-            return (driving_torque - load_torque) / j
+        @self.state_equation(numba_compile=numba_compile, scalar=True)
+        def ode(t, state, parameters, driving_torque, load_torque):
+            # parameters: j
+            return (driving_torque - load_torque) / parameters[0]
 
-        @self.output_equation('omega', numba_compile=numba_compile)
-        def omega(t, local_state):
+        @self.output_equation('omega', numba_compile=numba_compile, scalar=True)
+        def omega(t, local_state, parameters):
             return local_state
+
+        @self.jacobian_equation(numba_compile=numba_compile)
+        def ode_jacobian(t, state, parameters, driving_torque, load_torque):
+            # Columns: omega, T, T_L
+            return np.array([[0.0, 1.0 / parameters[0], -1.0 / parameters[0]]])
+
+        @self.jacobian_equation('omega', numba_compile=numba_compile)
+        def omega_jacobian(t, local_state, parameters):
+            return np.array([[1.0]])
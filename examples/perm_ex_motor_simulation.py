@@ -1,7 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import numba as nb
-from scipy.integrate import solve_ivp, ode
 
 from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
     PermanentlyExcitedDCMotor, QuadraticLoadTorque, PController, PIController, DiscreteTimePIController
@@ -60,36 +59,8 @@ print('One Call', time.time() - start)
 state = np.zeros(system.state_length, dtype=float)
 
 
-states = []
-
-ts = np.linspace(0, simulation_time, int(simulation_time/step_size_tau), dtype=float)
-state = np.array([0.0, 0.0])
-o = ode(system_equation)
-o.set_integrator('dopri5', first_step=step_size_tau/10)
-counter = 0
-t_ = []
-
-
-def solout(*_):
-    global counter
-    counter += 1
-
-
-o.set_solout(solout)
-o.set_initial_value(state, 0.0)
-for i, t in enumerate(ts):
-    states.append(state)
-    #state = o.integrate(t)
-    dev = system.system_equation(t, state)
-    state = state + dev * step_size_tau
-    if not o.successful():
-        print(i)
-        o.set_initial_value(state, t)
-
-states = np.array(states).T.reshape(-1, len(ts))
-#o.integrate(simulation_time)
-print(o.successful())
-print(counter)
+t, states = system.simulate((0.0, simulation_time), state, step_size_tau, method='euler')
+states = states.T
 print('Whole Time', time.time() - start)
 # Plot the results
 plt.plot(states[0], marker='*')
@@ -0,0 +1,82 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PIController
+from simba.basic_components import Sub, TFunction
+from simba.core import System
+
+import time
+
+amplitude = nb.float64([100.0])
+n_calls = 1_000_000
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+# The position of the read varies with each call, so that the compiler can not move the read out of the loop.
+@nb.njit
+def fancy_indexing(buffer, indices, n_calls):
+    total = 0.0
+    for i in range(n_calls):
+        offset = i % 8
+        total += buffer[offset:][indices][0]
+    return total
+
+
+@nb.njit
+def basic_slicing(buffer, start, stop, n_calls):
+    total = 0.0
+    for i in range(n_calls):
+        offset = i % 8
+        total += buffer[offset + start:offset + stop][0]
+    return total
+
+
+# Initialize Components
+reference_generation = TFunction(reference)
+sub = Sub()
+pi_controller = PIController(p_gain=1.0, i_gain=2.0)
+motor = PermanentlyExcitedDCMotor()
+load_torque = QuadraticLoadTorque()
+load = RotationalMechanicalLoad()
+
+# Connect Components
+sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+pi_controller(error=sub.outputs['Out'])
+motor(u=pi_controller.outputs['action'], omega=load.outputs['omega'])
+load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+load_torque(omega=load.outputs['omega'])
+
+system = System((reference_generation, sub, pi_controller, motor, load_torque, load))
+system.compile(numba_compile=True)
+
+# A single signal read of the generated functions. Previously, the local slices were index arrays, that copy the
+# selected signals on every read. Now, the generated code reads contiguous views with start:stop slicing.
+buffer = np.random.default_rng(0).random(16)
+indices = load.outputs['omega'].local_slice
+start, stop = load.outputs['omega'].slice_start, load.outputs['omega'].slice_stop
+fancy_indexing(buffer, indices, 1)
+basic_slicing(buffer, start, stop, 1)
+begin = time.time()
+fancy_indexing(buffer, indices, n_calls)
+fancy_time = (time.time() - begin) / n_calls
+begin = time.time()
+basic_slicing(buffer, start, stop, n_calls)
+basic_time = (time.time() - begin) / n_calls
+print(f'signal read with index array:      {fancy_time * 1e9:8.1f} ns')
+print(f'signal read with start:stop slice: {basic_time * 1e9:8.1f} ns')
+
+# One evaluation of the complete system equation of the DC motor system. The time includes the call from python.
+n_python_calls = 100_000
+x = np.zeros(system.state_length)
+dxdt = np.zeros(system.state_length)
+workspace = system.create_workspace()
+system_equation_inplace = system.system_equation_inplace
+system_equation_inplace(0.0, x, dxdt, workspace)
+begin = time.time()
+for i in range(n_python_calls):
+    system_equation_inplace(i * 1e-6, x, dxdt, workspace)
+print(f'system equation call from python:  {(time.time() - begin) / n_python_calls * 1e9:8.1f} ns')
@@ -0,0 +1,69 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PIController
+from simba.basic_components import Sub, TFunction
+from simba.core import System
+
+import time
+
+amplitude = nb.float64([100.0])
+simulation_time = 40.0
+explicit_step_size = 1e-4
+implicit_step_sizes = (1e-3, 1e-2, 5e-2)
+# The speed error is compared after the initial electrical transient, that the large steps do not resolve.
+transient_time = 1.0
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+# Initialize Components
+reference_generation = TFunction(reference)
+sub = Sub()
+pi_controller = PIController(p_gain=1.0, i_gain=2.0)
+motor = PermanentlyExcitedDCMotor()
+load_torque = QuadraticLoadTorque()
+load = RotationalMechanicalLoad()
+
+# Connect Components
+sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+pi_controller(error=sub.outputs['Out'])
+motor(u=pi_controller.outputs['action'], omega=load.outputs['omega'])
+load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+load_torque(omega=load.outputs['omega'])
+
+system = System((reference_generation, sub, pi_controller, motor, load_torque, load))
+system.compile(numba_compile=True)
+x0 = np.zeros(system.state_length)
+
+
+def reset():
+    # The PI controller keeps its integrator memory in the extras
+    system.extras[pi_controller.extra_index][:] = 0.0
+
+
+def run(method, dt):
+    # First call includes the compilation of the kernel
+    reset()
+    system.simulate((0.0, dt), x0, dt, method=method)
+    reset()
+    start = time.time()
+    t, states = system.simulate((0.0, simulation_time), x0, dt, method=method)
+    return t, states, time.time() - start
+
+
+t_ref, states_ref, time_ref = run('euler', explicit_step_size)
+print(
+    f'{"method":>15} {"dt":>8} {"steps":>8} {"time / s":>10} {"speedup":>8} '
+    f'{"max |omega error| after transient":>35}'
+)
+print(f'{"euler":>15} {explicit_step_size:>8.0e} {len(t_ref):>8} {time_ref:>10.4f} {1.0:>8.1f} {0.0:>35.4f}')
+for method in ('implicit_euler', 'bdf2'):
+    for dt in implicit_step_sizes:
+        t, states, time_ = run(method, dt)
+        omega_ref = np.interp(t, t_ref, states_ref[:, 1])
+        error = np.max(np.abs(states[:, 1] - omega_ref)[t >= transient_time])
+        print(f'{method:>15} {dt:>8.0e} {len(t):>8} {time_:>10.4f} {time_ref / time_:>8.1f} {error:>35.4f}')
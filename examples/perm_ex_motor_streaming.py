@@ -0,0 +1,51 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, PController
+from simba.basic_components import Sub, TFunction, Logger
+from simba.core import System
+from simba.sinks import NpySink
+from simba.types import float_base_type
+
+import tempfile
+import time
+
+amplitude = nb.float64([100.0])
+simulation_time = 600.0
+step_size = 1e-4
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+reference_generation = TFunction(reference)
+sub = Sub()
+p_controller = PController(p_gain=1.0)
+motor = PermanentlyExcitedDCMotor()
+load_torque = QuadraticLoadTorque()
+load = RotationalMechanicalLoad()
+sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+p_controller(error=sub.outputs['Out'])
+motor(u=p_controller.outputs['action'], omega=load.outputs['omega'])
+load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+load_torque(omega=load.outputs['omega'])
+
+# The torque is recorded with a sample period of 1 ms. The logger keeps at most one chunk in memory.
+torque_logger = Logger(1, float_base_type, name='torque', capacity=100_000, sample_period=1e-3)
+torque_logger.inputs['In'].connect(motor.outputs['T'])
+
+system = System((reference_generation, sub, p_controller, motor, load_torque, load, torque_logger))
+system.compile(numba_compile=True)
+
+directory = tempfile.mkdtemp()
+sink = NpySink(directory, chunk_size=100_000)
+begin = time.time()
+t, states = system.simulate((0.0, simulation_time), np.zeros(system.state_length), step_size, method='rk4', sink=sink)
+print(f'simulation of {len(t)} steps into {directory}: {time.time() - begin:.2f} s')
+
+# The results are memory mapped. Only the accessed parts are read from the files.
+_, _, logs = sink.load()
+print(f'states: {states.shape}, final state: {states[-1]}')
+print(f'torque samples: {logs["torque"]["signals"].shape}, mean torque: {np.mean(logs["torque"]["signals"]):.3f}')
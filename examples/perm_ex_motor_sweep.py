@@ -0,0 +1,48 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, DiscreteTimePIController
+from simba.basic_components import Sub, TFunction
+import simba as sb
+
+import time
+
+amplitude = nb.float64([100.0])
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+def create_spec():
+    # The spec declares the components by their types and arguments, so that it can be sent to worker processes
+    spec = sb.SystemSpec()
+    spec.add('reference', TFunction, reference)
+    spec.add('sub', Sub)
+    spec.add('pi_controller', DiscreteTimePIController, p_gain=1.0, i_gain=2.0, tau=1e-3)
+    spec.add('motor', PermanentlyExcitedDCMotor)
+    spec.add('load_torque', QuadraticLoadTorque)
+    spec.add('load', RotationalMechanicalLoad)
+    spec.connect('sub.In1', 'reference.Out')
+    spec.connect('sub.In2', 'load.omega')
+    spec.connect('pi_controller.error', 'sub.Out')
+    spec.connect('motor.u', 'pi_controller.action')
+    spec.connect('motor.omega', 'load.omega')
+    spec.connect('load.T', 'motor.T')
+    spec.connect('load.T_L', 'load_torque.T_L')
+    spec.connect('load_torque.omega', 'load.omega')
+    return spec
+
+
+# The workers are spawned processes, that import this module again
+if __name__ == '__main__':
+    param_grid = {
+        'pi_controller.p_gain': np.linspace(0.5, 4.0, 8),
+        'pi_controller.i_gain': (1.0, 2.0),
+    }
+    begin = time.time()
+    points, t, states = sb.sweep(create_spec(), param_grid, n_workers=2, t_span=(0.0, 5.0), x0=np.zeros(2), dt=1e-4)
+    print(f'{len(points)} simulations of {len(t)} steps: {time.time() - begin:.2f} s')
+    for point, trajectory in zip(points, states):
+        print(point, 'final state:', trajectory[-1])
@@ -0,0 +1,58 @@
+import numpy as np
+import numba as nb
+
+from perm_ex_motor_sim_components import RotationalMechanicalLoad,\
+    PermanentlyExcitedDCMotor, QuadraticLoadTorque, DiscreteTimePIController
+from simba.basic_components import Sub, TFunction, Logger
+from simba.core import System
+from simba.types import float_base_type
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+amplitude = nb.float64([100.0])
+simulation_time = 10.0
+step_size = 1e-4
+
+
+def reference(t_):
+    return amplitude * np.cos(t_)
+
+
+reference_generation = TFunction(reference)
+sub = Sub()
+pi_controller = DiscreteTimePIController(p_gain=1.0, i_gain=2.0, tau=1e-3)
+motor = PermanentlyExcitedDCMotor()
+load_torque = QuadraticLoadTorque()
+load = RotationalMechanicalLoad()
+sub(in1=reference_generation.outputs['Out'], in2=load.outputs['omega'])
+pi_controller(error=sub.outputs['Out'])
+motor(u=pi_controller.outputs['action'], omega=load.outputs['omega'])
+load(t=motor.outputs['T'], t_l=load_torque.outputs['T_L'])
+load_torque(omega=load.outputs['omega'])
+torque_logger = Logger(1, float_base_type, name='torque', capacity=10_000, sample_period=1e-3)
+torque_logger.inputs['In'].connect(motor.outputs['T'])
+
+system = System((reference_generation, sub, pi_controller, motor, load_torque, load, torque_logger))
+system.compile(numba_compile=True)
+x0 = np.zeros(system.state_length)
+
+
+def scenario(p_gain):
+    # Each scenario runs in its own context with its own controller memory, parameters and logger buffers
+    context = system.new_context()
+    context.set_parameter('pi_controller.p_gain', p_gain)
+    t, states = context.simulate((0.0, simulation_time), x0, step_size, method='rk4')
+    return states[-1], np.max(np.abs(context.get_logs('torque')['signals']))
+
+
+p_gains = np.linspace(0.5, 4.0, 8)
+# The first scenario compiles the simulation kernel, that all contexts share
+scenario(p_gains[0])
+for n_workers in (1, 4):
+    begin = time.time()
+    with ThreadPoolExecutor(n_workers) as executor:
+        results = list(executor.map(scenario, p_gains))
+    print(f'{len(p_gains)} scenarios on {n_workers} threads: {time.time() - begin:.3f} s')
+for p_gain, (final_state, max_torque) in zip(p_gains, results):
+    print(f'p_gain {p_gain:.2f}: final state {final_state}, max. torque {max_torque:.2f}')
@@ -0,0 +1,44 @@
+from simba.basic_components import Gain
+from simba.core import System
+from simba.utils import sort_outputs
+
+import time
+
+chain_lengths = (1_000, 10_000, 100_000)
+
+
+def create_chain(length, prefix):
+    gains = [Gain(1.0, name=f'{prefix}_{k}') for k in range(length)]
+    for previous, gain in zip(gains[:-1], gains[1:]):
+        gain(previous.outputs['Out0'])
+    return gains
+
+
+def is_topological(outputs):
+    positions = {output: position for position, output in enumerate(outputs)}
+    return all(
+        positions[input_.external_output] < positions[output]
+        for output in outputs for input_ in output.component_inputs if input_.connected
+    )
+
+
+print(f'{"outputs":>8} {"System() / s":>13} {"full sort / s":>14} {"new connection / ms":>20}')
+for length in chain_lengths:
+    # Two independent chains. The components are passed in reverse order, which was the worst case of the former sort.
+    chain_a = create_chain(length // 2, 'a')
+    chain_b = create_chain(length // 2, 'b')
+    components = (chain_a + chain_b)[::-1]
+    begin = time.time()
+    system = System(components)
+    init_time = time.time() - begin
+
+    begin = time.time()
+    sort_outputs(system._outputs.values())
+    sort_time = time.time() - begin
+
+    # Appending chain a to chain b moves all outputs of chain a behind chain b in the order
+    begin = time.time()
+    chain_a[0](chain_b[-1].outputs['Out0'])
+    connect_time = time.time() - begin
+    assert is_topological(list(system._output_ordering))
+    print(f'{length:>8} {init_time:>13.3f} {sort_time:>14.3f} {connect_time * 1e3:>20.1f}')
@@ -3,3 +3,7 @@ import simba.core
 import simba.utils
 import simba.basic_components
 import simba.core.interfaces
+import simba.solvers
+import simba.sinks
+import simba.sweeps
+from simba.sweeps import SystemSpec, sweep
@@ -1,4 +1,5 @@
 import numba as nb
+import numpy as np
 
 import simba as sb
 from simba.types import float_array, float_base_type
@@ -13,10 +14,17 @@ class Add(sb.core.SystemComponent):
         super().__init__(name, inputs=(in1, in2), outputs=(out,))
 
     def compile(self, get_extra_index, numba_compile=True):
-        @self.output_equation('Out', numba_compile=numba_compile)
+        @self.output_equation('Out', numba_compile=numba_compile, scalar=self._outputs['Out'].size == 1)
         def subtract(t, in1, in2):
             return in1 + in2
 
+        size = self._outputs['Out'].size
+        jacobian = np.hstack((np.eye(size), np.eye(size)))
+
+        @self.jacobian_equation('Out', numba_compile=numba_compile)
+        def add_jacobian(t, in1, in2):
+            return jacobian.copy()
+
     def __call__(self, in1, in2):
         self._inputs['In1'].connect(in1)
         self._inputs['In2'].connect(in2)
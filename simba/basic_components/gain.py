@@ -1,3 +1,5 @@
+import numpy as np
+
 import simba.core as core
 from simba.types import float_array, float_base_type
 
@@ -8,14 +10,18 @@ class Gain(core.SystemComponent):
         in0 = core.Input(self, name='In0', size=size, dtype=dtype)
         out0 = core.Output(self, name='Out0', size=size, dtype=dtype, component_inputs=(in0,))
         self._gain = gain
-        super().__init__(name, inputs=(in0,), outputs=(out0,))
+        super().__init__(name, inputs=(in0,), outputs=(out0,), parameters={'gain': gain})
 
     def compile(self, get_extra_index, numba_compile=True):
-        gain = self._gain
+        identity = np.eye(self._outputs['Out0'].size)
+
+        @self.output_equation('Out0', numba_compile=numba_compile, scalar=self._outputs['Out0'].size == 1)
+        def gain_(t, parameters, in0):
+            return parameters[0] * in0
 
-        @self.output_equation('Out0', numba_compile=numba_compile)
-        def gain_(in0):
-            return gain * in0
+        @self.jacobian_equation('Out0', numba_compile=numba_compile)
+        def gain_jacobian(t, parameters, in0):
+            return parameters[0] * identity
 
     def __call__(self, in0):
         self._inputs['In0'].connect(in0)
@@ -2,35 +2,170 @@ import numba as nb
 import numpy as np
 
 from simba.core import SystemComponent, Input, Output
+from simba.core.function_factories.compilation_cache import njit
 from simba.types import float_base_type, float_array
 
 
 class Logger(SystemComponent):
+    """Records the values of a signal at the accepted steps of a simulation.
 
-    def __init__(self, size, dtype, name='Logger'):
-        input_ = Input(self, 'In', size, dtype)
+    The values are stored in preallocated ring buffers in the extras of the system. So, the memory of the logger is
+    bounded by its capacity, also for very long simulations. If more samples are recorded, the oldest ones are
+    overwritten. The recorded steps are thinned out by a decimation and a sample period.
+    """
+
+    @property
+    def t_index(self):
+        """Index of the buffer of the times in the extras of the system."""
+        return self._t_index
+
+    @property
+    def values_index(self):
+        """Index of the buffer of the values in the extras of the system."""
+        return self._values_index
+
+    @property
+    def counter_index(self):
+        """Index of the counters (recorded, logged steps, rotation of the ring, drained) in the extras of the system."""
+        return self._counter_index
+
+    @property
+    def due_function(self):
+        """Compiled function due(t, t_buffer, counters) -> bool, if the current step is recorded."""
+        return self._due_function
+
+    @property
+    def record_function(self):
+        """Compiled function record(t, t_buffer, values, counters, value) that records a sample."""
+        return self._record_function
+
+    def __init__(self, size, dtype, name='Logger', capacity=100_000, decimation=1, sample_period=0.0):
+        """
+        Args:
+            size(int): Size of the logged signal.
+            dtype(nb.types.Type): Type of the logged signal.
+            name(str): Name of the logger.
+            capacity(int): Maximal number of samples kept in memory.
+            decimation(int): Only every decimation-th accepted step is recorded.
+            sample_period(float): Minimal time between two recorded samples. Every step is recorded, if zero.
+        """
+        assert capacity > 0, 'The capacity of the logger has to be positive.'
+        assert decimation > 0, 'The decimation of the logger has to be positive.'
+        assert sample_period >= 0.0, 'The sample period of the logger must not be negative.'
+        input_ = Input(self, 'In', size, dtype=dtype)
         output_ = Output(self, 'Out', (input_,), size=0, dtype=float_base_type)
         super().__init__(inputs=(input_,), outputs=(output_,), name=name)
+        self._capacity = capacity
+        self._decimation = decimation
+        self._sample_period = sample_period
+        self._t_index = None
+        self._values_index = None
+        self._counter_index = None
+        self._due_function = None
+        self._record_function = None
+        self._t_data = np.zeros(capacity)
+        self._values = np.zeros((capacity, size), dtype=np.dtype(str(dtype)))
+        self._counters = np.zeros(4, dtype=np.int64)
 
     def compile(self, get_extra_index, numba_compile=True):
-        t_data = nb.typed.List(lsttype=nb.types.ListType(float_base_type))
-        y_data = nb.typed.List(lsttype=nb.types.ListType(self.inputs['In'].dtype))
-        self._extra = (t_data, y_data)
-        self._extra_index = get_extra_index(self._extra)
-
-        @nb.njit(nb.none(nb.float64))
-        def log(t, extra, input_):
-            t_data_ = extra[0]
-            y_data_ = extra[1]
-            t_data_.append(t)
-            y_data_.append(input_)
-
-    def reset(self):
-        self._extra[0].clear()
-        self._extra[1].clear()
-
-    def get_logs(self):
-        return {
-            't': np.array(self._extra[0]),
-            'signals': np.array(self._extra[1])
-        }
+        self._t_index = get_extra_index(self._t_data)
+        self._values_index = get_extra_index(self._values)
+        self._counter_index = get_extra_index(self._counters)
+        capacity = self._capacity
+        decimation = self._decimation
+        sample_period = self._sample_period
+
+        def due(t, t_data, counters):
+            # counters: recorded samples, logged steps, rotation of the ring, drained samples
+            steps = counters[1]
+            counters[1] = steps + 1
+            if steps % decimation != 0:
+                return False
+            if counters[0] == 0 or sample_period == 0.0:
+                return True
+            # The tolerance covers the rounding of the time on an equidistant grid
+            last_t = t_data[(counters[0] - 1 + counters[2]) % capacity]
+            return t >= last_t + sample_period - 64.0 * np.spacing(np.abs(t))
+
+        def record(t, t_data, values, counters, value):
+            position = (counters[0] + counters[2]) % capacity
+            t_data[position] = t
+            values[position] = value
+            counters[0] += 1
+
+        if numba_compile:
+            values_type = nb.typeof(self._values)
+            due = njit(due, nb.boolean(float_base_type, float_array, nb.int64[::1]))
+            record = njit(
+                record,
+                nb.none(float_base_type, float_array, values_type, nb.int64[::1], values_type.dtype[:])
+            )
+        self._due_function = due
+        self._record_function = record
+
+    def _buffers(self, extras=None):
+        """The buffers of the times, the values and the counters in the extras of a run context of the system."""
+        if extras is None:
+            return self._t_data, self._values, self._counters
+        return extras[self._t_index], extras[self._values_index], extras[self._counter_index]
+
+    def reset(self, extras=None):
+        """Discards all recorded samples. The system resets its loggers at the start of each simulation.
+
+        Args:
+            extras(tuple): The extras of a run context of the system (see System.new_context). The own buffers of the
+                logger, if not passed.
+        """
+        self._buffers(extras)[2][:] = 0
+
+    @property
+    def values_dtype(self):
+        """The numpy dtype of the recorded values."""
+        return self._values.dtype
+
+    def drain(self, extras=None):
+        """Takes the samples, that have been recorded since the last call, e.g. to stream them into a file.
+
+        Samples, that have been overwritten in the meantime, are lost.
+
+        Args:
+            extras(tuple): The extras of a run context of the system. The own buffers of the logger, if not passed.
+
+        Returns:
+            dict: Copies of the times of shape (n,) as 't' and of the values of shape (n, size) as 'signals'.
+        """
+        t_data, values, counters = self._buffers(extras)
+        n_recorded = int(counters[0])
+        n_new = min(n_recorded - int(counters[3]), self._capacity)
+        positions = (np.arange(n_recorded - n_new, n_recorded) + counters[2]) % self._capacity
+        counters[3] = n_recorded
+        return {'t': t_data[positions], 'signals': values[positions]}
+
+    @property
+    def n_dropped(self):
+        """Number of the oldest samples, that have been overwritten, because the capacity was exceeded."""
+        return max(0, int(self._counters[0]) - self._capacity)
+
+    def get_logs(self, extras=None):
+        """The recorded samples in chronological order as views of the buffers of the logger.
+
+        The views are valid until the next simulation. If the capacity was exceeded, the buffers are rotated in place
+        once, so that the oldest kept sample comes first.
+
+        Args:
+            extras(tuple): The extras of a run context of the system. The own buffers of the logger, if not passed.
+
+        Returns:
+            dict: The times of shape (n,) as 't' and the values of shape (n, size) as 'signals'.
+        """
+        t_data, values, counters = self._buffers(extras)
+        n_recorded = int(counters[0])
+        if n_recorded <= self._capacity:
+            return {'t': t_data[:n_recorded], 'signals': values[:n_recorded]}
+        shift = (n_recorded + int(counters[2])) % self._capacity
+        if shift != 0:
+            t_data[:] = np.roll(t_data, -shift)
+            values[:] = np.roll(values, -shift, axis=0)
+            # The next sample overwrites the oldest one at the beginning
+            counters[2] = (counters[2] - shift) % self._capacity
+        return {'t': t_data, 'signals': values}
@@ -1,5 +1,7 @@
+import os
 
 _t_diff = 1e-6
+_cache_dir = os.environ.get('SIMBA_CACHE_DIR')
 
 
 def get_t_diff():
@@ -18,3 +20,22 @@ def get_t_diff():
 def set_t_diff(value: [float, int]):
     global _t_diff
     _t_diff = float(value)
+
+
+def get_cache_dir():
+    """The directory of the persistent compilation cache.
+
+    If a cache directory is set, the generated functions of a system are written to files within this directory and
+    all compiled functions are stored on disk. A later compilation of a system with identical components,
+    equations and signatures loads the machine code from the cache instead of compiling it again.
+    The cache directory is initialized from the environment variable SIMBA_CACHE_DIR.
+
+    Returns:
+        str or None: The cache directory. None, if the cache is disabled.
+    """
+    return _cache_dir
+
+
+def set_cache_dir(path: [str, None]):
+    global _cache_dir
+    _cache_dir = None if path is None else os.path.abspath(str(path))
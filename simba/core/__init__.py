@@ -3,5 +3,8 @@ from simba.core.input import Input
 from simba.core.system_component import SystemComponent
 from simba.core.system import System
 from simba.core.state import State
+from simba.core.parameters import Parameters
+from simba.core.discrete import ZeroCrossingEvent, DiscreteTask
+from simba.core.context import SimulationContext
 import simba.core.interfaces
 
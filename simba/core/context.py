@@ -0,0 +1,58 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from simba.core import System
+
+
+class SimulationContext:
+    """An independent run context of a compiled system (see System.new_context).
+
+    The context owns its extras, i.e. the runtime parameters, the memories of the components and the buffers of the
+    loggers. The compiled kernels are shared with the system. So, contexts of the same system can be simulated
+    concurrently from multiple threads.
+    """
+
+    @property
+    def system(self) -> 'System':
+        return self._system
+
+    @property
+    def extras(self):
+        """The extras of the context with the structure of System.extras."""
+        return self._extras
+
+    def __init__(self, system, extras):
+        self._system = system
+        self._extras = extras
+
+    def set_parameter(self, name, value):
+        """Changes a runtime parameter of the context. The system and other contexts keep their values.
+
+        Args:
+            name(str): Name of the parameter in the form 'component.parameter', e.g. 'PermExDCMotor.r_a'.
+            value(float): The new value of the parameter.
+        """
+        index = self._system._parameter_index(name)
+        self._extras[self._system._parameter_buffer_index][index] = value
+
+    def simulate(self, t_span, x0, dt=None, method='euler', t_eval=None, rtol=1e-6, atol=1e-9, max_step=np.inf):
+        """Simulates the system with the extras of the context (see System.simulate).
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray): The time grid of shape (n_steps,) and the states of shape
+            (n_steps, state_length).
+        """
+        return self._system._simulate(self._extras, t_span, x0, dt, method, t_eval, rtol, atol, max_step, None)
+
+    def get_logs(self, name):
+        """The samples, that the logger recorded in the last simulation of the context (see Logger.get_logs).
+
+        Args:
+            name(str): Name of the logger.
+
+        Returns:
+            dict: The times of shape (n,) as 't' and the values of shape (n, size) as 'signals'.
+        """
+        return self._system.loggers[name].get_logs(self._extras)
@@ -0,0 +1,96 @@
+from typing import TYPE_CHECKING, Callable, Iterable
+
+if TYPE_CHECKING:
+    from simba.core import Input, SystemComponent
+
+
+class ZeroCrossingEvent:
+    """An event of a component, that occurs at the zero crossings of its event equation.
+
+    The event equation maps the time, the local state, the parameters, the extra and all inputs of the component to a
+    float. The simulation locates its zero crossings on the continuous trajectory, stops there and calls the update
+    equation with the same arguments. The update equation changes the local state or the extra in place. Afterwards,
+    the simulation restarts from the updated state.
+    """
+
+    @property
+    def component(self) -> 'SystemComponent':
+        return self._component
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def direction(self):
+        """The direction of the detected zero crossings: 1 for rising, -1 for falling and 0 for both."""
+        return self._direction
+
+    @property
+    def component_inputs(self) -> Iterable['Input']:
+        return tuple(self._component.inputs.values())
+
+    @property
+    def event_equation(self) -> Callable:
+        return self._event_equation
+
+    @event_equation.setter
+    def event_equation(self, equation):
+        self._event_equation = equation
+
+    @property
+    def update_equation(self) -> Callable:
+        return self._update_equation
+
+    @update_equation.setter
+    def update_equation(self, equation):
+        self._update_equation = equation
+
+    def __init__(self, component, name, direction=0):
+        assert direction in (-1, 0, 1), 'The direction of an event is -1, 0 or 1.'
+        self._component = component
+        self._name = name
+        self._direction = direction
+        self._event_equation = None
+        self._update_equation = None
+
+
+class DiscreteTask:
+    """A discrete update of a component, that is executed at the sample hits t = offset + k * sample_period.
+
+    The update equation takes the same arguments as the output equations of the component and changes the local state
+    or the extra in place. The simulation stops at each sample hit and executes all due updates in the topological
+    order of their components. The continuous solver steps freely between the sample hits.
+    """
+
+    @property
+    def component(self) -> 'SystemComponent':
+        return self._component
+
+    @property
+    def sample_period(self):
+        return self._sample_period
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def component_inputs(self) -> Iterable['Input']:
+        return tuple(self._component.inputs.values())
+
+    @property
+    def update_equation(self) -> Callable:
+        return self._update_equation
+
+    @update_equation.setter
+    def update_equation(self, equation):
+        self._update_equation = equation
+
+    def __init__(self, component, sample_period, offset=0.0):
+        assert sample_period > 0.0, 'The sample period of a discrete update has to be positive.'
+        assert offset >= 0.0, 'The offset of a discrete update must not be negative.'
+        self._component = component
+        self._sample_period = float(sample_period)
+        self._offset = float(offset)
+        self._update_equation = None
@@ -0,0 +1,100 @@
+import numba as nb
+import numpy as np
+
+from simba.types import float_base_type, float_array, int_array
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.solvers.algebraic_loop import create_algebraic_loop_solver
+
+
+def _float_positions(outputs):
+    indices = [output.local_slice for output in outputs if output.dtype == float_base_type]
+    return np.concatenate(indices).astype(np.int64) if len(indices) > 0 else np.zeros(0, dtype=np.int64)
+
+
+def algebraic_loop_buffer_length(outputs):
+    """The length of the scratch buffer of the Newton iteration of an algebraic loop (see create_algebraic_loop_solver)."""
+    n = len(_float_positions(outputs))
+    return n * (n + 3)
+
+
+def create_algebraic_loop_indices(outputs, buffer_start):
+    """The positions of the float outputs of an algebraic loop in the float output buffer followed by the start of the
+    scratch buffer of the loop. The scratch buffers of all loops are placed behind the outputs in the float output
+    buffer, so that each workspace has its own."""
+    return np.append(_float_positions(outputs), np.int64(buffer_start))
+
+
+def create_algebraic_loop_function(output_functions, output_slices, global_extra_type):
+    """Creates a function that solves the outputs of an algebraic loop in the output buffers.
+
+    The function has the same signature as an output function. Instead of the argument slices, it takes the
+    positions of the float outputs of the loop and the start of its scratch buffer (see create_algebraic_loop_indices).
+    So, the system equation calls it in place of the output functions of the loop.
+
+    Args:
+        output_functions(Tuple[Callable]): The output functions of all outputs of the loop.
+        output_slices(Tuple[np.ndarray]): The argument slices of all outputs of the loop.
+        global_extra_type(nb.types.Tuple): Type of the tuple of extras.
+
+    Returns:
+        Callable: The loop function.
+    """
+    evaluate_loop = _create_loop_evaluation(output_functions, output_slices)
+    compiled = all(type(fct_) == nb.core.registry.CPUDispatcher for fct_ in output_functions)
+    if compiled:
+        evaluate_loop = njit(
+            evaluate_loop, nb.none(float_base_type, float_array, float_array, int_array, global_extra_type)
+        )
+    solve_algebraic_loop = create_algebraic_loop_solver(evaluate_loop)
+    if not compiled:
+        solve_algebraic_loop = solve_algebraic_loop.py_func
+
+    def algebraic_loop_function(t, global_state, global_float_outputs, global_int_outputs, global_extras, indices):
+        n = indices.shape[0] - 1
+        start = indices[n]
+        solve_algebraic_loop(
+            t, global_state, global_float_outputs, global_int_outputs, global_extras, indices[:n],
+            global_float_outputs[start:start + n * (n + 3)]
+        )
+
+    if compiled:
+        signature = nb.none(float_base_type, float_array, float_array, int_array, global_extra_type, nb.int64[::1])
+        algebraic_loop_function = njit(algebraic_loop_function, signature)
+    return algebraic_loop_function
+
+
+def _create_loop_evaluation(output_functions, output_slices):
+    """
+    exec(result, output_functions, output_slices):
+
+        output_function_0 = output_functions[0]
+        output_slices_0 = output_slices[0]
+        # ...
+
+        def evaluate_loop(t, global_state, global_float_outputs, global_int_outputs, global_extras):
+            # Each output reads the outputs of the loop, that are computed after it, from the previous evaluation
+            output_function_0(t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_0)
+            # ...
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(evaluate_loop)
+    """
+    prior = ""
+    header = "def evaluate_loop(t, global_state, global_float_outputs, global_int_outputs, global_extras):\n"
+    calls = ""
+    for i in range(len(output_functions)):
+        prior += f"output_function_{i} = output_functions[{i}]\n"
+        prior += f"output_slices_{i} = output_slices[{i}]\n"
+        calls += ' ' + f"output_function_{i}(" \
+            f"t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_{i})\n"
+    appendix = "result.append(evaluate_loop)\n"
+    f = []
+    exec_generated(
+        prior + header + calls + appendix,
+        {
+            'output_functions': output_functions,
+            'output_slices': output_slices,
+            'result': f,
+        }
+    )
+    return f[0]
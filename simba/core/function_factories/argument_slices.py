@@ -0,0 +1,41 @@
+import numpy as np
+
+# Positions of the slice bounds within the argument slices of an output or state
+STATE = 0
+PARAMETERS = 2
+TARGET = 4
+INPUTS = 6
+
+
+def create_argument_slices(holder):
+    """Creates the start and stop indices of all arguments of an output or state within the global buffers.
+
+    The generated functions receive these indices as data instead of compile time constants. Therefore, the generated
+    functions of all instances of a component type are identical and compiled only once.
+
+    Layout: [state_start, state_stop, parameter_start, parameter_stop, target_start, target_stop,
+    input_start_0, input_stop_0, input_start_1, ...]. The bounds of absent arguments (e.g. no state or unconnected
+    inputs) are zero.
+
+    Args:
+        holder(Output / State): The output or state with set local slices.
+
+    Returns:
+        np.ndarray: The argument slices of dtype int64.
+    """
+    state = holder.component.state
+    parameters = holder.component.parameters
+    slices = [
+        state.slice_start if state is not None else 0,
+        state.slice_stop if state is not None else 0,
+        parameters.slice_start if parameters is not None else 0,
+        parameters.slice_stop if parameters is not None else 0,
+        holder.slice_start,
+        holder.slice_stop,
+    ]
+    for input_ in holder.component_inputs:
+        if input_.connected:
+            slices += [input_.external_output.slice_start, input_.external_output.slice_stop]
+        else:
+            slices += [0, 0]
+    return np.array(slices, dtype=np.int64)
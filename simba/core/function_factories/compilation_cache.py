@@ -0,0 +1,189 @@
+import hashlib
+import os
+import sys
+import types
+import weakref
+
+import numba as nb
+import numpy as np
+from numba.core.caching import FunctionCache
+
+from simba.config import get_cache_dir
+
+
+class _NotCacheable(Exception):
+    pass
+
+
+class _ContentAddressedCache(FunctionCache):
+    """Numba function cache that indexes the compiled code with a content key.
+
+    Numba indexes its cache with the bytecode and the pickled closure of a function. Pickled dispatchers contain a
+    random uuid, so that functions calling other compiled functions would never be found in the cache again.
+    The content key instead hashes the code, the referenced globals and the closure of the function recursively.
+    """
+
+    def __init__(self, py_func, content_key):
+        super().__init__(py_func)
+        self._content_key = content_key
+
+    def _index_key(self, sig, codegen):
+        return sig, codegen.magic_tuple(), self._content_key
+
+
+# Compiled functions of this process by their content key. The dispatchers are held weakly, so that the functions of
+# systems, that are no longer used, can be collected.
+_compiled_functions = weakref.WeakValueDictionary()
+
+
+def clear_compiled_functions():
+    """Forgets all compiled functions of this process, so that identical functions are compiled anew.
+
+    Compiled systems keep their functions. Only later compilations no longer reuse them.
+    """
+    _compiled_functions.clear()
+
+
+def compiled_function_count():
+    """The number of distinct compiled functions of this process, that later compilations may reuse."""
+    return len(_compiled_functions)
+
+
+def njit(function, signature, **options):
+    """Compiles a function with numba for the signature.
+
+    Functions with identical content (code, referenced globals and closure values) and signature are compiled only
+    once per process. For example, the equations of all instances of a component type without instance specific
+    constants share the same compiled function.
+    If the compilation cache is enabled (see simba.config.set_cache_dir), the machine code is loaded from the cache
+    instead of compiled, if a function with the same content has been compiled before. Functions that reference
+    objects without a stable content (e.g. arbitrary python objects) are always compiled anew and, like functions that
+    are not defined in a file, compiled without caching.
+
+    Args:
+        function(Callable): The python function to compile.
+        signature(numba.core.typing.templates.Signature): The signature to compile the function for.
+        options: Further options of numba.njit, e.g. parallel=True.
+
+    Returns:
+        CPUDispatcher: The compiled function.
+    """
+    try:
+        key = content_key(function, signature, options)
+    except _NotCacheable:
+        return nb.njit(signature, **options)(function)
+    dispatcher = _compiled_functions.get(key)
+    if dispatcher is not None:
+        return dispatcher
+    dispatcher = nb.njit(**options)(function)
+    if get_cache_dir() is not None:
+        try:
+            dispatcher._cache = _ContentAddressedCache(function, key)
+        except RuntimeError:
+            # Numba raises a RuntimeError for functions without a source file
+            pass
+    dispatcher._simba_content_key = key
+    dispatcher.compile(signature)
+    _compiled_functions[key] = dispatcher
+    return dispatcher
+
+
+def exec_generated(code, namespace):
+    """Executes generated code within the namespace like exec.
+
+    If the compilation cache is enabled, the code is written to a file in the cache directory named by the hash of
+    the code and executed as module with this name. Numba can only cache functions that are defined in a file.
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        exec(code, namespace)
+        return
+    digest = hashlib.sha256(code.encode()).hexdigest()[:32]
+    module_name = f'simba_generated_{digest}'
+    directory = os.path.join(cache_dir, 'generated')
+    path = os.path.join(directory, f'{module_name}.py')
+    if not os.path.isfile(path):
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first, that concurrent processes never read a partially written module
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as file:
+            file.write(code)
+        os.replace(temporary_path, path)
+    # Numba rebuilds the environment of cached functions from the module name
+    module = types.ModuleType(module_name)
+    module.__file__ = path
+    module.__dict__.update(namespace)
+    sys.modules[module_name] = module
+    exec(compile(code, path, 'exec'), module.__dict__)
+
+
+def content_key(function, signature, options=None):
+    """Computes the key of a function within the compilation cache.
+
+    The key hashes the numba version, the signature, the compile options, the bytecode of the function and the content
+    of all referenced globals and closure variables. Referenced compiled functions are hashed recursively.
+
+    Raises:
+        _NotCacheable: If the function references a value without a stable content.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(nb.__version__.encode())
+    hasher.update(str(signature).encode())
+    hasher.update(repr(sorted((options or {}).items())).encode())
+    hasher.update(repr(_function_key(function, set())).encode())
+    return hasher.hexdigest()
+
+
+def _code_key(code):
+    constants = tuple(
+        _code_key(constant) if isinstance(constant, types.CodeType) else repr(constant)
+        for constant in code.co_consts
+    )
+    return code.co_code, code.co_names, code.co_varnames, code.co_freevars, constants
+
+
+def _referenced_names(code):
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            names.update(_referenced_names(constant))
+    return names
+
+
+def _function_key(function, visited):
+    if id(function) in visited:
+        return 'recursion', function.__qualname__
+    visited = visited | {id(function)}
+    code = function.__code__
+    global_keys = tuple(
+        (name, _value_key(function.__globals__[name], visited))
+        for name in sorted(_referenced_names(code)) if name in function.__globals__
+    )
+    closure = function.__closure__ or ()
+    closure_keys = tuple(
+        (name, _value_key(cell.cell_contents, visited)) for name, cell in zip(code.co_freevars, closure)
+    )
+    return _code_key(code), global_keys, closure_keys
+
+
+def _value_key(value, visited):
+    if isinstance(value, nb.core.registry.CPUDispatcher):
+        key = getattr(value, '_simba_content_key', None)
+        return ('dispatcher', key) if key is not None else ('dispatcher', _function_key(value.py_func, visited))
+    if isinstance(value, types.FunctionType):
+        return 'function', _function_key(value, visited)
+    if isinstance(value, types.ModuleType):
+        return 'module', value.__name__
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise _NotCacheable
+        return 'array', value.dtype.str, value.shape, hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+    if isinstance(value, (tuple, list)):
+        return type(value).__name__, tuple(_value_key(item, visited) for item in value)
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        return type(value).__name__, repr(value)
+    if isinstance(value, nb.types.Type):
+        return 'type', str(value)
+    if isinstance(value, (types.BuiltinFunctionType, np.ufunc)):
+        return 'builtin', getattr(value, '__module__', None), value.__name__
+    raise _NotCacheable
@@ -0,0 +1,184 @@
+import numba as nb
+import numpy as np
+
+from simba.types import float_base_type, float_array
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.core.function_factories.system_equation_factory import create_workspace_type
+
+
+def create_event_functions(system_equation_inplace, events, state_length, global_extra_type):
+    """Creates the functions that evaluate the zero crossing events of a system and apply their updates.
+
+    Args:
+        system_equation_inplace(Callable): The in-place system equation.
+        events(Tuple[ZeroCrossingEvent]): All events of the system.
+        state_length(int): Length of the state of the system.
+        global_extra_type(nb.types.Tuple): Type of the tuple of extras.
+
+    Returns:
+        Tuple(Callable, Callable, np.ndarray): The functions evaluate_events(t, global_state, workspace,
+        global_extras, values, evaluated) and apply_event(index, t, global_state, workspace, global_extras) and the
+        directions of the events.
+    """
+    evaluate_events, apply_event = _create_event_functions(system_equation_inplace, events, state_length)
+    if type(system_equation_inplace) == nb.core.registry.CPUDispatcher:
+        workspace_type = create_workspace_type()
+        evaluate_events = njit(
+            evaluate_events,
+            nb.none(float_base_type, float_array, workspace_type, global_extra_type, float_array, nb.boolean)
+        )
+        apply_event = njit(
+            apply_event, nb.none(nb.int64, float_base_type, float_array, workspace_type, global_extra_type)
+        )
+    directions = np.array([event.direction for event in events], dtype=np.int64)
+    return evaluate_events, apply_event, directions
+
+
+def create_discrete_update(system_equation_inplace, tasks, state_length, global_extra_type):
+    """Creates the function that executes the due discrete updates of a system at a sample hit.
+
+    Args:
+        system_equation_inplace(Callable): The in-place system equation.
+        tasks(Tuple[DiscreteTask]): All discrete updates of the system in the topological order of their components.
+        state_length(int): Length of the state of the system.
+        global_extra_type(nb.types.Tuple): Type of the tuple of extras.
+
+    Returns:
+        Tuple(Callable, np.ndarray, np.ndarray): The function discrete_update(t, global_state, workspace,
+        global_extras, due) and the sample periods and offsets of the tasks.
+    """
+    discrete_update = _create_discrete_update(system_equation_inplace, tasks, state_length)
+    if type(system_equation_inplace) == nb.core.registry.CPUDispatcher:
+        discrete_update = njit(
+            discrete_update,
+            nb.none(float_base_type, float_array, create_workspace_type(), global_extra_type, nb.boolean[::1])
+        )
+    periods = np.array([task.sample_period for task in tasks], dtype=float)
+    offsets = np.array([task.offset for task in tasks], dtype=float)
+    return discrete_update, periods, offsets
+
+
+def _arguments(holder, index, namespace):
+    """The arguments of an event or update equation: time, local state, parameters, extra and all inputs."""
+    component = holder.component
+    arguments = "t, "
+    if component.state is not None:
+        arguments += f"global_state[{component.state.slice_start}:{component.state.slice_stop}], "
+    if component.parameters is not None:
+        parameters = component.parameters
+        arguments += f"global_extras[{parameters.buffer_index}][{parameters.slice_start}:{parameters.slice_stop}], "
+    if component.extra_index is not None:
+        arguments += f"global_extras[{component.extra_index}], "
+    for i, input_ in enumerate(holder.component_inputs):
+        if input_.connected:
+            source = input_.external_output
+            buffer = 'global_float_outputs' if source.dtype == float_base_type else 'global_int_outputs'
+            arguments += f"{buffer}[{source.slice_start}:{source.slice_stop}], "
+        else:
+            assert input_.default_value is not None, \
+                f'The input {input_.name} of {component.name} is neither connected nor has a default value.'
+            name = f'default_{index}_{i}'
+            namespace[name] = np.atleast_1d(input_.default_value).astype(np.dtype(str(input_.dtype)))
+            arguments += f"{name}, "
+    return arguments[:-2]
+
+
+def _create_event_functions(system_equation_inplace, events, state_length):
+    """
+    exec(result, system_equation_inplace, event and update equations, default values, state_length, np):
+
+        def evaluate_events(t, global_state, workspace, global_extras, values, evaluated):
+            # The inputs of the events are read from the outputs of the last evaluation of the system equation
+            if not evaluated:
+                system_equation_inplace(t, global_state, np.empty(state_length), workspace, global_extras)
+            global_float_outputs = workspace[0]
+            global_int_outputs = workspace[1]
+            values[0] = event_equation_0(t, global_state[0:1], global_float_outputs[2:3])
+            # ...
+
+        def apply_event(index, t, global_state, workspace, global_extras):
+            system_equation_inplace(t, global_state, np.empty(state_length), workspace, global_extras)
+            global_float_outputs = workspace[0]
+            global_int_outputs = workspace[1]
+            if index == 0:
+                update_equation_0(t, global_state[0:1], global_float_outputs[2:3])
+            # elif index == 1: ...
+
+        # Append the generated functions to the (empty) result list to pass them back to the caller
+        result.append(evaluate_events)
+        result.append(apply_event)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    namespace = {
+        'system_equation_inplace': system_equation_inplace,
+        'state_length': state_length,
+        'np': np,
+    }
+    buffers = spacing(1) + "global_float_outputs = workspace[0]\n"
+    buffers += spacing(1) + "global_int_outputs = workspace[1]\n"
+    evaluation = spacing(1) \
+        + "system_equation_inplace(t, global_state, np.empty(state_length), workspace, global_extras)\n"
+    evaluate_code = "def evaluate_events(t, global_state, workspace, global_extras, values, evaluated):\n"
+    evaluate_code += spacing(1) + "if not evaluated:\n" + spacing(1) + evaluation + buffers
+    apply_code = "def apply_event(index, t, global_state, workspace, global_extras):\n"
+    apply_code += evaluation + buffers
+    for k, event in enumerate(events):
+        assert event.update_equation is not None, \
+            f'The event {event.name} of {event.component.name} has no update equation.'
+        namespace[f'event_equation_{k}'] = event.event_equation
+        namespace[f'update_equation_{k}'] = event.update_equation
+        arguments = _arguments(event, k, namespace)
+        evaluate_code += spacing(1) + f"values[{k}] = event_equation_{k}({arguments})\n"
+        apply_code += spacing(1) + ("if" if k == 0 else "elif") + f" index == {k}:\n"
+        apply_code += spacing(2) + f"update_equation_{k}({arguments})\n"
+    appendix = "result.append(evaluate_events)\nresult.append(apply_event)\n"
+    f = []
+    namespace['result'] = f
+    exec_generated(evaluate_code + apply_code + appendix, namespace)
+    return f[0], f[1]
+
+
+def _create_discrete_update(system_equation_inplace, tasks, state_length):
+    """
+    exec(result, system_equation_inplace, update equations, default values, state_length, np):
+
+        def discrete_update(t, global_state, workspace, global_extras, due):
+            derivatives = np.empty(state_length)
+            global_float_outputs = workspace[0]
+            global_int_outputs = workspace[1]
+            # The due updates are executed in the topological order of their components. Each update reads the
+            # outputs after the previous updates.
+            if due[0]:
+                system_equation_inplace(t, global_state, derivatives, workspace, global_extras)
+                update_equation_0(t, global_extras[1], global_float_outputs[2:3])
+            # ...
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(discrete_update)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    namespace = {
+        'system_equation_inplace': system_equation_inplace,
+        'state_length': state_length,
+        'np': np,
+    }
+    code = "def discrete_update(t, global_state, workspace, global_extras, due):\n"
+    code += spacing(1) + "derivatives = np.empty(state_length)\n"
+    code += spacing(1) + "global_float_outputs = workspace[0]\n"
+    code += spacing(1) + "global_int_outputs = workspace[1]\n"
+    for k, task in enumerate(tasks):
+        namespace[f'update_equation_{k}'] = task.update_equation
+        code += spacing(1) + f"if due[{k}]:\n"
+        code += spacing(2) + "system_equation_inplace(t, global_state, derivatives, workspace, global_extras)\n"
+        code += spacing(2) + f"update_equation_{k}({_arguments(task, k, namespace)})\n"
+    appendix = "result.append(discrete_update)\n"
+    f = []
+    namespace['result'] = f
+    exec_generated(code + appendix, namespace)
+    return f[0]
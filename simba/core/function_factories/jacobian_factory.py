@@ -0,0 +1,213 @@
+import numba as nb
+import numpy as np
+
+from simba.types import float_base_type, float_array
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.solvers.finite_differences import create_colored_finite_differences
+
+
+def _spacing(no_of_spaces):
+    return ' ' * no_of_spaces
+
+
+def create_chain_rule(holder, target):
+    """Creates the code that chains the local jacobian of an output or state with the jacobians of its inputs.
+
+    The local jacobian returned by a jacobian equation has one row per signal of the holder and one column per
+    signal of its local state (if the component has a state) followed by the signals of all component inputs in their
+    order. Only connected float inputs contribute to the global jacobian. Each jacobian block is stored row major
+    with the structural columns of its holder (holder.jacobian_columns) in a flat buffer.
+
+    Args:
+        holder(Output / State): The signal holder with jacobian columns and offset set.
+        target(str): Name of the flat buffer that receives the jacobian block of the holder.
+
+    Returns:
+        Tuple(str, dict): The code to insert after the evaluation of the local_jacobian and the constants the code
+        refers to.
+    """
+    columns = holder.jacobian_columns
+    state = holder.component.state
+    namespace = {
+        'size': holder.size,
+        'n_columns': len(columns),
+        'block_start': holder.jacobian_offset,
+        'block_stop': holder.jacobian_offset + holder.size * len(columns),
+    }
+    code = _spacing(1) + f"{target}[block_start:block_stop] = 0.0\n"
+    row_code = ""
+    column_offset = 0
+    if state is not None:
+        namespace['state_size'] = state.size
+        namespace['state_positions'] = np.searchsorted(columns, state.local_slice)
+        row_code += _spacing(2) + "for k in range(state_size):\n"
+        row_code += _spacing(3) + f"{target}[row_start + state_positions[k]] += local_jacobian[row, k]\n"
+        column_offset += state.size
+    for i, input_ in enumerate(holder.component_inputs):
+        source = input_.external_output
+        if input_.connected and input_.dtype == float_base_type and len(source.jacobian_columns) > 0:
+            namespace[f'column_offset_{i}'] = column_offset
+            namespace[f'source_size_{i}'] = source.size
+            namespace[f'source_start_{i}'] = source.jacobian_offset
+            namespace[f'source_n_columns_{i}'] = len(source.jacobian_columns)
+            namespace[f'positions_{i}'] = np.searchsorted(columns, source.jacobian_columns)
+            row_code += _spacing(2) + f"for m in range(source_size_{i}):\n"
+            row_code += _spacing(3) + f"derivative = local_jacobian[row, column_offset_{i} + m]\n"
+            row_code += _spacing(3) + "if derivative != 0.0:\n"
+            row_code += _spacing(4) + f"source_row_start = source_start_{i} + m * source_n_columns_{i}\n"
+            row_code += _spacing(4) + f"for k in range(source_n_columns_{i}):\n"
+            row_code += _spacing(5) + f"{target}[row_start + positions_{i}[k]] += " \
+                                      f"derivative * global_output_jacobians[source_row_start + k]\n"
+        column_offset += input_.size
+    namespace['n_local_columns'] = column_offset
+    code += _spacing(1) + "assert local_jacobian.shape[0] == size and local_jacobian.shape[1] == n_local_columns\n"
+    if row_code != "":
+        code += _spacing(1) + "for row in range(size):\n"
+        code += _spacing(2) + "row_start = block_start + row * n_columns\n"
+        code += row_code
+    return code, namespace
+
+
+def create_system_jacobian(
+    output_functions, output_slices, output_jacobian_functions, output_jacobian_slices, state_jacobian_functions,
+    state_jacobian_slices, float_length, int_length, output_jacobian_length, nnz, global_extra_type
+):
+    fct = _create_system_jacobian(
+        output_functions, output_slices, output_jacobian_functions, output_jacobian_slices, state_jacobian_functions,
+        state_jacobian_slices, float_length, int_length, output_jacobian_length, nnz
+    )
+    all_functions = list(output_functions) + list(output_jacobian_functions) + list(state_jacobian_functions)
+    if all(type(fct_) == nb.core.registry.CPUDispatcher for fct_ in all_functions):
+        signature = float_array(float_base_type, float_array, global_extra_type)
+        fct = njit(fct, signature)
+    return fct
+
+
+def _create_system_jacobian(
+    output_functions, output_slices, output_jacobian_functions, output_jacobian_slices, state_jacobian_functions,
+    state_jacobian_slices, float_length, int_length, output_jacobian_length, nnz
+):
+    """
+    exec(result, functions, slices, lengths, np):
+
+        output_function_0 = output_functions[0]
+        output_slices_0 = output_slices[0]
+        # ...
+        output_jacobian_function_0 = output_jacobian_functions[0]
+        output_jacobian_slices_0 = output_jacobian_slices[0]
+        # ...
+        state_jacobian_function_0 = state_jacobian_functions[0]
+        state_jacobian_slices_0 = state_jacobian_slices[0]
+        # ...
+
+        def system_jacobian(t, global_state, global_extras):
+            global_float_outputs = np.zeros(float_length)
+            global_int_outputs = np.zeros(int_length, dtype=np.int32)
+            global_output_jacobians = np.zeros(output_jacobian_length)
+            global_state_jacobian = np.zeros(nnz)
+
+            # The local jacobians depend on the values of the outputs
+            output_function_0(t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_0)
+            # ...
+
+            # Propagate the jacobians through the output graph in topological order
+            output_jacobian_function_0(
+                t, global_state, global_float_outputs, global_int_outputs, global_output_jacobians, global_extras,
+                output_jacobian_slices_0
+            )
+            # ...
+
+            # Write the rows of each state into the CSR data of the system jacobian
+            state_jacobian_function_0(
+                t, global_state, global_float_outputs, global_int_outputs, global_output_jacobians,
+                global_state_jacobian, global_extras, state_jacobian_slices_0
+            )
+            # ...
+            return global_state_jacobian
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(system_jacobian)
+    """
+    prior = ""
+    header = "def system_jacobian(t, global_state, global_extras):\n"
+    buffers = _spacing(1) + "global_float_outputs = np.zeros(float_length)\n"
+    buffers += _spacing(1) + "global_int_outputs = np.zeros(int_length, dtype=np.int32)\n"
+    buffers += _spacing(1) + "global_output_jacobians = np.zeros(output_jacobian_length)\n"
+    buffers += _spacing(1) + "global_state_jacobian = np.zeros(nnz)\n"
+    calls = ""
+    for i in range(len(output_functions)):
+        prior += f"output_function_{i} = output_functions[{i}]\n"
+        prior += f"output_slices_{i} = output_slices[{i}]\n"
+        calls += _spacing(1) + f"output_function_{i}(" \
+            f"t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_{i})\n"
+    for i in range(len(output_jacobian_functions)):
+        prior += f"output_jacobian_function_{i} = output_jacobian_functions[{i}]\n"
+        prior += f"output_jacobian_slices_{i} = output_jacobian_slices[{i}]\n"
+        calls += _spacing(1) + f"output_jacobian_function_{i}(" \
+            "t, global_state, global_float_outputs, global_int_outputs, global_output_jacobians, global_extras, " \
+            f"output_jacobian_slices_{i})\n"
+    for i in range(len(state_jacobian_functions)):
+        prior += f"state_jacobian_function_{i} = state_jacobian_functions[{i}]\n"
+        prior += f"state_jacobian_slices_{i} = state_jacobian_slices[{i}]\n"
+        calls += _spacing(1) + f"state_jacobian_function_{i}(" \
+            "t, global_state, global_float_outputs, global_int_outputs, global_output_jacobians, " \
+            f"global_state_jacobian, global_extras, state_jacobian_slices_{i})\n"
+    return_line = _spacing(1) + "return global_state_jacobian\n"
+    appendix = "result.append(system_jacobian)\n"
+    f = []
+    exec_generated(
+        prior + header + buffers + calls + return_line + appendix,
+        {
+            'output_functions': output_functions,
+            'output_slices': output_slices,
+            'output_jacobian_functions': output_jacobian_functions,
+            'output_jacobian_slices': output_jacobian_slices,
+            'state_jacobian_functions': state_jacobian_functions,
+            'state_jacobian_slices': state_jacobian_slices,
+            'float_length': float_length,
+            'int_length': int_length,
+            'output_jacobian_length': output_jacobian_length,
+            'nnz': nnz,
+            'result': f,
+            'np': np,
+        }
+    )
+    return f[0]
+
+
+def create_dense_jacobian(system_jacobian, indices, indptr, state_length, global_extra_type):
+    """Wraps a system jacobian returning CSR data into a function that returns the dense jacobian matrix."""
+
+    def dense_jacobian(t, global_state, global_extras):
+        data = system_jacobian(t, global_state, global_extras)
+        jacobian = np.zeros((state_length, state_length))
+        for row in range(state_length):
+            for k in range(indptr[row], indptr[row + 1]):
+                jacobian[row, indices[k]] = data[k]
+        return jacobian
+
+    if type(system_jacobian) == nb.core.registry.CPUDispatcher:
+        signature = float_base_type[:, ::1](float_base_type, float_array, global_extra_type)
+        dense_jacobian = njit(dense_jacobian, signature)
+    return dense_jacobian
+
+
+def create_colored_finite_difference_jacobian(
+    system_equation, indices, indptr, color_entries, color_pointers, global_extra_type
+):
+    """Creates a function that approximates the CSR data of the system jacobian with one evaluation per color."""
+    compiled = type(system_equation) == nb.core.registry.CPUDispatcher
+    colored_finite_difference_jacobian = create_colored_finite_differences(system_equation)
+    if not compiled:
+        colored_finite_difference_jacobian = colored_finite_difference_jacobian.py_func
+
+    def system_jacobian(t, global_state, global_extras):
+        return colored_finite_difference_jacobian(
+            t, global_state, system_equation(t, global_state, global_extras), global_extras, indices, indptr,
+            color_entries, color_pointers
+        )
+
+    if compiled:
+        signature = float_array(float_base_type, float_array, global_extra_type)
+        system_jacobian = njit(system_jacobian, signature)
+    return system_jacobian
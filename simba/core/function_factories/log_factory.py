@@ -0,0 +1,94 @@
+import numba as nb
+import numpy as np
+
+from simba.types import float_base_type, float_array
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.core.function_factories.system_equation_factory import create_workspace_type
+
+
+def create_log_function(system_equation_inplace, loggers, state_length, global_extra_type):
+    """Creates the function that records the inputs of the loggers at an accepted step of a simulation.
+
+    The solvers call it once per accepted step. The outputs are read from the workspace, if the last evaluation of the
+    system equation was at the accepted step. Otherwise, the system equation is evaluated once more, but only if a
+    logger records the step.
+
+    Args:
+        system_equation_inplace(Callable): The in-place system equation.
+        loggers(Tuple[Logger]): The compiled loggers of the system.
+        state_length(int): Length of the state of the system.
+        global_extra_type(nb.types.Tuple): Type of the tuple of extras.
+
+    Returns:
+        Callable(t, global_state, workspace, global_extras, evaluated) -> None: The log function.
+    """
+    fct = _create_log_function(system_equation_inplace, loggers, state_length)
+    if type(system_equation_inplace) == nb.core.registry.CPUDispatcher:
+        signature = nb.none(float_base_type, float_array, create_workspace_type(), global_extra_type, nb.boolean)
+        fct = njit(fct, signature)
+    return fct
+
+
+def _create_log_function(system_equation_inplace, loggers, state_length):
+    """
+    exec(result, system_equation_inplace, due and record functions, default values, state_length, np):
+
+        def log_step(t, global_state, workspace, global_extras, evaluated):
+            # Each logger decides, if it records the step. The step counters of all loggers are advanced.
+            due_0 = due_function_0(t, global_extras[3], global_extras[5])
+            # ...
+            if not evaluated and (due_0 or ...):
+                system_equation_inplace(t, global_state, np.empty(state_length), workspace, global_extras)
+            global_float_outputs = workspace[0]
+            global_int_outputs = workspace[1]
+            if due_0:
+                record_function_0(t, global_extras[3], global_extras[4], global_extras[5], global_float_outputs[2:3])
+            # ...
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(log_step)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    namespace = {
+        'system_equation_inplace': system_equation_inplace,
+        'state_length': state_length,
+        'np': np,
+    }
+    header = "def log_step(t, global_state, workspace, global_extras, evaluated):\n"
+    decisions = ""
+    records = ""
+    for k, logger in enumerate(loggers):
+        namespace[f'due_function_{k}'] = logger.due_function
+        namespace[f'record_function_{k}'] = logger.record_function
+        t_data = f"global_extras[{logger.t_index}]"
+        values = f"global_extras[{logger.values_index}]"
+        counters = f"global_extras[{logger.counter_index}]"
+        input_ = logger.inputs['In']
+        assert input_.connected or input_.default_value is not None, f'The input of {logger.name} is not connected.'
+        if input_.connected:
+            source = input_.external_output
+            buffer = 'global_float_outputs' if source.dtype == float_base_type else 'global_int_outputs'
+            value = f"{buffer}[{source.slice_start}:{source.slice_stop}]"
+        else:
+            value = f"default_{k}"
+            namespace[value] = input_.default_value
+        decisions += spacing(1) + f"due_{k} = due_function_{k}(t, {t_data}, {counters})\n"
+        records += spacing(1) + f"if due_{k}:\n"
+        records += spacing(2) + f"record_function_{k}(t, {t_data}, {values}, {counters}, {value})\n"
+    body = decisions
+    if len(loggers) > 0:
+        any_due = ' or '.join(f'due_{k}' for k in range(len(loggers)))
+        body += spacing(1) + f"if not evaluated and ({any_due}):\n"
+        body += spacing(2) \
+            + "system_equation_inplace(t, global_state, np.empty(state_length), workspace, global_extras)\n"
+    body += spacing(1) + "global_float_outputs = workspace[0]\n"
+    body += spacing(1) + "global_int_outputs = workspace[1]\n"
+    body += records
+    appendix = "result.append(log_step)\n"
+    f = []
+    namespace['result'] = f
+    exec_generated(header + body + appendix, namespace)
+    return f[0]
@@ -0,0 +1,132 @@
+import numba as nb
+import numpy as np
+
+from simba.types import float_base_type
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.solvers.operating_point import create_levenberg_marquardt
+
+
+def create_operating_point(system_equation_inplace, jacobian, create_workspace, global_extra_type):
+    """Creates the compiled search of a single operating point (see create_levenberg_marquardt).
+
+    Args:
+        system_equation_inplace(CPUDispatcher): The compiled in-place system equation.
+        jacobian(CPUDispatcher): The compiled dense jacobian jacobian(t, global_state, global_extras) -> J.
+        create_workspace(CPUDispatcher): Allocates the workspace of the system equation.
+        global_extra_type(nb.types.Tuple): Type of the tuple of extras.
+
+    Returns:
+        CPUDispatcher: The function operating_point(t, x_guess, global_extras, rtol, atol, max_iterations), that returns
+        the state, the status of the search and the number of iterations.
+    """
+    fct = _create_operating_point(system_equation_inplace, jacobian, create_workspace)
+    signature = nb.types.Tuple((float_base_type[::1], nb.int64, nb.int64))(
+        float_base_type, float_base_type[::1], global_extra_type, float_base_type, float_base_type, nb.int64
+    )
+    return njit(fct, signature, nogil=True)
+
+
+def _create_operating_point(system_equation_inplace, jacobian, create_workspace):
+    """
+    exec(result, levenberg_marquardt, create_workspace):
+
+        # levenberg_marquardt = create_levenberg_marquardt(system_equation_inplace, jacobian)
+        def operating_point(t, x_guess, global_extras, rtol, atol, max_iterations):
+            return levenberg_marquardt(t, x_guess, create_workspace(), global_extras, rtol, atol, max_iterations)
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(operating_point)
+    """
+    code = "def operating_point(t, x_guess, global_extras, rtol, atol, max_iterations):\n"
+    code += " return levenberg_marquardt(t, x_guess, create_workspace(), global_extras, rtol, atol, max_iterations)\n"
+    code += "result.append(operating_point)\n"
+    f = []
+    exec_generated(
+        code,
+        {
+            'levenberg_marquardt': create_levenberg_marquardt(system_equation_inplace, jacobian),
+            'create_workspace': create_workspace,
+            'result': f,
+        }
+    )
+    return f[0]
+
+
+def create_batch_operating_point(
+    system_equation_inplace, jacobian, create_workspace, state_length, n_extras, batch_extra_type
+):
+    """Creates the function that searches the operating points of an ensemble of operating conditions in parallel.
+
+    Args:
+        system_equation_inplace(CPUDispatcher): The compiled in-place system equation.
+        jacobian(CPUDispatcher): The compiled dense jacobian jacobian(t, global_state, global_extras) -> J.
+        create_workspace(CPUDispatcher): Allocates the workspace of the system equation.
+        state_length(int): Length of the state of the system.
+        n_extras(int): Number of extras of the system.
+        batch_extra_type(nb.types.Tuple): Type of the tuple of the extras stacked over the members.
+
+    Returns:
+        CPUDispatcher: The function batch_operating_point(t, x_guesses, batch_extras, rtol, atol, max_iterations),
+        that returns the states of shape (n_members, state_length) and the status of each member.
+    """
+    fct = _create_batch_operating_point(system_equation_inplace, jacobian, create_workspace, state_length, n_extras)
+    signature = nb.types.Tuple((float_base_type[:, ::1], nb.int64[::1]))(
+        float_base_type, float_base_type[:, ::1], batch_extra_type, float_base_type, float_base_type, nb.int64
+    )
+    return njit(fct, signature, parallel=True)
+
+
+def _create_batch_operating_point(system_equation_inplace, jacobian, create_workspace, state_length, n_extras):
+    """
+    exec(result, levenberg_marquardt, create_workspace, state_length, np, nb):
+
+        # levenberg_marquardt = create_levenberg_marquardt(system_equation_inplace, jacobian)
+        def batch_operating_point(t, x_guesses, batch_extras, rtol, atol, max_iterations):
+            n_members = x_guesses.shape[0]
+            states = np.empty((n_members, state_length))
+            status = np.empty(n_members, dtype=np.int64)
+            # The members are distributed over all cores
+            for member in nb.prange(n_members):
+                # Each extra is stacked over the members. Every member gets its own views as extras.
+                # global_extras = (batch_extras[{i}][member], ...)
+                global_extras = (batch_extras[0][member], batch_extras[1][member],)
+                x, member_status, _ = levenberg_marquardt(
+                    t, x_guesses[member], create_workspace(), global_extras, rtol, atol, max_iterations
+                )
+                states[member] = x
+                status[member] = member_status
+            return states, status
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(batch_operating_point)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    header = "def batch_operating_point(t, x_guesses, batch_extras, rtol, atol, max_iterations):\n"
+    body = spacing(1) + "n_members = x_guesses.shape[0]\n"
+    body += spacing(1) + "states = np.empty((n_members, state_length))\n"
+    body += spacing(1) + "status = np.empty(n_members, dtype=np.int64)\n"
+    body += spacing(1) + "for member in nb.prange(n_members):\n"
+    extras = ''.join(f'batch_extras[{i}][member], ' for i in range(n_extras))
+    body += spacing(2) + f"global_extras = ({extras})\n"
+    body += spacing(2) + "x, member_status, _ = levenberg_marquardt(t, x_guesses[member], create_workspace(), " \
+                         "global_extras, rtol, atol, max_iterations)\n"
+    body += spacing(2) + "states[member] = x\n"
+    body += spacing(2) + "status[member] = member_status\n"
+    return_line = spacing(1) + "return states, status\n"
+    appendix = "result.append(batch_operating_point)\n"
+    f = []
+    exec_generated(
+        header + body + return_line + appendix,
+        {
+            'levenberg_marquardt': create_levenberg_marquardt(system_equation_inplace, jacobian),
+            'create_workspace': create_workspace,
+            'state_length': state_length,
+            'result': f,
+            'np': np,
+            'nb': nb,
+        }
+    )
+    return f[0]
@@ -1,13 +1,16 @@
 import numba as nb
 import simba as sb
 from simba.types import float_array, float_base_type, int_array, int_base_type
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.core.function_factories.jacobian_factory import create_chain_rule
+from simba.core.function_factories.argument_slices import STATE, PARAMETERS, TARGET, INPUTS
 
 
 def create_output_function(output, global_extra_type):
     fct = _create_arbitrary_function(output)
     if type(output.output_equation) == nb.core.registry.CPUDispatcher:
-        signature = nb.none(float_base_type, float_array, float_array, int_array, global_extra_type)
-        fct = nb.njit(signature)(fct)
+        signature = nb.none(float_base_type, float_array, float_array, int_array, global_extra_type, nb.int64[::1])
+        fct = njit(fct, signature)
     return fct
 
 
@@ -17,60 +20,168 @@ def _create_arbitrary_function(output):
 
             output_equation = output.output_equation
 
-            # Write to local variables to speed up numba computation significantly
-            # input_function_{i} = input_functions[{i}]
-            input_slice_0 = output.component_inputs[0].external_output.local_slice
+            # Only the structure of the arguments is compiled into the function. Default values of unconnected inputs
+            # and tuple indices of the extras are constants.
             input_1 = output.component_inputs[1].default_value
-            input_slice_2 = output.component_inputs[0].external_output.local_slice
+            parameter_index = output.component.parameters.buffer_index
+            extra_data_index = output.component.extra_index
             # ...
 
-            def output_function(t, global_state, global_float_outputs, global_int_outputs, global_extras):
+            def output_function(t, global_state, global_float_outputs, global_int_outputs, global_extra_data, slices):
 
-                # input_{i} = input_function_{i}(t, global_state, global_extra_data)
-                input_0 = global_float_outputs[input_slice_0]
-                input_2 = global_int_outputs[input_slice_2]
+                # The slice bounds are passed as data (see argument_slices.create_argument_slices). So, all outputs
+                # of the same component type share one compiled function.
+                # All slices are contiguous. Basic slicing returns views without copying the data.
+                input_0 = global_float_outputs[slices[6]:slices[7]]
+                input_2 = global_int_outputs[slices[10]:slices[11]]
+                # Size-1 signals of scalar outputs are read as scalars: input_0 = global_float_outputs[slices[6]]
                 # ...
 
                 # Read local state and extra data from the global data structures
-                # Reading Extras and local state is optional, and executed only if the component has a state and extra
-                # data
-                local_state = global_state[local_state_indices]
+                # Reading Extras, parameters and local state is optional, and executed only if the component has a
+                # state, parameters and extra data
+                local_state = global_state[slices[0]:slices[1]]
+                parameters = global_extra_data[parameter_index][slices[2]:slices[3]]
                 extra_data = global_extra_data[extra_data_index]
 
-                global_float_outputs[local_slice] = output_equation(t, local_state, extra_data, input_0,input_1,input_2)
+                global_float_outputs[slices[4]:slices[5]] = output_equation(
+                    t, local_state, parameters, extra_data, input_0, input_1, input_2
+                )
 
             # Append the generated function to the (empty) result list to pass it back to the caller
             result.append(output_function)
         """
 
-    def spacing(no_of_spaces):
-        return ' ' * no_of_spaces
+    prior, reader, arguments = _create_argument_reader(output)
+    prior = "output_equation = output.output_equation\n" + prior
+    header = "def output_function(" \
+             "t, global_state, global_float_outputs, global_int_outputs, global_extra_data, slices):\n"
 
+    if output.dtype == float_base_type:
+        target = 'global_float_outputs'
+    elif output.dtype == int_base_type:
+        target = 'global_int_outputs'
+    else:
+        raise AssertionError(f'Illegal output dtype: {output.dtype}')
+    if output.scalar and output.size == 1:
+        writer = _spacing(1) + f'{target}[slices[{TARGET}]] = output_equation(t,{arguments})\n'
+    else:
+        writer = _spacing(1) + f'{target}[slices[{TARGET}]:slices[{TARGET + 1}]] = output_equation(t,{arguments})\n'
+    appendix = "result.append(output_function)"
+    fct = prior + header + reader + writer + appendix
+    f = []
+    exec_generated(
+        fct,
+        {
+            'result': f,
+            'output': output,
+            'nb': nb
+        }
+    )
+    return f[0]
+
+
+def create_output_jacobian_function(output, global_extra_type):
+    fct = _create_jacobian_function(output)
+    if type(output.jacobian_equation) == nb.core.registry.CPUDispatcher:
+        signature = nb.none(
+            float_base_type, float_array, float_array, int_array, float_array, global_extra_type, nb.int64[::1]
+        )
+        fct = njit(fct, signature)
+    return fct
+
+
+def _create_jacobian_function(output):
+    """
+        exec(result, output, chain rule constants):
+
+            jacobian_equation = output.jacobian_equation
+            # ...
+
+            def output_jacobian_function(
+                t, global_state, global_float_outputs, global_int_outputs, global_output_jacobians, global_extra_data,
+                slices
+            ):
+                # Read the arguments like the output function
+                input_0 = global_float_outputs[slices[6]:slices[7]]
+                # ...
+                local_jacobian = jacobian_equation(t, local_state, extra, input_0)
+
+                # Chain the local partial derivatives with the jacobians of the connected outputs and write the
+                # result into the block of this output in the global output jacobian buffer
+                # (see jacobian_factory.create_chain_rule)
+
+            # Append the generated function to the (empty) result list to pass it back to the caller
+            result.append(output_jacobian_function)
+        """
+    prior, reader, arguments = _create_argument_reader(output)
+    prior = "jacobian_equation = output.jacobian_equation\n" + prior
+    header = "def output_jacobian_function(" \
+             "t, global_state, global_float_outputs, global_int_outputs, global_output_jacobians, global_extra_data," \
+             " slices):\n"
+    evaluation = _spacing(1) + f"local_jacobian = jacobian_equation(t,{arguments})\n"
+    chain_rule, namespace = create_chain_rule(output, 'global_output_jacobians')
+    appendix = "result.append(output_jacobian_function)"
+    fct = prior + header + reader + evaluation + chain_rule + appendix
+    f = []
+    namespace.update({
+        'result': f,
+        'output': output,
+        'nb': nb
+    })
+    exec_generated(fct, namespace)
+    return f[0]
+
+
+def _spacing(no_of_spaces):
+    return ' ' * no_of_spaces
+
+
+def _create_argument_reader(output):
+    """Creates the code that reads the arguments of the output and jacobian equations from the global data.
+
+    Returns:
+        Tuple(str, str, str): The code executed before the function definition, the code in the function body that
+        reads the arguments and the argument list for the equation call.
+    """
     prior = ""
-    prior += "output_equation = output.output_equation\n"
-    prior += "output_slice = output.local_slice\n"
-    header = "def output_function(t, global_state, global_float_outputs, global_int_outputs, global_extra_data):\n"
     state = output.component.state
-    if state is not None:
-        prior += "local_state_indices = output.component.state.local_slice\n"
-        state_reader = spacing(1) + "local_state = global_state[local_state_indices]\n"
+    if state is not None and output.scalar and state.size == 1:
+        state_reader = _spacing(1) + f"local_state = global_state[slices[{STATE}]]\n"
+        state_signature = " local_state,"
+    elif state is not None:
+        state_reader = _spacing(1) + f"local_state = global_state[slices[{STATE}]:slices[{STATE + 1}]]\n"
         state_signature = " local_state,"
     else:
         state_reader = ""
         state_signature = ""
 
+    parameters = output.component.parameters
+    if parameters is not None:
+        prior += "parameter_index = output.component.parameters.buffer_index\n"
+        state_reader += _spacing(1) \
+            + f"parameters = global_extra_data[parameter_index][slices[{PARAMETERS}]:slices[{PARAMETERS + 1}]]\n"
+        state_signature += " parameters,"
+
     input_reader = ""
     input_signature = ""
     for i, input_ in enumerate(output.component_inputs):
         if input_.connected:
-            prior += f"input_slice_{i} = output.component_inputs[{i}].external_output.local_slice\n"
             if input_.dtype == float_base_type:
                 arr = 'global_float_outputs'
             elif input_.dtype == int_base_type:
                 arr = 'global_int_outputs'
             else:
                 raise AttributeError(f'Illegal dtype of input {input_.name}: {input_.dtype}. Must be float or int')
-            input_reader += spacing(1) + f'input_{i} = {arr}[input_slice_{i}]\n'
+            start = INPUTS + 2 * i
+            if output.scalar and input_.size == 1:
+                input_reader += _spacing(1) + f'input_{i} = {arr}[slices[{start}]]\n'
+            else:
+                input_reader += _spacing(1) + f'input_{i} = {arr}[slices[{start}]:slices[{start + 1}]]\n'
+            input_signature += f" input_{i}, "
+        elif output.scalar and input_.size == 1:
+            # Scalar default values are constants and are passed without allocating an array
+            prior += f'input_{i} = output.component_inputs[{i}].default_value.item()\n'
             input_signature += f" input_{i}, "
         else:
             prior += f'input_{i} = output.component_inputs[{i}].default_value\n'
@@ -78,29 +189,9 @@ def _create_arbitrary_function(output):
 
     if output.component.extra_index is not None:
         prior += "extra_data_index = output.component.extra_index\n"
-        extras_reader = spacing(1) + f"extra = global_extra_data[extra_data_index]\n"
+        extras_reader = _spacing(1) + f"extra = global_extra_data[extra_data_index]\n"
         extras_signature = "extra, "
     else:
         extras_reader = ""
         extras_signature = ""
-
-    if output.dtype == float_base_type:
-        target = 'global_float_outputs'
-    elif output.dtype == int_base_type:
-        target = 'global_int_outputs'
-    else:
-        raise AssertionError(f'Illegal output dtype: {output.dtype}')
-    writer = spacing(1)\
-        + f'{target}[output_slice] = output_equation(t,{state_signature}{extras_signature}{input_signature})\n'
-    appendix = "result.append(output_function)"
-    fct = prior + header + state_reader + input_reader + extras_reader + writer + appendix
-    f = []
-    exec(
-        fct,
-        {
-            'result': f,
-            'output': output,
-            'nb': nb
-        }
-    )
-    return f[0]
+    return prior, state_reader + input_reader + extras_reader, state_signature + extras_signature + input_signature
@@ -0,0 +1,514 @@
+import numba as nb
+import numpy as np
+
+from simba.types import float_base_type, float_array
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.solvers.events import first_sample_counts, due_tasks, event_crossed
+from simba.solvers.dormand_prince import create_dopri5
+from simba.solvers.bdf import create_bdf
+
+# Butcher tableaus of the explicit fixed step methods: (a, b, c)
+_butcher_tableaus = {
+    'euler': (
+        (),
+        (1.0,),
+        (0.0,)
+    ),
+    'heun': (
+        ((1.0,),),
+        (0.5, 0.5),
+        (0.0, 1.0)
+    ),
+    'rk4': (
+        ((0.5,), (0.0, 0.5), (0.0, 0.0, 1.0)),
+        (1.0 / 6.0, 1.0 / 3.0, 1.0 / 3.0, 1.0 / 6.0),
+        (0.0, 0.5, 0.5, 1.0)
+    ),
+}
+
+fixed_step_methods = tuple(_butcher_tableaus.keys())
+
+
+def create_fixed_step_simulation(
+    system_equation_inplace, create_workspace, method, state_length, global_extra_type, log_step=None,
+    log_last_step=True, nogil=False, events=None, discrete=None
+):
+    """Creates the compiled simulation of the whole trajectory with an explicit fixed step method.
+
+    Zero crossings of events and sample hits of discrete updates are handled at the grid points. A zero crossing
+    within a step triggers the update of the event at the end of the step. Sample hits between the grid points are
+    executed at the next grid point.
+
+    Args:
+        log_step(Callable): The log function of the loggers of the system (see create_log_function). None without
+            loggers.
+        log_last_step(bool): Flag, if the last point of the trajectory is logged. Otherwise, only the start points of
+            the steps are logged, e.g. to continue the trajectory with another call.
+        events(tuple): The zero crossing events (evaluate_events, apply_event, directions) of the system (see
+            create_event_functions). None without events.
+        discrete(tuple): The discrete updates (discrete_update, periods, offsets) of the system (see
+            create_discrete_update). None without discrete updates.
+        nogil(bool): Flag, if the compiled simulation releases the GIL, e.g. to write results in another thread.
+
+    Returns:
+        Callable(t0, dt, n_steps, x0, global_extras) -> np.ndarray: The simulation returning the states.
+    """
+    assert method in _butcher_tableaus, \
+        f'Unknown fixed step method {method}. Choose one of {fixed_step_methods}.'
+    fct = _create_fixed_step_simulation(
+        system_equation_inplace, create_workspace, method, state_length, log_step, log_last_step, events, discrete
+    )
+    if type(system_equation_inplace) == nb.core.registry.CPUDispatcher:
+        signature = float_base_type[:, ::1](float_base_type, float_base_type, nb.int64, float_array, global_extra_type)
+        fct = njit(fct, signature, nogil=nogil)
+    return fct
+
+
+def _create_fixed_step_simulation(
+    system_equation_inplace, create_workspace, method, state_length, log_step=None, log_last_step=True, events=None,
+    discrete=None
+):
+    """
+    exec(result, system_equation_inplace, create_workspace, state_length, np, log_step, events and discrete updates):
+
+        def simulation(t0, dt, n_steps, x0, global_extras):
+            # All buffers are allocated once before the time loop
+            states = np.empty((n_steps, state_length))
+            workspace = create_workspace()
+            state = x0.copy()
+            stage_state = np.empty(state_length)
+            k_0 = np.empty(state_length)
+            k_1 = np.empty(state_length)
+            states[0] = state
+            # Only with discrete updates: The number of the next sample hit of each task
+            counts = first_sample_counts(t0, periods, offsets)
+            due = np.zeros(periods.shape[0], dtype=np.bool_)
+            # Only with events: The values of the event equations at the start of the last step
+            old_values = np.empty(directions.shape[0])
+            new_values = np.empty(directions.shape[0])
+            evaluate_events(t0, state, workspace, global_extras, old_values, False)
+            for step in range(1, n_steps):
+                t = t0 + (step - 1) * dt
+                # Only with discrete updates: The due updates are executed before the step
+                if due_tasks(t, periods, offsets, counts, due):
+                    discrete_update(t, state, workspace, global_extras, due)
+                    states[step - 1] = state
+
+                # One stage per row of the Butcher tableau (here: Heun's method)
+                # stage_state = state + dt * (a_{i,0} * k_0 + ...)
+                # system_equation_inplace(t + c_{i} * dt, stage_state, k_{i}, workspace, global_extras)
+                system_equation_inplace(t, state, k_0, workspace, global_extras)
+                # Only with events: The updates of the events, that crossed zero during the last step, are applied
+                evaluate_events(t, state, workspace, global_extras, new_values, True)
+                updated = False
+                for j in range(directions.shape[0]):
+                    if event_crossed(old_values[j], new_values[j], directions[j]):
+                        apply_event(j, t, state, workspace, global_extras)
+                        updated = True
+                if updated:
+                    states[step - 1] = state
+                    system_equation_inplace(t, state, k_0, workspace, global_extras)
+                    evaluate_events(t, state, workspace, global_extras, new_values, True)
+                old_values[:] = new_values
+                # Only with loggers: The first stage is evaluated at the accepted state of the last step
+                log_step(t, state, workspace, global_extras, True)
+                for i in range(state_length):
+                    stage_state[i] = state[i] + dt * (1.0 * k_0[i])
+                system_equation_inplace(t + 1.0 * dt, stage_state, k_1, workspace, global_extras)
+
+                # state = state + dt * (b_0 * k_0 + b_1 * k_1 + ...)
+                for i in range(state_length):
+                    state[i] += dt * (0.5 * k_0[i] + 0.5 * k_1[i])
+                states[step] = state
+            # Only with loggers and log_last_step: The outputs of the last state are computed once more
+            log_step(t0 + (n_steps - 1) * dt, state, workspace, global_extras, False)
+            return states
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(simulation)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    a, b, c = _butcher_tableaus[method]
+    header = "def simulation(t0, dt, n_steps, x0, global_extras):\n"
+    initialization = spacing(1) + "states = np.empty((n_steps, state_length))\n"
+    initialization += spacing(1) + "workspace = create_workspace()\n"
+    initialization += spacing(1) + "state = x0.copy()\n"
+    initialization += spacing(1) + "stage_state = np.empty(state_length)\n"
+    for i in range(len(b)):
+        initialization += spacing(1) + f"k_{i} = np.empty(state_length)\n"
+    initialization += spacing(1) + "states[0] = state\n"
+    namespace = {
+        'system_equation_inplace': system_equation_inplace,
+        'create_workspace': create_workspace,
+        'state_length': state_length,
+        'log_step': log_step,
+        'np': np,
+    }
+    if discrete is not None:
+        namespace.update(
+            discrete_update=discrete[0], periods=discrete[1], offsets=discrete[2],
+            first_sample_counts=first_sample_counts, due_tasks=due_tasks
+        )
+        initialization += spacing(1) + "counts = first_sample_counts(t0, periods, offsets)\n"
+        initialization += spacing(1) + "due = np.zeros(periods.shape[0], dtype=np.bool_)\n"
+    if events is not None:
+        namespace.update(
+            evaluate_events=events[0], apply_event=events[1], directions=events[2], event_crossed=event_crossed
+        )
+        initialization += spacing(1) + "old_values = np.empty(directions.shape[0])\n"
+        initialization += spacing(1) + "new_values = np.empty(directions.shape[0])\n"
+        initialization += spacing(1) + "evaluate_events(t0, state, workspace, global_extras, old_values, False)\n"
+    loop = spacing(1) + "for step in range(1, n_steps):\n"
+    loop += spacing(2) + "t = t0 + (step - 1) * dt\n"
+    if discrete is not None:
+        loop += spacing(2) + "if due_tasks(t, periods, offsets, counts, due):\n"
+        loop += spacing(3) + "discrete_update(t, state, workspace, global_extras, due)\n"
+        loop += spacing(3) + "states[step - 1] = state\n"
+    loop += spacing(2) + "system_equation_inplace(t, state, k_0, workspace, global_extras)\n"
+    if events is not None:
+        loop += spacing(2) + "evaluate_events(t, state, workspace, global_extras, new_values, True)\n"
+        loop += spacing(2) + "updated = False\n"
+        loop += spacing(2) + "for j in range(directions.shape[0]):\n"
+        loop += spacing(3) + "if event_crossed(old_values[j], new_values[j], directions[j]):\n"
+        loop += spacing(4) + "apply_event(j, t, state, workspace, global_extras)\n"
+        loop += spacing(4) + "updated = True\n"
+        loop += spacing(2) + "if updated:\n"
+        loop += spacing(3) + "states[step - 1] = state\n"
+        loop += spacing(3) + "system_equation_inplace(t, state, k_0, workspace, global_extras)\n"
+        loop += spacing(3) + "evaluate_events(t, state, workspace, global_extras, new_values, True)\n"
+        loop += spacing(2) + "old_values[:] = new_values\n"
+    if log_step is not None:
+        loop += spacing(2) + "log_step(t, state, workspace, global_extras, True)\n"
+    for i, a_i in enumerate(a, start=1):
+        increment = ' + '.join(f'{a_ij!r} * k_{j}[i]' for j, a_ij in enumerate(a_i) if a_ij != 0.0)
+        loop += spacing(2) + "for i in range(state_length):\n"
+        loop += spacing(3) + f"stage_state[i] = state[i] + dt * ({increment})\n"
+        loop += spacing(2) \
+            + f"system_equation_inplace(t + {c[i]!r} * dt, stage_state, k_{i}, workspace, global_extras)\n"
+    increment = ' + '.join(f'{b_i!r} * k_{i}[i]' for i, b_i in enumerate(b) if b_i != 0.0)
+    loop += spacing(2) + "for i in range(state_length):\n"
+    loop += spacing(3) + f"state[i] += dt * ({increment})\n"
+    loop += spacing(2) + "states[step] = state\n"
+    if log_step is not None and log_last_step:
+        loop += spacing(1) + "log_step(t0 + (n_steps - 1) * dt, state, workspace, global_extras, False)\n"
+    return_line = spacing(1) + "return states\n"
+    appendix = "result.append(simulation)\n"
+    simulation_code = header + initialization + loop + return_line + appendix
+    f = []
+    namespace['result'] = f
+    exec_generated(simulation_code, namespace)
+    return f[0]
+
+
+def create_adaptive_simulation(
+    system_equation_inplace, create_workspace, global_extra_type, log_step=None, events=None, discrete=None
+):
+    """Creates the compiled simulation of a system with the adaptive Dormand-Prince method (see create_dopri5).
+
+    The system equation, the log function and the functions of the events and the discrete updates are bound in the
+    closure of the integration (see create_dopri5), that is a global of the generated wrapper. So, no compiled function
+    is passed as argument and the simulation can be loaded from the compilation cache.
+
+    Args:
+        log_step(Callable): The log function of the loggers of the system. None without loggers.
+        events(tuple): The zero crossing events (evaluate_events, apply_event, directions) of the system (see
+            create_event_functions). None without events.
+        discrete(tuple): The discrete updates (discrete_update, periods, offsets) of the system (see
+            create_discrete_update). None without discrete updates.
+
+    Returns:
+        Callable(t0, t1, x0, t_eval, global_extras, rtol, atol, max_step): The simulation returning the times and the
+        states of the accepted steps, the states on the output grid t_eval and the status of the integration.
+    """
+    fct = _create_adaptive_simulation(system_equation_inplace, create_workspace, log_step, events, discrete)
+    if type(system_equation_inplace) == nb.core.registry.CPUDispatcher:
+        signature = nb.types.Tuple(
+            (float_base_type[::1], float_base_type[:, ::1], float_base_type[:, ::1], nb.int64)
+        )(
+            float_base_type, float_base_type, float_array, float_array, global_extra_type, float_base_type,
+            float_base_type, float_base_type
+        )
+        fct = njit(fct, signature, nogil=True)
+    return fct
+
+
+def _create_adaptive_simulation(system_equation_inplace, create_workspace, log_step=None, events=None, discrete=None):
+    """
+    exec(result, dopri5, create_workspace):
+
+        # dopri5 = create_dopri5(system_equation_inplace, log_step, *events, *discrete)
+        def simulation(t0, t1, x0, t_eval, global_extras, rtol, atol, max_step):
+            return dopri5(t0, t1, x0, t_eval, create_workspace(), global_extras, rtol, atol, 0.0, max_step)
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(simulation)
+    """
+    evaluate_events, apply_event, directions = events if events is not None else (None, None, None)
+    discrete_update, periods, offsets = discrete if discrete is not None else (None, None, None)
+    dopri5 = create_dopri5(
+        system_equation_inplace, log_step, evaluate_events, apply_event, directions, discrete_update, periods, offsets
+    )
+    code = "def simulation(t0, t1, x0, t_eval, global_extras, rtol, atol, max_step):\n"
+    code += " return dopri5(t0, t1, x0, t_eval, create_workspace(), global_extras, rtol, atol, 0.0, max_step)\n"
+    code += "result.append(simulation)\n"
+    f = []
+    exec_generated(code, {'dopri5': dopri5, 'create_workspace': create_workspace, 'result': f})
+    return f[0]
+
+
+def create_implicit_simulation(system_equation_inplace, jacobian, create_workspace, global_extra_type, log_step=None):
+    """Creates the compiled simulation of a stiff system with a backward differentiation formula (see create_bdf).
+
+    The system equation, the dense jacobian and the log function are bound in the closure of the integration, that is
+    a global of the generated wrapper. So, the simulation can be loaded from the compilation cache.
+
+    Args:
+        jacobian(CPUDispatcher): The dense jacobian of the system jacobian(t, global_state, global_extras) -> J.
+        log_step(Callable): The log function of the loggers of the system. None without loggers.
+
+    Returns:
+        Callable(t0, dt, n_steps, x0, global_extras, order, rtol, atol): The simulation returning the states, the
+        status of the integration and the number of jacobian evaluations.
+    """
+    fct = _create_implicit_simulation(system_equation_inplace, jacobian, create_workspace, log_step)
+    signature = nb.types.Tuple((float_base_type[:, :], nb.int64, nb.int64))(
+        float_base_type, float_base_type, nb.int64, float_array, global_extra_type, nb.int64, float_base_type,
+        float_base_type
+    )
+    return njit(fct, signature, nogil=True)
+
+
+def _create_implicit_simulation(system_equation_inplace, jacobian, create_workspace, log_step=None):
+    """
+    exec(result, bdf, create_workspace):
+
+        # bdf = create_bdf(system_equation_inplace, jacobian, log_step)
+        def simulation(t0, dt, n_steps, x0, global_extras, order, rtol, atol):
+            return bdf(t0, dt, n_steps, x0, create_workspace(), global_extras, order, rtol, atol)
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(simulation)
+    """
+    bdf = create_bdf(system_equation_inplace, jacobian, log_step)
+    code = "def simulation(t0, dt, n_steps, x0, global_extras, order, rtol, atol):\n"
+    code += " return bdf(t0, dt, n_steps, x0, create_workspace(), global_extras, order, rtol, atol)\n"
+    code += "result.append(simulation)\n"
+    f = []
+    exec_generated(code, {'bdf': bdf, 'create_workspace': create_workspace, 'result': f})
+    return f[0]
+
+
+def create_multirate_simulation(
+    group_equations, group_indices, group_steps, create_workspace, method, state_length, global_extra_type,
+    log_step=None
+):
+    """Creates the compiled simulation of a system, whose states are integrated in rate groups with their own steps.
+
+    The groups are integrated one after another over a macro step, that is the largest step of all groups, starting
+    with the fastest group. During the steps of a group, the states of the faster groups are interpolated linearly
+    between the start and the end of the macro step. The states of the slower groups are extrapolated linearly with
+    their derivatives at the start of the macro step. Each group evaluates only its own state functions and the
+    outputs they depend on.
+
+    Args:
+        group_equations(Tuple[Callable]): The in-place system equation of each group, that computes the derivatives of
+            the states of the group only.
+        group_indices(Tuple[np.ndarray]): The indices of the states of each group in the global state.
+        group_steps(Tuple[float]): The step size of each group in ascending order. All steps divide the last one.
+        method(str): The explicit fixed step method of all groups.
+        log_step(Callable): The log function of the loggers of the system, that is called at the macro steps.
+
+    Returns:
+        Callable(t0, n_steps, x0, global_extras) -> np.ndarray: The simulation returning the states at the macro
+        steps.
+    """
+    assert method in _butcher_tableaus, \
+        f'Unknown fixed step method {method}. Choose one of {fixed_step_methods}.'
+    fct = _create_multirate_simulation(
+        group_equations, group_indices, group_steps, create_workspace, method, state_length, log_step
+    )
+    if all(type(equation) == nb.core.registry.CPUDispatcher for equation in group_equations):
+        signature = float_base_type[:, ::1](float_base_type, nb.int64, float_array, global_extra_type)
+        fct = njit(fct, signature)
+    return fct
+
+
+def _create_multirate_simulation(
+    group_equations, group_indices, group_steps, create_workspace, method, state_length, log_step=None
+):
+    """
+    exec(result, group equations, group indices, create_workspace, state_length, np, log_step):
+
+        def simulation(t0, n_steps, x0, global_extras):
+            states = np.empty((n_steps, state_length))
+            workspace = create_workspace()
+            # Each group computes and caches the outputs it reads in its own buffers. In shared buffers, a cached
+            # time-only output would hold the value, that another group wrote at a different time.
+            workspace_0 = create_workspace()
+            workspace_1 = create_workspace()
+            state = x0.copy()
+            start = np.empty(state_length)
+            slopes = np.zeros(state_length)
+            stage_state = np.empty(state_length)
+            k_0 = np.zeros(state_length)
+            states[0] = state
+            for step in range(1, n_steps):
+                t_macro = t0 + (step - 1) * 0.001
+                start[:] = state
+                # Only with loggers
+                log_step(t_macro, state, workspace, global_extras, False)
+                # The derivatives of all but the fastest group at the start of the macro step
+                group_equation_1(t_macro, state, slopes, workspace_1, global_extras)
+
+                # The fastest group extrapolates the states of all slower groups (here: explicit Euler)
+                for sub in range(100):
+                    t = t_macro + sub * 1e-05
+                    stage_state[:] = state
+                    for i in slower_indices_0:
+                        stage_state[i] = start[i] + (t - t_macro) * slopes[i]
+                    group_equation_0(t, stage_state, k_0, workspace_0, global_extras)
+                    for i in group_indices_0:
+                        state[i] += 1e-05 * (1.0 * k_0[i])
+
+                # The slower groups interpolate the states of all faster groups
+                for sub in range(1):
+                    t = t_macro + sub * 0.001
+                    stage_state[:] = state
+                    fraction = (t - t_macro) / 0.001
+                    for i in faster_indices_1:
+                        stage_state[i] = start[i] + fraction * (state[i] - start[i])
+                    group_equation_1(t, stage_state, k_0, workspace_1, global_extras)
+                    for i in group_indices_1:
+                        state[i] += 0.001 * (1.0 * k_0[i])
+                states[step] = state
+            # Only with loggers
+            log_step(t0 + (n_steps - 1) * 0.001, state, workspace, global_extras, False)
+            return states
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(simulation)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    a, b, c = _butcher_tableaus[method]
+    macro_step = group_steps[-1]
+    no_indices = np.zeros(0, dtype=np.int64)
+    namespace = {
+        'create_workspace': create_workspace,
+        'state_length': state_length,
+        'log_step': log_step,
+        'np': np,
+    }
+    code = "def simulation(t0, n_steps, x0, global_extras):\n"
+    code += spacing(1) + "states = np.empty((n_steps, state_length))\n"
+    code += spacing(1) + "workspace = create_workspace()\n"
+    for g in range(len(group_equations)):
+        code += spacing(1) + f"workspace_{g} = create_workspace()\n"
+    code += spacing(1) + "state = x0.copy()\n"
+    code += spacing(1) + "start = np.empty(state_length)\n"
+    code += spacing(1) + "slopes = np.zeros(state_length)\n"
+    code += spacing(1) + "stage_state = np.empty(state_length)\n"
+    for i in range(len(b)):
+        code += spacing(1) + f"k_{i} = np.zeros(state_length)\n"
+    code += spacing(1) + "states[0] = state\n"
+    code += spacing(1) + "for step in range(1, n_steps):\n"
+    code += spacing(2) + f"t_macro = t0 + (step - 1) * {macro_step!r}\n"
+    code += spacing(2) + "start[:] = state\n"
+    if log_step is not None:
+        code += spacing(2) + "log_step(t_macro, state, workspace, global_extras, False)\n"
+    for g in range(1, len(group_equations)):
+        code += spacing(2) + f"group_equation_{g}(t_macro, state, slopes, workspace_{g}, global_extras)\n"
+    for g, (equation, indices, h) in enumerate(zip(group_equations, group_indices, group_steps)):
+        namespace[f'group_equation_{g}'] = equation
+        namespace[f'group_indices_{g}'] = indices
+        namespace[f'faster_indices_{g}'] = np.concatenate((no_indices,) + group_indices[:g])
+        namespace[f'slower_indices_{g}'] = np.concatenate((no_indices,) + group_indices[g + 1:])
+        code += spacing(2) + f"for sub in range({int(round(macro_step / h))}):\n"
+        code += spacing(3) + f"t = t_macro + sub * {h!r}\n"
+        code += spacing(3) + "stage_state[:] = state\n"
+        for i in range(len(b)):
+            if g > 0:
+                code += spacing(3) + f"fraction = (t + {c[i] * h!r} - t_macro) / {macro_step!r}\n"
+                code += spacing(3) + f"for i in faster_indices_{g}:\n"
+                code += spacing(4) + "stage_state[i] = start[i] + fraction * (state[i] - start[i])\n"
+            if g < len(group_equations) - 1:
+                code += spacing(3) + f"for i in slower_indices_{g}:\n"
+                code += spacing(4) + f"stage_state[i] = start[i] + (t + {c[i] * h!r} - t_macro) * slopes[i]\n"
+            if i > 0:
+                increment = ' + '.join(f'{a_ij!r} * k_{j}[i]' for j, a_ij in enumerate(a[i - 1]) if a_ij != 0.0)
+                code += spacing(3) + f"for i in group_indices_{g}:\n"
+                code += spacing(4) + f"stage_state[i] = state[i] + {h!r} * ({increment})\n"
+            code += spacing(3) \
+                + f"group_equation_{g}(t + {c[i] * h!r}, stage_state, k_{i}, workspace_{g}, global_extras)\n"
+        increment = ' + '.join(f'{b_i!r} * k_{i}[i]' for i, b_i in enumerate(b) if b_i != 0.0)
+        code += spacing(3) + f"for i in group_indices_{g}:\n"
+        code += spacing(4) + f"state[i] += {h!r} * ({increment})\n"
+    code += spacing(2) + "states[step] = state\n"
+    if log_step is not None:
+        code += spacing(1) + f"log_step(t0 + (n_steps - 1) * {macro_step!r}, state, workspace, global_extras, False)\n"
+    code += spacing(1) + "return states\n"
+    code += "result.append(simulation)\n"
+    f = []
+    namespace['result'] = f
+    exec_generated(code, namespace)
+    return f[0]
+
+
+def create_batch_simulation(simulation, state_length, n_extras, batch_extra_type):
+    fct = _create_batch_simulation(simulation, state_length, n_extras)
+    if type(simulation) == nb.core.registry.CPUDispatcher:
+        signature = float_base_type[:, :, ::1](
+            float_base_type, float_base_type, nb.int64, float_base_type[:, ::1], batch_extra_type
+        )
+        fct = njit(fct, signature, parallel=True)
+    return fct
+
+
+def _create_batch_simulation(simulation, state_length, n_extras):
+    """
+    exec(result, simulation, state_length, np, nb):
+
+        def batch_simulation(t0, dt, n_steps, x0s, batch_extras):
+            n_members = x0s.shape[0]
+            states = np.empty((n_members, n_steps, state_length))
+            # The members are distributed over all cores
+            for member in nb.prange(n_members):
+                # Each extra is stacked over the members. Every member gets its own views as extras.
+                # global_extras = (batch_extras[{i}][member], ...)
+                global_extras = (batch_extras[0][member], batch_extras[1][member],)
+                states[member] = simulation(t0, dt, n_steps, x0s[member], global_extras)
+            return states
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(batch_simulation)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    header = "def batch_simulation(t0, dt, n_steps, x0s, batch_extras):\n"
+    body = spacing(1) + "n_members = x0s.shape[0]\n"
+    body += spacing(1) + "states = np.empty((n_members, n_steps, state_length))\n"
+    body += spacing(1) + "for member in nb.prange(n_members):\n"
+    extras = ''.join(f'batch_extras[{i}][member], ' for i in range(n_extras))
+    body += spacing(2) + f"global_extras = ({extras})\n"
+    body += spacing(2) + "states[member] = simulation(t0, dt, n_steps, x0s[member], global_extras)\n"
+    return_line = spacing(1) + "return states\n"
+    appendix = "result.append(batch_simulation)\n"
+    f = []
+    exec_generated(
+        header + body + return_line + appendix,
+        {
+            'simulation': simulation,
+            'state_length': state_length,
+            'result': f,
+            'np': np,
+            'nb': nb,
+        }
+    )
+    return f[0]
@@ -3,6 +3,9 @@ import numpy as np
 
 import simba as sb
 from simba.types import float_array, float_base_type, int_array, int_base_type
+from simba.core.function_factories.compilation_cache import njit, exec_generated
+from simba.core.function_factories.jacobian_factory import create_chain_rule
+from simba.core.function_factories.argument_slices import STATE, PARAMETERS, TARGET, INPUTS
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -13,8 +16,10 @@ def create_state_function(state, global_extra_type):
 
     fct = _create_state_function(state)
     if type(state.state_equation) == nb.core.registry.CPUDispatcher:
-        signature = nb.none(float_base_type, float_array, float_array, int_array, float_array, global_extra_type)
-        fct = nb.njit(signature)(fct)
+        signature = nb.none(
+            float_base_type, float_array, float_array, int_array, float_array, global_extra_type, nb.int64[::1]
+        )
+        fct = njit(fct, signature)
     return fct
 
 
@@ -22,76 +27,160 @@ def _create_state_function(state: 'State'):
     """
         exec(result, state):
 
-            # Write to local variables to speed up numba computation significantly
-            # input_function_{i} = input_functions[{i}]
-            input_slice_0 = state.component_inputs[0].external_output.local_output_slice
+            # Only the structure of the arguments is compiled into the function. Default values of unconnected inputs
+            # and tuple indices of the extras are constants.
             input_1 = state.component_inputs[1].default_value
+            parameter_index = state.component.parameters.buffer_index
+            extra_index = state.component.extra_index
             # ...
 
             def state_function(
-                t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras
+                t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras, slices
             ):
 
-                # input_{i} = input_function_{i}(t, global_state, global_extras)
-                input_0 = global_float_output[input_slice_0]
-
+                # The slice bounds are passed as data (see argument_slices.create_argument_slices)
+                input_0 = global_float_outputs[slices[6]:slices[7]]
+                # Size-1 signals of scalar states are read as scalars: input_0 = global_float_outputs[slices[6]]
                 # ...
 
                 # Read local state and extra data from the global data structures
-                local_state = global_state[local_state_indices]
+                local_state = global_state[slices[0]:slices[1]]
+                parameters = global_extras[parameter_index][slices[2]:slices[3]]
                 extra = global_extras[extra_index]
 
-                global_derivatives[local_state_indices] = state_equation(t, local_state, extra, input_0, input_1)
+                global_derivatives[slices[4]:slices[5]] = state_equation(
+                    t, local_state, parameters, extra, input_0, input_1
+                )
 
             # Append the generated function to the (empty) result list to pass it back to the caller
             result.append(state_function)
         """
-    def spacing(no_of_spaces):
-        return ' ' * no_of_spaces
-
+    prior, reader, arguments = _create_argument_reader(state)
+    prior = "state_equation = state.state_equation\n" + prior
     header = "def state_function(t, global_state, global_float_outputs, global_int_outputs, global_derivatives," \
-             " global_extras):\n"
-    state_reader = spacing(1) + "local_state = global_state[local_state_indices]\n"
+             " global_extras, slices):\n"
+    if state.scalar and state.size == 1:
+        return_line = _spacing(1) + f"global_derivatives[slices[{TARGET}]] = state_equation(t,{arguments})\n"
+    else:
+        return_line = _spacing(1) \
+            + f"global_derivatives[slices[{TARGET}]:slices[{TARGET + 1}]] = state_equation(t,{arguments})\n"
+
+    appendix = "result.append(state_function)\n"
+    fct = prior + header + reader + return_line + appendix
+    f = []
+    exec_generated(
+        fct,
+        {
+            'result': f,
+            'state': state
+        }
+    )
+    return f[0]
+
+
+def create_state_jacobian_function(state, global_extra_type):
+    fct = _create_jacobian_function(state)
+    if type(state.jacobian_equation) == nb.core.registry.CPUDispatcher:
+        signature = nb.none(
+            float_base_type, float_array, float_array, int_array, float_array, float_array, global_extra_type,
+            nb.int64[::1]
+        )
+        fct = njit(fct, signature)
+    return fct
+
+
+def _create_jacobian_function(state: 'State'):
+    """
+        exec(result, state, chain rule constants):
+
+            jacobian_equation = state.jacobian_equation
+            # ...
+
+            def state_jacobian_function(
+                t, global_state, global_float_outputs, global_int_outputs, global_output_jacobians,
+                global_state_jacobian, global_extras, slices
+            ):
+                # Read the arguments like the state function
+                local_state = global_state[slices[0]:slices[1]]
+                input_0 = global_float_outputs[slices[6]:slices[7]]
+                # ...
+                local_jacobian = jacobian_equation(t, local_state, extra, input_0)
+
+                # Chain the local partial derivatives with the jacobians of the connected outputs and write the
+                # resulting rows into the CSR data of the global state jacobian
+                # (see jacobian_factory.create_chain_rule)
+
+            # Append the generated function to the (empty) result list to pass it back to the caller
+            result.append(state_jacobian_function)
+        """
+    prior, reader, arguments = _create_argument_reader(state)
+    prior = "jacobian_equation = state.jacobian_equation\n" + prior
+    header = "def state_jacobian_function(t, global_state, global_float_outputs, global_int_outputs," \
+             " global_output_jacobians, global_state_jacobian, global_extras, slices):\n"
+    evaluation = _spacing(1) + f"local_jacobian = jacobian_equation(t,{arguments})\n"
+    chain_rule, namespace = create_chain_rule(state, 'global_state_jacobian')
+    appendix = "result.append(state_jacobian_function)\n"
+    fct = prior + header + reader + evaluation + chain_rule + appendix
+    f = []
+    namespace.update({
+        'result': f,
+        'state': state
+    })
+    exec_generated(fct, namespace)
+    return f[0]
+
+
+def _spacing(no_of_spaces):
+    return ' ' * no_of_spaces
+
+
+def _create_argument_reader(state: 'State'):
+    """Creates the code that reads the arguments of the state and jacobian equations from the global data.
+
+    Returns:
+        Tuple(str, str, str): The code executed before the function definition, the code in the function body that
+        reads the arguments and the argument list for the equation call.
+    """
+    if state.scalar and state.size == 1:
+        state_reader = _spacing(1) + f"local_state = global_state[slices[{STATE}]]\n"
+    else:
+        state_reader = _spacing(1) + f"local_state = global_state[slices[{STATE}]:slices[{STATE + 1}]]\n"
     state_signature = " local_state,"
 
     input_reader = ""
     input_signature = ""
     prior = ""
-    prior += "local_state_indices = state.local_slice\n"
-    prior += "state_equation = state.state_equation\n"
+    parameters = state.component.parameters
+    if parameters is not None:
+        prior += "parameter_index = state.component.parameters.buffer_index\n"
+        state_reader += _spacing(1) \
+            + f"parameters = global_extras[parameter_index][slices[{PARAMETERS}]:slices[{PARAMETERS + 1}]]\n"
+        state_signature += " parameters,"
     for i, input_ in enumerate(state.component_inputs):
         if input_.connected:
-            prior += f"input_slice_{i} = state.component_inputs[{i}].external_output.local_slice\n"
             if input_.dtype == float_base_type:
                 arr = 'global_float_outputs'
             elif input_.dtype == int_base_type:
                 arr = 'global_int_outputs'
             else:
                 raise AttributeError(f'Illegal dtype of input {input_.name}: {input_.dtype}. Must be float or int')
-            input_reader += spacing(1) + f'input_{i} = {arr}[input_slice_{i}]\n'
+            start = INPUTS + 2 * i
+            if state.scalar and input_.size == 1:
+                input_reader += _spacing(1) + f'input_{i} = {arr}[slices[{start}]]\n'
+            else:
+                input_reader += _spacing(1) + f'input_{i} = {arr}[slices[{start}]:slices[{start + 1}]]\n'
+        elif state.scalar and input_.size == 1:
+            prior += f'input_{i} = state.component_inputs[{i}].default_value.item()\n'
         else:
-            prior += f'input_{i} = output.component_inputs[{i}].default_value\n'
+            prior += f'input_{i} = state.component_inputs[{i}].default_value\n'
 
         input_signature += f" input_{i}, "
 
     if state.component.extra_index is not None:
-        extra_reader = spacing(1) + f"extra =  global_extras[extra_index]\n"
+        prior += "extra_index = state.component.extra_index\n"
+        extra_reader = _spacing(1) + f"extra = global_extras[extra_index]\n"
         extra_signature = "extra, "
     else:
         extra_signature = ""
         extra_reader = ""
-
-    return_line = spacing(1) + f"global_derivatives[local_state_indices] = " \
-        f"state_equation(t,{state_signature}{extra_signature}{input_signature})\n"
-
-    appendix = "result.append(state_function)\n"
-    fct = prior + header + state_reader + input_reader + extra_reader + return_line + appendix
-    f = []
-    exec(
-        fct,
-        {
-            'result': f,
-            'state': state
-        }
-    )
-    return f[0]
+    return prior, state_reader + input_reader + extra_reader, state_signature + extra_signature + input_signature
@@ -1,56 +1,268 @@
 import numba as nb
 import numpy as np
 
-from simba.types import float_base_type, float_array, int_array
+from simba.types import float_base_type, float_array, int_base_type
+from simba.core.function_factories.compilation_cache import njit, exec_generated
 
 
-def create_system_equation(state_functions, output_functions, state_length, float_length, int_length, global_extra_type):
+def create_workspace_type():
+    """The type of the workspace tuple (global_float_outputs, global_int_outputs, output_cache) of the in-place system
+    equation. The output cache holds the time of the cached time-only outputs and a flag, if the constant outputs have
+    been computed."""
+    return nb.types.Tuple((float_base_type[::1], int_base_type[::1], float_base_type[::1]))
 
-    fct = _create_arbitrary_function(state_functions, output_functions, state_length, float_length, int_length)
-    if all(type(fct_) == nb.core.registry.CPUDispatcher for fct_ in list(state_functions) + list(output_functions)):
+
+def create_workspace_factory(float_length, int_length, compiled=True):
+    """Creates a function without arguments that allocates a new workspace for the in-place system equation."""
+
+    def create_workspace():
+        return np.zeros(float_length), np.zeros(int_length, dtype=np.int32), np.array([np.nan, 0.0])
+
+    if compiled:
+        create_workspace = njit(create_workspace, create_workspace_type()())
+    return create_workspace
+
+
+def create_system_equation(system_equation_inplace, state_length, float_length, int_length, global_extra_type):
+    """Wraps an in-place system equation into a system equation that allocates the derivatives and the workspace.
+
+    Returns:
+        Tuple(Callable, Callable): The allocating system equation and the function that creates a new workspace.
+    """
+    compiled = type(system_equation_inplace) == nb.core.registry.CPUDispatcher
+    create_workspace = create_workspace_factory(float_length, int_length, compiled)
+
+    def system_equation(t, global_state, global_extras):
+        global_derivatives = np.zeros(state_length)
+        system_equation_inplace(t, global_state, global_derivatives, create_workspace(), global_extras)
+        return global_derivatives
+
+    if compiled:
         signature = float_array(float_base_type, float_array, global_extra_type)
-        fct = nb.njit(signature)(fct)
-    return fct
+        system_equation = njit(system_equation, signature)
+    return system_equation, create_workspace
+
+
+def create_system_equation_inplace(
+    state_functions, state_slices, output_functions, output_slices, global_extra_type, constant_count=0, time_count=0,
+    partitions=None
+):
+    """Creates the in-place system equation that calls the compiled output and state functions one after another.
+
+    The first constant_count output functions compute constant outputs. They are called only once per workspace.
+    The following time_count output functions compute outputs, that depend on the time only. They are called only if
+    the time differs from the time of the last call with the same workspace.
+
+    With partitions, the remaining output functions and the state functions are grouped into partitions, that do not
+    depend on each other (see sb.utils.find_partitions). The partitions are computed in parallel within a single numba
+    prange loop. The functions of each partition are called sequentially.
+
+    Args:
+        partitions(Tuple[Tuple[int, int]]): Number of the output functions after the constant and the time-only output
+            functions and number of the state functions of each partition. None to call all functions sequentially.
+
+    Returns:
+        Tuple(Callable, str): The in-place system equation and its generated source code.
+    """
+    fct, source = _create_arbitrary_function(
+        state_functions, state_slices, output_functions, output_slices, constant_count, time_count, partitions
+    )
+    if all(type(fct_) == nb.core.registry.CPUDispatcher for fct_ in list(state_functions) + list(output_functions)):
+        signature = nb.none(float_base_type, float_array, float_array, create_workspace_type(), global_extra_type)
+        fct = njit(fct, signature, parallel=partitions is not None, nogil=True)
+    return fct, source
+
+
+def create_output_trajectory(
+    output_functions, output_slices, create_workspace, state_length, global_extra_type, constant_count=0, time_count=0
+):
+    """Creates a function that computes the output buffers for each point of a trajectory.
+
+    Args:
+        output_functions(Tuple[Callable]): The output functions (or loop functions) of the outputs in their order.
+        output_slices(Tuple[np.ndarray]): The argument slices (or loop indices) of the output functions.
+        create_workspace(Callable): Creates the workspace of the system equation.
+        state_length(int): Length of the state of the system.
+        global_extra_type(nb.types.Tuple): Type of the tuple of extras.
+        constant_count(int): Number of output functions of constant outputs (see create_system_equation_inplace).
+        time_count(int): Number of output functions of time-only outputs (see create_system_equation_inplace).
+
+    Returns:
+        Callable(t, states, global_extras) -> Tuple(np.ndarray, np.ndarray): The float and the int outputs of shape
+        (len(t), length of the output buffer).
+    """
+    evaluate_outputs, _ = create_system_equation_inplace(
+        (), (), output_functions, output_slices, global_extra_type, constant_count, time_count
+    )
+
+    def output_trajectory(t, states, global_extras):
+        workspace = create_workspace()
+        derivatives = np.empty(state_length)
+        float_outputs = np.empty((t.shape[0], workspace[0].shape[0]))
+        int_outputs = np.empty((t.shape[0], workspace[1].shape[0]), dtype=np.int32)
+        for k in range(t.shape[0]):
+            evaluate_outputs(t[k], states[k], derivatives, workspace, global_extras)
+            float_outputs[k] = workspace[0]
+            int_outputs[k] = workspace[1]
+        return float_outputs, int_outputs
+
+    if type(evaluate_outputs) == nb.core.registry.CPUDispatcher:
+        signature = nb.types.Tuple((float_base_type[:, ::1], int_base_type[:, ::1]))(
+            float_base_type[::1], float_base_type[:, ::1], global_extra_type
+        )
+        output_trajectory = njit(output_trajectory, signature)
+    return output_trajectory
+
+
+def create_inlined_system_equation_inplace(
+    states, outputs, global_extra_type, algebraic_loops=(), constant_count=0, time_count=0
+):
+    """Creates the in-place system equation as a single flat kernel with all equations inlined.
+
+    The output equations are evaluated in the topological order of the outputs and the signals are passed between
+    them as local variables. The slice bounds are constants of the generated code. Compiled equations are inlined
+    into the kernel by numba, so that LLVM optimizes across the equations of all components.
+
+    Args:
+        states(Iterable[State]): The states of the system with their local slices set.
+        outputs(Iterable[Output]): The outputs of the system in topological order with their local slices set.
+        global_extra_type(nb.types.Tuple): Type of the tuple of extras.
+        algebraic_loops(Iterable[Tuple(Tuple[Output], Callable, np.ndarray)]): The outputs, the loop function and
+            the loop indices of each algebraic loop. The outputs of a loop are solved by the loop function in the
+            output buffers instead of being inlined.
+        constant_count(int): Number of constant outputs at the start of the outputs. They are computed only once per
+            workspace.
+        time_count(int): Number of time-only outputs after the constant outputs. They are computed only if the time
+            differs from the last call with the same workspace.
+
+    Returns:
+        Tuple(Callable, str): The in-place system equation and its generated source code.
+    """
+    fct, source = _create_inlined_function(states, outputs, algebraic_loops, constant_count, time_count)
+    equations = [output.output_equation for output in outputs] + [state.state_equation for state in states]
+    if all(type(equation) == nb.core.registry.CPUDispatcher for equation in equations):
+        signature = nb.none(float_base_type, float_array, float_array, create_workspace_type(), global_extra_type)
+        fct = njit(fct, signature)
+    return fct, source
+
 
+def _cached_output_code(output_code, constant_count, time_count):
+    """Indents the code of each output and places the constant and the time-only outputs into blocks, that are only
+    executed, if the output cache of the workspace is outdated.
 
-def _create_arbitrary_function(state_functions, output_functions, state_length, float_length, int_length):
+    Args:
+        output_code(List[List[str]]): The lines of code of each output.
+        constant_count(int): Number of constant outputs at the start of the outputs.
+        time_count(int): Number of time-only outputs after the constant outputs.
+
+    Returns:
+        str: The code of the function body.
     """
-    exec(f, state_length, state_functions, f, np):
+    def block(codes, indentation):
+        return ''.join(' ' * indentation + line + '\n' for code in codes for line in code)
+
+    code = ""
+    if constant_count > 0:
+        code += " if output_cache[1] == 0.0:\n"
+        code += block(output_code[:constant_count], 2)
+        code += "  output_cache[1] = 1.0\n"
+    if time_count > 0:
+        code += " if t != output_cache[0]:\n"
+        code += block(output_code[constant_count:constant_count + time_count], 2)
+        code += "  output_cache[0] = t\n"
+    return code + block(output_code[constant_count + time_count:], 1)
+
+
+def _parallel_calls(blocks):
+    """The lines of code, that execute the blocks of calls in parallel with numba prange. The calls of each block are
+    executed sequentially. A single block is executed directly."""
+    if len(blocks) == 1:
+        return list(blocks[0])
+    code = [f"for j in nb.prange({len(blocks)}):"]
+    for j, calls in enumerate(blocks):
+        code.append((" if" if j == 0 else " elif") + f" j == {j}:")
+        code += ["  " + call for call in calls]
+    return code
+
+
+def _create_arbitrary_function(
+    state_functions, state_slices, output_functions, output_slices, constant_count=0, time_count=0, partitions=None
+):
+    """
+    exec(f, state_functions, state_slices, output_functions, output_slices):
 
         # Write to local variables to speed up numba computation significantly
         # output_function_{i} = output_functions[{i}]
+        # output_slices_{i} = output_slices[{i}]
         output_function_0 = output_functions[0]
+        output_slices_0 = output_slices[0]
         # ...
 
         # state_function_{i} = state_functions[{i}]
+        # state_slices_{i} = state_slices[{i}]
         state_function_0 = state_functions[0]
+        state_slices_0 = state_slices[0]
         state_function_1 = state_functions[1]
+        state_slices_1 = state_slices[1]
         # ...
 
-        def system_equation(t, global_state, global_float_outputs, global_int_outputs, global_extras):
-            global_derivatives = np.zeros(state_length)
+        def system_equation_inplace(t, global_state, global_derivatives, workspace, global_extras):
+            # The output buffers are preallocated by the caller and reused over all calls
+            global_float_outputs = workspace[0]
+            global_int_outputs = workspace[1]
+            output_cache = workspace[2]
+
+            # Constant outputs are computed once per workspace
+            if output_cache[1] == 0.0:
+                output_function_0(
+                    t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_0
+                )
+                output_cache[1] = 1.0
+
+            # Time-only outputs are computed once per distinct time, e.g. only once for the equal times of two
+            # Runge-Kutta stages
+            if t != output_cache[0]:
+                output_function_1(
+                    t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_1
+                )
+                output_cache[0] = t
 
-            # Call each output function to fill the output vectors
-            # output_function_{i}(t, global_state, global_float_outputs, global_int_outputs, global_extras)
-            output_function_0(t, global_state, global_float_outputs, global_int_outputs, global_extras)
-            output_function_1(t, global_state, global_float_outputs, global_int_outputs, global_extras)
+            # Call each output function to fill the output vectors. Outputs of the same component type share the same
+            # output function and differ only in their argument slices.
+            # output_function_{i}(
+            #     t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_{i}
+            # )
+            output_function_2(t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_2)
             # ...
 
-            # Call each State function separately
+            # Only with partitions: The output and the state functions of each partition are called in parallel
+            # instead of the following calls
+            # for j in nb.prange(2):
+            #     if j == 0:
+            #         output_function_3(...)
+            #         state_function_0(...)
+            #     elif j == 1:
+            #         output_function_4(...)
+            #         state_function_1(...)
+
+            # Call each State function separately to write the derivatives
             # state_function_{i}(
-            #     t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras
+            #     t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras,
+            #     state_slices_{i}
             # )
 
             state_function_0(
-                 t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras
+                 t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras,
+                 state_slices_0
             )
             state_function_1(
-                 t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras
+                 t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras,
+                 state_slices_1
             )
             # ...
 
         # Append the generated function to the (empty) list f to pass it back to the caller
-        f.append(mapping)
+        f.append(system_equation_inplace)
     """
 
     def spacing(no_of_spaces):
@@ -58,44 +270,215 @@ def _create_arbitrary_function(state_functions, output_functions, state_length,
 
     state_reader = ""
     output_reader = ""
-    header = "def system_equation(t, global_state, global_extras):\n"
-    state_function_calls = ""
-    output_function_calls = ""
-    derivatives = spacing(1) + f"global_derivatives = np.zeros(state_length)\n"
-    derivatives += spacing(1) + f"global_float_outputs = np.zeros(float_length)\n"
-    derivatives += spacing(1) + f"global_int_outputs = np.zeros(int_length, dtype=np.int32)\n"
-    return_line = spacing(1) + "return global_derivatives\n"
+    header = "def system_equation_inplace(t, global_state, global_derivatives, workspace, global_extras):\n"
+    buffers = spacing(1) + "global_float_outputs = workspace[0]\n"
+    buffers += spacing(1) + "global_int_outputs = workspace[1]\n"
+    buffers += spacing(1) + "output_cache = workspace[2]\n"
+    output_code = []
     for i in range(len(output_functions)):
-        output_function_calls += spacing(1) \
-            + f"output_function_{i}(t, global_state, global_float_outputs, global_int_outputs, global_extras)\n"
+        output_code.append([
+            f"output_function_{i}("
+            f"t, global_state, global_float_outputs, global_int_outputs, global_extras, output_slices_{i})"
+        ])
         output_reader += f"output_function_{i} = output_functions[{i}]\n"
+        output_reader += f"output_slices_{i} = output_slices[{i}]\n"
+    state_calls = []
     for i in range(len(state_functions)):
-        state_function_calls += spacing(1) \
-            + f"state_function_{i}(" \
-              "t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras" \
-              ")\n"
+        state_calls.append(
+            f"state_function_{i}("
+            "t, global_state, global_float_outputs, global_int_outputs, global_derivatives, global_extras, "
+            f"state_slices_{i})"
+        )
         state_reader += f"state_function_{i} = state_functions[{i}]\n"
-    appendix = "result.append(system_equation)\n"
+        state_reader += f"state_slices_{i} = state_slices[{i}]\n"
+    if partitions is not None:
+        start = constant_count + time_count
+        assert sum(output_count for output_count, _ in partitions) == len(output_code) - start, \
+            'The partitions have to cover all output functions after the constant and the time-only output functions.'
+        assert sum(state_count for _, state_count in partitions) == len(state_calls), \
+            'The partitions have to cover all state functions.'
+        blocks = []
+        state_start = 0
+        for output_count, state_count in partitions:
+            blocks.append(
+                [code[0] for code in output_code[start:start + output_count]]
+                + state_calls[state_start:state_start + state_count]
+            )
+            start += output_count
+            state_start += state_count
+        output_code = output_code[:constant_count + time_count] + ([_parallel_calls(blocks)] if blocks else [])
+        state_calls = []
+    output_function_calls = _cached_output_code(output_code, constant_count, time_count)
+    state_function_calls = ''.join(spacing(1) + line + "\n" for line in state_calls)
+    appendix = "result.append(system_equation_inplace)\n"
     system_equation_code = state_reader \
         + output_reader \
         + header \
-        + derivatives \
+        + buffers \
         + output_function_calls \
         + state_function_calls \
-        + return_line \
         + appendix
     f = []
-    exec(
+    exec_generated(
         system_equation_code,
         {
-            'state_length': state_length,
-            'float_length': float_length,
-            'int_length': int_length,
             'state_functions': state_functions,
+            'state_slices': state_slices,
             'output_functions': output_functions,
+            'output_slices': output_slices,
             'result': f,
-            'np': np,
+            'nb': nb,
         }
     )
-    return f[0]
+    return f[0], system_equation_code
+
+
+def _create_inlined_function(states, outputs, algebraic_loops=(), constant_count=0, time_count=0):
+    """
+    exec(result, equations, default values):
+
+        def system_equation_inplace(t, global_state, global_derivatives, workspace, global_extras):
+            global_float_outputs = workspace[0]
+            global_int_outputs = workspace[1]
+            output_cache = workspace[2]
+
+            # The constant and the time-only outputs are computed in the same blocks as in _create_arbitrary_function.
+            # Their signals are read from the output buffer by the following blocks.
+            if t != output_cache[0]:
+                # TFunction.Out
+                signal_0 = equation_0(t)
+                global_float_outputs[2:3] = signal_0
+                output_cache[0] = t
 
+            # One block per output in topological order. The signal is kept as a local variable for the following
+            # equations and copied into the output buffer. Size-1 signals of scalar equations are scalars.
+            # Sub.Out
+            signal_1 = equation_1(t, global_float_outputs[2:3], default_1_1)
+            global_float_outputs[0:1] = signal_1
+
+            # PIController.action
+            signal_2 = equation_2(t, global_state[0:1], global_extras[1][0:2], signal_1)
+            global_float_outputs[1:2] = signal_2
+            # ...
+
+            # An algebraic loop is solved in the output buffers at the position of its first output. The outputs of
+            # the loop are read from the buffers by the following equations.
+            algebraic_loop_0(t, global_state, global_float_outputs, global_int_outputs, global_extras, loop_indices_0)
+
+            # One block per state
+            # PIController.State
+            global_derivatives[0:1] = equation_3(t, global_state[0:1], global_extras[1][0:2], signal_1)
+            # ...
+
+        # Append the generated function to the (empty) result list to pass it back to the caller
+        result.append(system_equation_inplace)
+    """
+
+    def spacing(no_of_spaces):
+        return ' ' * no_of_spaces
+
+    namespace = {}
+    equation_names = {}
+    signals = {}
+
+    def equation_name(equation):
+        # Equations shared by several holders are inlined from the same function
+        if id(equation) not in equation_names:
+            name = f'equation_{len(equation_names)}'
+            if type(equation) == nb.core.registry.CPUDispatcher:
+                namespace[name] = nb.njit(inline='always')(equation.py_func)
+            else:
+                namespace[name] = equation
+            equation_names[id(equation)] = name
+        return equation_names[id(equation)]
+
+    def is_scalar(holder, signal):
+        return holder.scalar and signal.size == 1
+
+    def read(buffer, signal, scalar):
+        return f"{buffer}[{signal.slice_start}]" if scalar else f"{buffer}[{signal.slice_start}:{signal.slice_stop}]"
+
+    def arguments(holder, holder_index):
+        arguments_ = "t, "
+        component = holder.component
+        if component.state is not None:
+            arguments_ += read('global_state', component.state, is_scalar(holder, component.state)) + ", "
+        if component.parameters is not None:
+            parameters = component.parameters
+            arguments_ += \
+                f"global_extras[{parameters.buffer_index}][{parameters.slice_start}:{parameters.slice_stop}], "
+        if component.extra_index is not None:
+            arguments_ += f"global_extras[{component.extra_index}], "
+        for i, input_ in enumerate(holder.component_inputs):
+            source = input_.external_output
+            scalar = is_scalar(holder, input_)
+            if not input_.connected:
+                name = f'default_{holder_index}_{i}'
+                namespace[name] = input_.default_value.item() if scalar else input_.default_value
+                arguments_ += f"{name}, "
+            elif source in signals and is_scalar(source, source) == scalar:
+                arguments_ += f"{signals[source]}, "
+            else:
+                # The signal is read from the buffer, if it is not computed yet or passed in a different form
+                buffer = 'global_float_outputs' if source.dtype == float_base_type else 'global_int_outputs'
+                arguments_ += read(buffer, source, scalar) + ", "
+        return arguments_[:-2]
+
+    header = "def system_equation_inplace(t, global_state, global_derivatives, workspace, global_extras):\n"
+    body = spacing(1) + "global_float_outputs = workspace[0]\n"
+    body += spacing(1) + "global_int_outputs = workspace[1]\n"
+    body += spacing(1) + "output_cache = workspace[2]\n"
+    loop_members = dict()
+    for k, (loop_outputs, loop_function, loop_indices) in enumerate(algebraic_loops):
+        namespace[f'algebraic_loop_{k}'] = loop_function
+        namespace[f'loop_indices_{k}'] = loop_indices
+        for member in loop_outputs:
+            loop_members[member] = k
+    solved_loops = set()
+    output_code = []
+    holder_index = 0
+    for output in outputs:
+        if holder_index in (constant_count, constant_count + time_count):
+            # The cached blocks may be skipped, so their signals are not defined in the following blocks
+            signals.clear()
+        if output in loop_members:
+            k = loop_members[output]
+            code = []
+            if k not in solved_loops:
+                code.append(f"# Algebraic loop {k}")
+                code.append(
+                    f"algebraic_loop_{k}("
+                    f"t, global_state, global_float_outputs, global_int_outputs, global_extras, loop_indices_{k})"
+                )
+                solved_loops.add(k)
+            output_code.append(code)
+            holder_index += 1
+            continue
+        if output.dtype == float_base_type:
+            target = 'global_float_outputs'
+        elif output.dtype == int_base_type:
+            target = 'global_int_outputs'
+        else:
+            raise AssertionError(f'Illegal output dtype: {output.dtype}')
+        signal = f'signal_{holder_index}'
+        output_code.append([
+            f"# {output.component.name}.{output.name}",
+            f"{signal} = {equation_name(output.output_equation)}({arguments(output, holder_index)})",
+            read(target, output, is_scalar(output, output)) + f" = {signal}",
+        ])
+        signals[output] = signal
+        holder_index += 1
+    if holder_index in (constant_count, constant_count + time_count):
+        signals.clear()
+    body += _cached_output_code(output_code, constant_count, time_count)
+    for state in states:
+        body += spacing(1) + f"# {state.component.name}.State\n"
+        body += spacing(1) + read('global_derivatives', state, is_scalar(state, state)) \
+            + f" = {equation_name(state.state_equation)}({arguments(state, holder_index)})\n"
+        holder_index += 1
+    appendix = "result.append(system_equation_inplace)\n"
+    system_equation_code = header + body + appendix
+    f = []
+    namespace['result'] = f
+    exec_generated(system_equation_code, namespace)
+    return f[0], system_equation_code
@@ -57,6 +57,11 @@ class Input:
     def connected(self) -> bool:
         return self._external_output is not None
 
+    @property
+    def connection_changed(self) -> 'sb.utils.Event':
+        """Event(sender: Input, output: Output / None) raised after the input has been connected or disconnected."""
+        return self._connection_changed
+
     def __init__(self, component, name: str, size: int, default_value=None, dtype=float):
         # (SystemComponent):  Overlying System Component of the Input
         self._component = component
@@ -77,6 +82,9 @@ class Input:
         # If a default value is specified, a dtype and a size have to be specified during initialization.
         # None: A connected output is required.
         self._default_value = None
+
+        # (Event): Raised with the new external output (or None) after each change of the connection.
+        self._connection_changed = sb.utils.Event()
         if default_value is not None:
             self.default_value = default_value
 
@@ -97,8 +105,10 @@ class Input:
             f'Size Mismatch: Input size {self._size}, Output size: {output.size}. Connection aborted'
         if self not in output.external_inputs:
             output.connect(self)
+        self._connection_changed(self, output)
 
     def disconnect(self, output):
         if output == self._external_output:
             self._external_output = None
             output.disconnect(self)
+            self._connection_changed(self, None)
@@ -1 +1,2 @@
 from .islice_holder import ISliceHolder
+from .ijacobian_holder import IJacobianHolder
@@ -0,0 +1,41 @@
+import numpy as np
+from typing import Callable, Iterable
+
+
+class IJacobianHolder:
+
+    @property
+    def jacobian_equation(self) -> Callable or None:
+        return self._jacobian_equation
+
+    @jacobian_equation.setter
+    def jacobian_equation(self, equation: Callable):
+        self._jacobian_equation = equation
+
+    @property
+    def jacobian_function(self) -> Callable or None:
+        return self._jacobian_function
+
+    @property
+    def jacobian_columns(self) -> np.ndarray or None:
+        """Sorted global state indices that the signal structurally depends on."""
+        return self._jacobian_columns
+
+    @jacobian_columns.setter
+    def jacobian_columns(self, value: Iterable[int]):
+        self._jacobian_columns = np.asarray(value, dtype=np.int64)
+
+    @property
+    def jacobian_offset(self) -> int or None:
+        """Start index of the row major (size x len(jacobian_columns)) jacobian block in the global buffer."""
+        return self._jacobian_offset
+
+    @jacobian_offset.setter
+    def jacobian_offset(self, value: int):
+        self._jacobian_offset = int(value)
+
+    def __init__(self):
+        self._jacobian_equation = None
+        self._jacobian_function = None
+        self._jacobian_columns = None
+        self._jacobian_offset = None
@@ -10,8 +10,23 @@ class ISliceHolder:
 
     @local_slice.setter
     def local_slice(self, value: Iterable[int]):
-        self._local_slice = np.asarray(value)
-    
+        value = np.asarray(value)
+        assert value.ndim == 1 and np.all(np.diff(value) == 1), 'Local slices have to be contiguous ranges.'
+        self._local_slice = value
+        self._slice_start = int(value[0]) if len(value) > 0 else 0
+        self._slice_stop = self._slice_start + len(value)
+
+    @property
+    def slice_start(self) -> int or None:
+        """First index of the contiguous local slice within the global buffer."""
+        return self._slice_start
+
+    @property
+    def slice_stop(self) -> int or None:
+        """Index after the last index of the contiguous local slice within the global buffer."""
+        return self._slice_stop
+
     def __init__(self):
         self._local_slice = None
-
+        self._slice_start = None
+        self._slice_stop = None
@@ -3,14 +3,15 @@ from typing import List
 from .input import Input
 import simba as sb
 import simba.core.function_factories.output_function_factory as off
-from simba.core.interfaces import ISliceHolder
+from simba.core.function_factories.argument_slices import create_argument_slices
+from simba.core.interfaces import ISliceHolder, IJacobianHolder
 from typing import Callable, Iterable, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from simba.core import Input, SystemComponent
 
 
-class Output(ISliceHolder):
+class Output(ISliceHolder, IJacobianHolder):
 
     @property
     def name(self) -> str:
@@ -32,6 +33,11 @@ class Output(ISliceHolder):
     def output_function(self) -> Callable or None:
         return self._output_function
 
+    @property
+    def argument_slices(self) -> np.ndarray or None:
+        """The slices of all arguments of the output function in the global buffers. Set during compilation."""
+        return self._argument_slices
+
     @property
     def component_inputs(self) -> List['Input']:
         return self._component_inputs
@@ -44,6 +50,19 @@ class Output(ISliceHolder):
     def external_inputs(self) -> Iterable['Input']:
         return self._external_inputs
 
+    @property
+    def scalar(self) -> bool:
+        """Flag, if the equations of this output take size-1 signals as scalars instead of arrays of length one.
+
+        Inputs and a local state of size one are passed to the equations of a scalar output as floats. An output
+        of size one returns a float. Vector signals remain arrays.
+        """
+        return self._scalar
+
+    @scalar.setter
+    def scalar(self, value: bool):
+        self._scalar = bool(value)
+
     @property
     def output_equation(self) -> Callable:
         return self._output_equation
@@ -55,6 +74,7 @@ class Output(ISliceHolder):
     def __init__(self, component: 'SystemComponent', name: str, component_inputs: Iterable['Input'], size: int,
                  signal_names: Iterable[str] or None = None, units='any', dtype: type = sb.types.float_base_type):
         ISliceHolder.__init__(self)
+        IJacobianHolder.__init__(self)
         self._component = component
         self._size = size
         self._name = name
@@ -65,6 +85,8 @@ class Output(ISliceHolder):
         self._signal_names = signal_names
         self._output_equation = None
         self._output_function = None
+        self._argument_slices = None
+        self._scalar = False
         self._compiled = False
 
     def __call__(self, external_input: 'Input'):
@@ -83,23 +105,18 @@ class Output(ISliceHolder):
     def compile(self, global_extra_type):
         assert self._output_equation is not None, 'Output equation has to be set before compilation.'
         assert self._local_slice is not None, 'Local slice has to be set before compilation.'
+        self._argument_slices = create_argument_slices(self)
         self._output_function = off.create_output_function(self, global_extra_type)
         self._compiled = True
 
-        """ Future Content
-        if len(self.derivative_equations) != len(self._component_inputs):
-            return
-        derivative_equations = self._derivative_equations
-        input_derivative_functions = tuple(input_.derivative_function for input_ in self._component_inputs)
-
-        def derivative_function(t, global_state, derivative_array, derivative_product):
-            local_state = global_state[state_indices]
-            derivatives = tuple(derivative(t, local_state) for derivative in derivative_equations)
-            next_derivative_product = np.matmul(derivative_product, derivatives)
-            # local_derivative = state_derivative(t, local_state)
-            # derivative_array[local_state, :] = np.matmul(local_derivative, derivative_product)
-            for i in range(len(derivatives)):
-                input_derivative_functions[i](t, global_state, derivative_array, next_derivative_product)
-
-        self._derivative_function = derivative_function
+    def compile_jacobian(self, global_extra_type):
+        """Creates the function that propagates the declared local jacobian of the output through the output graph.
+
+        Outputs that structurally do not depend on any state do not need a jacobian function.
         """
+        assert self._jacobian_columns is not None, 'Jacobian columns have to be set before compilation.'
+        if len(self._jacobian_columns) == 0 or self._jacobian_function is not None:
+            return
+        assert self._jacobian_equation is not None, \
+            f'No jacobian equation declared for output {self._component.name}.{self._name}.'
+        self._jacobian_function = off.create_output_jacobian_function(self, global_extra_type)
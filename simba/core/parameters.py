@@ -0,0 +1,51 @@
+import numpy as np
+
+from simba.core.interfaces import ISliceHolder
+from typing import Mapping
+
+
+class Parameters(ISliceHolder):
+    """Runtime parameters of a component.
+
+    The values of all parameters of a system are stored in one global parameter buffer that is passed with the
+    extras. The parameters hold a contiguous slice within this buffer, that is read as the parameters argument of
+    the component equations. Therefore, parameters can be changed after the compilation without recompiling the
+    system.
+    """
+
+    @property
+    def component(self):
+        return self._component
+
+    @property
+    def names(self):
+        return tuple(self._default_values.keys())
+
+    @property
+    def size(self):
+        return len(self._default_values)
+
+    @property
+    def default_values(self):
+        return np.array(list(self._default_values.values()), dtype=float)
+
+    @property
+    def buffer_index(self):
+        """Index of the global parameter buffer within the extras."""
+        return self._buffer_index
+
+    @buffer_index.setter
+    def buffer_index(self, value):
+        self._buffer_index = value
+
+    def __init__(self, component, default_values: Mapping[str, float]):
+        ISliceHolder.__init__(self)
+        self._component = component
+        self._default_values = {name: float(value) for name, value in default_values.items()}
+        self._buffer_index = None
+
+    def index(self, name):
+        """Returns the index of a parameter within the global parameter buffer."""
+        assert name in self._default_values, f'{self._component.name} has no parameter {name}.'
+        assert self._local_slice is not None, 'The parameter slice has to be set before accessing the parameters.'
+        return self.slice_start + self.names.index(name)
@@ -1,15 +1,16 @@
 import numpy as np
 
 from .input import Input
-from .function_factories.state_function_factory import create_state_function
+from .function_factories.state_function_factory import create_state_function, create_state_jacobian_function
+from .function_factories.argument_slices import create_argument_slices
 from simba.types import float_base_type
-from simba.core.interfaces import ISliceHolder
+from simba.core.interfaces import ISliceHolder, IJacobianHolder
 from typing import TYPE_CHECKING, Iterable
 
 if TYPE_CHECKING:
     from simba.core import Input
 
-class State(ISliceHolder):
+class State(ISliceHolder, IJacobianHolder):
 
     @property
     def component(self):
@@ -35,6 +36,19 @@ class State(ISliceHolder):
     def component_inputs(self) -> Iterable['Input']:
         return self._component_inputs
 
+    @property
+    def scalar(self):
+        """Flag, if the equations of this state take size-1 signals as scalars instead of arrays of length one.
+
+        A state of size one is passed as a float and its derivative equation returns a float. The same holds for
+        the inputs of size one.
+        """
+        return self._scalar
+
+    @scalar.setter
+    def scalar(self, value):
+        self._scalar = bool(value)
+
     @property
     def state_equation(self):
         return self._state_equation
@@ -48,12 +62,18 @@ class State(ISliceHolder):
     def state_function(self):
         return self._state_function
 
+    @property
+    def argument_slices(self):
+        """The slices of all arguments of the state function in the global buffers. Set during compilation."""
+        return self._argument_slices
+
     @property
     def compiled(self):
         return self._state_function is not None
 
     def __init__(self, component, component_inputs, size, signal_names=None, dtype=float_base_type):
         ISliceHolder.__init__(self)
+        IJacobianHolder.__init__(self)
         assert all(isinstance(input_, Input) for input_ in component_inputs)
         self._compiled = False
         self._state_equation = None
@@ -61,6 +81,8 @@ class State(ISliceHolder):
         self._function = None
         self._component_inputs = tuple(component_inputs)
         self._state_function = None
+        self._argument_slices = None
+        self._scalar = False
         self._dtype = dtype
         self._size = size
         self._component = component
@@ -70,5 +92,15 @@ class State(ISliceHolder):
             return
         assert self._local_slice is not None, 'State indices have to be set before compilation.'
         assert self.state_equation is not None, 'The state equation has to be set before compilation.'
+        self._argument_slices = create_argument_slices(self)
         self._state_function = create_state_function(self, global_extra_type)
         self._compiled = True
+
+    def compile_jacobian(self, global_extra_type):
+        """Creates the function that chains the declared local jacobian of the state with the output jacobians."""
+        assert self._jacobian_columns is not None, 'Jacobian columns have to be set before compilation.'
+        if len(self._jacobian_columns) == 0 or self._jacobian_function is not None:
+            return
+        assert self._jacobian_equation is not None, \
+            f'No jacobian equation declared for the state of {self._component.name}.'
+        self._jacobian_function = create_state_jacobian_function(self, global_extra_type)
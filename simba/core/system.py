@@ -1,9 +1,21 @@
+import copy
+import threading
 import numba as nb
 import numpy as np
 from collections import OrderedDict
 import simba as sb
 from simba.types import float_base_type, int_base_type
-from simba.core.function_factories.system_equation_factory import create_system_equation
+from simba.core.function_factories.system_equation_factory import create_system_equation, \
+    create_system_equation_inplace, create_inlined_system_equation_inplace, create_output_trajectory
+from simba.core.function_factories.simulation_factory import create_fixed_step_simulation, create_batch_simulation, \
+    create_adaptive_simulation, create_implicit_simulation, create_multirate_simulation, fixed_step_methods
+from simba.core.function_factories.algebraic_loop_factory import create_algebraic_loop_function, \
+    create_algebraic_loop_indices, algebraic_loop_buffer_length
+from simba.core.function_factories.log_factory import create_log_function
+from simba.core.function_factories.event_factory import create_event_functions, create_discrete_update
+from simba.core.function_factories.operating_point_factory import create_operating_point, create_batch_operating_point
+from simba.core.function_factories.jacobian_factory import create_system_jacobian, create_dense_jacobian, \
+    create_colored_finite_difference_jacobian
 from simba.core.system_components import SystemInput, SystemOutput
 
 
@@ -18,10 +30,96 @@ class System:
         assert self._system_equation is not None, 'The system has to be compiled before accessing the system equation.'
         return self._system_equation
 
+    @property
+    def system_equation_inplace(self):
+        """The system equation, that writes the derivatives into a preallocated array.
+
+        All intermediate output values are kept in a workspace created by create_workspace. Repeated evaluations
+        with the same derivatives array and workspace do not allocate memory in the generated code.
+
+        Returns:
+            Callable(t, global_state, global_derivatives, workspace) -> None
+        """
+        assert self._compiled_system_equation_inplace is not None, \
+            'The system has to be compiled before accessing the system equation.'
+        system_equation_inplace = self._compiled_system_equation_inplace
+        return lambda t, global_state, global_derivatives, workspace: system_equation_inplace(
+            t, global_state, global_derivatives, workspace, self._extras
+        )
+
+    @property
+    def generated_source(self):
+        """The generated python source code of the in-place system equation for inspection."""
+        assert self._generated_source is not None, 'The system has to be compiled before accessing the source.'
+        return self._generated_source
+
+    @property
+    def system_jacobian(self):
+        """The jacobian of the system equation with respect to the state as a sparse CSR matrix.
+
+        If all outputs and states that depend on the state declare jacobian equations, the system jacobian is
+        assembled from them by chaining through the output graph. Otherwise, it is approximated by finite differences
+        of the system equation, that perturb all structurally orthogonal columns of the jacobian sparsity at once.
+        It is compiled on the first access.
+
+        Returns:
+            Callable(t, global_state) -> Tuple(np.ndarray, np.ndarray, np.ndarray): The data, column indices and row
+            pointers of the CSR matrix of shape (state_length, state_length).
+        """
+        assert self._compiled, 'The system has to be compiled before accessing the system jacobian.'
+        system_jacobian = self._get_compiled_system_jacobian()
+        indices = self._jacobian_indices
+        indptr = self._jacobian_indptr
+        return lambda t, global_state: (system_jacobian(t, global_state, self._extras), indices, indptr)
+
+    @property
+    def jacobian_sparsity(self):
+        """The structural sparsity pattern of the system jacobian inferred from the connections of the system.
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray): The column indices and row pointers of the CSR pattern.
+        """
+        assert self._compiled, 'The system has to be compiled before accessing the jacobian sparsity.'
+        return self._jacobian_indices, self._jacobian_indptr
+
+    @property
+    def algebraic_loops(self):
+        """The names of the outputs of each algebraic loop of the system, that is solved in the system equation."""
+        return [
+            [f'{output.component.name}.{output.name}' for output in loop]
+            for loop in self._output_ordering.algebraic_loops
+        ]
+
+    @property
+    def dead_outputs(self):
+        """The names of the outputs, that are not computed in the system equation, because nothing depends on them.
+
+        Only the outputs, that the inputs of the states, the system outputs or the loggers depend on, are computed in
+        the system equation. All outputs can be computed on demand with output_trajectory.
+        """
+        assert self._compiled, 'The system has to be compiled before accessing the dead outputs.'
+        return [name for name, output in self._outputs.items() if output not in self._live_outputs]
+
+    @property
+    def output_dependencies(self):
+        """The kind of dependency of each output by its name: 'constant', 'time' or 'state'.
+
+        Constant outputs are computed only once per workspace and time-only outputs only once per distinct time, e.g.
+        once for the stages of a Runge-Kutta step at the same time. All other outputs are computed in each call of the
+        system equation.
+        """
+        assert self._compiled, 'The system has to be compiled before accessing the output dependencies.'
+        return {name: self._output_dependencies[output] for name, output in self._outputs.items()}
+
     @property
     def components(self):
         return self._components
 
+    @property
+    def loggers(self):
+        """The loggers of the system by their names."""
+        return self._loggers
+
     @property
     def state_length(self):
         return self._state_length
@@ -30,6 +128,16 @@ class System:
     def extras(self):
         return self._extras
 
+    @property
+    def parameters(self):
+        """The current values of all runtime parameters of the system by their names 'component.parameter'."""
+        assert self._compiled, 'The system has to be compiled before accessing the parameters.'
+        return {
+            f'{component_name}.{name}': float(self._parameter_buffer[parameters.index(name)])
+            for component_name, parameters in self._component_parameters.items()
+            for name in parameters.names
+        }
+
     @property
     def system_input(self):
         return self._system_input
@@ -45,9 +153,31 @@ class System:
         assert len(set(namelist)) == len(namelist), 'Duplicate names in the components. Use all unique names.'
         self._compiled = False
         self._system_equation = None
+        self._compiled_system_equation = None
+        self._compiled_system_equation_inplace = None
+        self._create_workspace = None
+        self._log_step = None
+        self._events = None
+        self._discrete = None
+        self._generated_source = None
+        self._live_outputs = set()
+        self._output_dependencies = dict()
+        self._algebraic_loop_functions = ()
+        self._compiled_output_trajectory = None
+        self._global_extra_type = None
+        self._simulations = dict()
+        # Reentrant, since the dense jacobian creates the system jacobian under the lock
+        self._simulation_lock = threading.RLock()
+        self._compiled_system_jacobian = None
+        self._compiled_dense_jacobian = None
+        self._jacobian_indices = None
+        self._jacobian_indptr = None
+        self._output_jacobian_length = 0
         self._int_output_values = None
         self._float_output_values = None
         self._extras = ()
+        self._parameter_buffer = None
+        self._parameter_buffer_index = None
 
         self._system_input = SystemInput(system_inputs)
         components_.append(self._system_input)
@@ -59,7 +189,6 @@ class System:
         self._loggers = {logger.name: logger for logger in loggers_}
         self._inputs = dict()
         outputs_ = dict()
-        self._outputs = OrderedDict()
         self._states = dict()
         for component in self._components.values():
             for output in component.outputs.values():
@@ -68,22 +197,136 @@ class System:
                 self._inputs[f'{component.name}.{input_.name}'] = input_
             if component.state is not None:
                 self._states[f'{component.name}.State'] = component.state
-        ordered_outputs = sb.utils.sort_outputs(outputs_.values())
-        for output in ordered_outputs:
-            self._outputs[f'{output.component.name}.{output.name}'] = output
+        # The order of the outputs follows later changes of the connections incrementally. The subscription is weak,
+        # so that the components do not keep the system alive, when it is rebuilt from them.
+        self._output_ordering = sb.utils.OutputOrdering(outputs_.values())
+        for input_ in self._inputs.values():
+            input_.connection_changed.subscribe(self._output_ordering.connection_changed, weak=True)
+        self._update_output_order()
+        self._component_parameters = {
+            component.name: component.parameters for component in self._components.values()
+            if component.parameters is not None
+        }
         self._stateful_components = tuple(
             component for component in components if component.state is not None
         )
         self._state_length = sum(state.size for state in self._states.values())
 
+    def _update_output_order(self):
+        self._outputs = OrderedDict(
+            (f'{output.component.name}.{output.name}', output) for output in self._output_ordering
+        )
+
+    def create_workspace(self):
+        """Allocates a new workspace for the in-place system equation.
+
+        The workspace caches the constant and the time-only outputs (see output_dependencies). A new workspace is
+        required after changing a parameter or an extra, that a cached output depends on.
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray, np.ndarray): The buffers of the float and the int outputs and the cache state.
+        """
+        assert self._create_workspace is not None, 'The system has to be compiled before creating a workspace.'
+        return self._create_workspace()
+
+    def new_context(self):
+        """Creates an independent run context of the compiled system.
+
+        The context owns copies of the extras of the system, i.e. the runtime parameters, the memories of the
+        components and the buffers of the loggers. Each simulation creates its own workspace. The compiled kernels are
+        shared with the system and release the GIL. So, several contexts can be simulated concurrently, e.g. with a
+        ThreadPoolExecutor, without recompilation.
+
+        Returns:
+            SimulationContext: The run context starting from a copy of the current extras of the system.
+        """
+        assert self._compiled, 'The system has to be compiled before creating a run context.'
+        return sb.core.SimulationContext(self, tuple(copy.deepcopy(extra) for extra in self._extras))
+
+    def set_parameter(self, name, value):
+        """Changes a runtime parameter of the compiled system without recompilation.
+
+        Args:
+            name(str): Name of the parameter in the form 'component.parameter', e.g. 'PermExDCMotor.r_a'.
+            value(float): The new value of the parameter.
+        """
+        self._parameter_buffer[self._parameter_index(name)] = value
+
+    def _parameter_index(self, name):
+        assert self._compiled, 'The system has to be compiled before setting parameters.'
+        component_name, _, parameter_name = name.rpartition('.')
+        assert component_name in self._component_parameters, f'No component {component_name} with parameters.'
+        return self._component_parameters[component_name].index(parameter_name)
+
     def set_input(self, inputs):
         self._system_input.set_input(inputs, self._extras)
 
     def get_output(self, t, state):
-        return self._system_output(t, state, self._extras)
+        """Computes the values of the system outputs.
+
+        Returns:
+            Tuple[np.ndarray]: The values of the system outputs in their order.
+        """
+        values = self.output_trajectory(np.array([t], dtype=float), np.atleast_2d(np.asarray(state, dtype=float)))
+        return tuple(
+            values[f'{input_.external_output.component.name}.{input_.external_output.name}'][0]
+            for input_ in self._system_output.inputs.values()
+        )
+
+    def output_trajectory(self, t, states, names=None):
+        """Computes the values of outputs along a trajectory, e.g. to post-process the results of a simulation.
+
+        All outputs are computed here, also those that are not computed in the system equation, because nothing in the
+        system depends on them (see dead_outputs). The output equations are evaluated once more for each point of the
+        trajectory. So, equations that change their extras (e.g. the memory of an integrator) change them again.
+
+        Args:
+            t(np.ndarray): The time of each point of the trajectory.
+            states(np.ndarray): The states of shape (len(t), state_length) as returned by simulate.
+            names(Iterable[str]): Names of the outputs in the form 'component.output'. All outputs, if None.
+
+        Returns:
+            dict: The values of shape (len(t), output.size) of each output by its name.
+        """
+        assert self._compiled, 'The system has to be compiled before computing outputs.'
+        if self._compiled_output_trajectory is None:
+            output_functions, output_slices, constant_count, time_count = self._grouped_output_calls(
+                tuple(self._outputs.values()), self._algebraic_loop_functions
+            )
+            self._compiled_output_trajectory = create_output_trajectory(
+                output_functions, output_slices, self._create_workspace, self._state_length, self._global_extra_type,
+                constant_count, time_count
+            )
+        t = np.ascontiguousarray(t, dtype=float)
+        states = np.ascontiguousarray(states, dtype=float)
+        assert states.shape == (len(t), self._state_length), 'The states have to be of shape (len(t), state_length).'
+        float_outputs, int_outputs = self._compiled_output_trajectory(t, states, self._extras)
+        names = self._outputs.keys() if names is None else names
+        values = dict()
+        for name in names:
+            output = self._outputs[name]
+            buffer = float_outputs if output.dtype == float_base_type else int_outputs
+            values[name] = buffer[:, output.slice_start:output.slice_stop].copy()
+        return values
+
+    def compile(self, numba_compile=True, inline=False, parallel=False):
+        """Compiles the system equation of the system.
 
-    def compile(self, numba_compile=True):
+        Args:
+            numba_compile(bool): Flag, if the generated functions are compiled with numba.
+            inline(bool): Flag, if the whole system is generated into a single kernel with all output and state
+                equations inlined in topological order. This takes longer to compile, but speeds up each evaluation
+                of systems with many small components considerably. Otherwise, the system equation calls one
+                separately compiled function per output and state.
+            parallel(bool): Flag, if the outputs and the states are split into independent partitions (see
+                sb.utils.find_partitions), that are computed in parallel on multiple cores with a single parallel
+                loop per evaluation. This pays off for large systems of many independent parts, e.g. many separately
+                controlled motors, whose equations are expensive compared to the overhead of starting the threads.
+                Systems without independent parts are computed sequentially. Not combinable with inline.
+        """
+        assert not (inline and parallel), 'The inlined system equation cannot be computed in parallel.'
 
+        self._update_output_order()
         current_extra_idx = [0]
         extras = []
 
@@ -101,7 +344,7 @@ class System:
         int_index = 0
 
         for state in self._states.values():
-            state_index += set_slice_indices(state, state_index)
+            state_index = set_slice_indices(state, state_index)
 
         for output in self._outputs.values():
             if output.dtype == float_base_type:
@@ -109,8 +352,24 @@ class System:
             elif output.dtype == int_base_type:
                 int_index = set_slice_indices(output, int_index)
 
+        # All parameters are stored in a single buffer, that is passed as extra to the generated functions
+        parameter_index = 0
+        for parameters in self._component_parameters.values():
+            parameter_index = set_slice_indices(parameters, parameter_index)
+        self._parameter_buffer = None
+        if parameter_index > 0:
+            self._parameter_buffer = np.zeros(parameter_index, dtype=float)
+            self._parameter_buffer_index = get_extra_index(self._parameter_buffer)
+            for parameters in self._component_parameters.values():
+                self._parameter_buffer[parameters.slice_start:parameters.slice_stop] = parameters.default_values
+                parameters.buffer_index = self._parameter_buffer_index
+
+        self._set_jacobian_structure()
+
         for component in self._components.values():
             component.compile(get_extra_index, numba_compile=numba_compile)
+        for logger in self._loggers.values():
+            logger.compile(get_extra_index, numba_compile=numba_compile)
 
         self._extras = tuple(extras)
         self._float_output_values = np.zeros(float_index, dtype=float)
@@ -123,14 +382,723 @@ class System:
             output.compile(global_extra_type)
         for state in self._states.values():
             state.compile(global_extra_type)
-        state_functions = tuple([state.state_function for state in self._states.values()])
-        output_functions = tuple([output.output_function for output in self._outputs.values()])
         state_length = self._state_length
         float_length = sum(output.size for output in self._outputs.values() if output.dtype == float_base_type)
         int_length = sum(output.size for output in self._outputs.values() if output.dtype == int_base_type)
-        system_equation = create_system_equation(state_functions, output_functions, state_length, float_length, int_length, global_extra_type)
+        # Each algebraic loop is solved by one loop function, that takes the place of the output functions of the loop.
+        # The scratch buffers of the loops follow the outputs in the float output buffer.
+        buffer_starts = float_length + np.cumsum(
+            [0] + [algebraic_loop_buffer_length(loop) for loop in self._output_ordering.algebraic_loops]
+        )
+        algebraic_loops = tuple(
+            (
+                tuple(loop),
+                create_algebraic_loop_function(
+                    tuple(output.output_function for output in loop), tuple(output.argument_slices for output in loop),
+                    global_extra_type
+                ),
+                create_algebraic_loop_indices(loop, buffer_start)
+            )
+            for loop, buffer_start in zip(self._output_ordering.algebraic_loops, buffer_starts)
+        )
+        # Outputs, that no state, system output or logger depends on, are not computed in the system equation
+        self._live_outputs = self._find_live_outputs()
+        live_outputs = tuple(output for output in self._outputs.values() if output in self._live_outputs)
+        live_loops = tuple(loop for loop in algebraic_loops if loop[0][0] in self._live_outputs)
+        # Constant and time-only outputs are computed first and cached in the workspace
+        self._output_dependencies = sb.utils.find_output_dependencies(
+            self._outputs.values(), self._output_ordering.algebraic_loops
+        )
+        if inline:
+            constant_outputs, time_outputs, state_outputs = self._group_outputs(live_outputs)
+            system_equation_inplace, source = create_inlined_system_equation_inplace(
+                tuple(self._states.values()), constant_outputs + time_outputs + state_outputs, global_extra_type,
+                live_loops, len(constant_outputs), len(time_outputs)
+            )
+        else:
+            states = tuple(self._states.values())
+            partitions = None
+            if parallel:
+                live_outputs, states, partitions = self._partitioned_outputs(live_outputs, states, live_loops)
+            output_functions, output_slices, constant_count, time_count = self._grouped_output_calls(
+                live_outputs, live_loops
+            )
+            system_equation_inplace, source = create_system_equation_inplace(
+                tuple([state.state_function for state in states]),
+                tuple([state.argument_slices for state in states]),
+                output_functions,
+                output_slices,
+                global_extra_type,
+                constant_count,
+                time_count,
+                partitions
+            )
+        system_equation, create_workspace = create_system_equation(
+            system_equation_inplace, state_length, int(buffer_starts[-1]), int_length, global_extra_type
+        )
+        self._generated_source = source
+        self._algebraic_loop_functions = algebraic_loops
+        self._compiled_output_trajectory = None
+        self._global_extra_type = global_extra_type
+        self._compiled_system_equation = system_equation
+        self._compiled_system_equation_inplace = system_equation_inplace
+        self._create_workspace = create_workspace
+        self._log_step = None
+        if len(self._loggers) > 0:
+            self._log_step = create_log_function(
+                system_equation_inplace, tuple(self._loggers.values()), state_length, global_extra_type
+            )
+        self._events, self._discrete = self._create_discrete_functions(
+            system_equation_inplace, state_length, global_extra_type
+        )
+        self._simulations = dict()
+        self._compiled_system_jacobian = None
+        self._compiled_dense_jacobian = None
 
         self._system_equation = \
             lambda t, global_state: system_equation(
                 t, global_state, self._extras
             )
+        self._compiled = True
+
+    def _create_discrete_functions(self, system_equation_inplace, state_length, global_extra_type):
+        """Creates the functions of the zero crossing events and of the discrete updates of all components.
+
+        The discrete updates are executed in the topological order of the outputs of their components, so that each
+        update reads the outputs after the updates of the components it depends on.
+
+        Returns:
+            Tuple(tuple, tuple): The events (evaluate_events, apply_event, directions) and the discrete updates
+            (discrete_update, periods, offsets) of the system. None, if the system has no events or discrete updates.
+        """
+        position = dict()
+        for i, output in enumerate(self._outputs.values()):
+            position.setdefault(output.component, i)
+        components = sorted(self._components.values(), key=lambda c: position.get(c, len(position)))
+        events = tuple(event for component in components for event in component.events.values())
+        tasks = tuple(task for component in components for task in component.discrete_tasks.values())
+        events_ = None
+        if len(events) > 0:
+            events_ = create_event_functions(system_equation_inplace, events, state_length, global_extra_type)
+        discrete = None
+        if len(tasks) > 0:
+            discrete = create_discrete_update(system_equation_inplace, tasks, state_length, global_extra_type)
+        return events_, discrete
+
+    @staticmethod
+    def _output_calls(outputs, algebraic_loops):
+        """The output functions and their argument slices to call in order to compute the outputs.
+
+        Returns:
+            Tuple(Tuple[Callable], Tuple[np.ndarray]): The functions and slices. The loop function of an algebraic
+            loop with its loop indices takes the place of the outputs of the loop.
+        """
+        first_outputs = {loop[0]: (loop_function, indices) for loop, loop_function, indices in algebraic_loops}
+        loop_members = {output for loop, _, _ in algebraic_loops for output in loop}
+        output_functions = []
+        output_slices = []
+        for output in outputs:
+            if output in first_outputs:
+                output_functions.append(first_outputs[output][0])
+                output_slices.append(first_outputs[output][1])
+            elif output not in loop_members:
+                output_functions.append(output.output_function)
+                output_slices.append(output.argument_slices)
+        return tuple(output_functions), tuple(output_slices)
+
+    def _group_outputs(self, outputs):
+        """Splits the outputs into the constant, the time-only and the state dependent outputs.
+
+        The outputs keep their topological order within each group. As outputs never depend on outputs of a later
+        group, the concatenated groups are in topological order, too.
+        """
+        return tuple(
+            tuple(output for output in outputs if self._output_dependencies[output] == kind)
+            for kind in sb.utils.dependency_kinds
+        )
+
+    def _grouped_output_calls(self, outputs, algebraic_loops):
+        """The output calls (see _output_calls) of the constant, the time-only and the state dependent outputs.
+
+        Returns:
+            Tuple(Tuple[Callable], Tuple[np.ndarray], int, int): The functions and slices of all groups and the numbers
+            of calls of constant and of time-only outputs.
+        """
+        calls = [self._output_calls(group, algebraic_loops) for group in self._group_outputs(outputs)]
+        output_functions = sum((functions for functions, _ in calls), ())
+        output_slices = sum((slices for _, slices in calls), ())
+        return output_functions, output_slices, len(calls[0][0]), len(calls[1][0])
+
+    def _partitioned_outputs(self, outputs, states, algebraic_loops):
+        """Sorts the state dependent outputs and the states by their partition (see sb.utils.find_partitions).
+
+        Returns:
+            Tuple(Tuple[Output], Tuple[State], Tuple[Tuple[int, int]]): The constant and time-only outputs followed by
+            the state dependent outputs sorted by partition, the states sorted by partition and the number of output
+            calls and of states of each partition. An algebraic loop counts as a single call.
+        """
+        constant_outputs, time_outputs, state_outputs = self._group_outputs(outputs)
+        loops = tuple(loop for loop, _, _ in algebraic_loops)
+        partitions = sb.utils.find_partitions(state_outputs, states, loops)
+        # The sorting is stable, so that the outputs of each partition keep their topological order
+        state_outputs = tuple(sorted(state_outputs, key=lambda output: partitions[output]))
+        states = tuple(sorted(states, key=lambda state: partitions[state]))
+        skipped = {output for loop in loops for output in loop[1:]}
+        counts = [[0, 0] for _ in range(max(partitions.values()) + 1 if partitions else 0)]
+        for output in state_outputs:
+            if output not in skipped:
+                counts[partitions[output]][0] += 1
+        for state in states:
+            counts[partitions[state]][1] += 1
+        return constant_outputs + time_outputs + state_outputs, states, tuple(tuple(count) for count in counts)
+
+    def _find_live_outputs(self):
+        """Finds all outputs, that the states, the system outputs, the loggers, the events or the discrete updates
+        depend on directly or indirectly."""
+        roots = [input_ for state in self._states.values() for input_ in state.component_inputs]
+        roots += list(self._system_output.inputs.values())
+        roots += [input_ for logger in self._loggers.values() for input_ in logger.inputs.values()]
+        roots += [
+            input_ for component in self._components.values() if component.events or component.discrete_tasks
+            for input_ in component.inputs.values()
+        ]
+        return self._find_required_outputs(roots)
+
+    @staticmethod
+    def _find_required_outputs(roots):
+        """Finds all outputs, that the inputs roots depend on directly or indirectly."""
+        live_outputs = set()
+        next_outputs = [input_.external_output for input_ in roots if input_.connected]
+        while len(next_outputs) > 0:
+            output = next_outputs.pop()
+            if output in live_outputs:
+                continue
+            live_outputs.add(output)
+            next_outputs.extend(input_.external_output for input_ in output.component_inputs if input_.connected)
+        return live_outputs
+
+    @staticmethod
+    def _structural_columns(holder, loop=()):
+        columns = set()
+        if holder.dtype != float_base_type:
+            return []
+        if holder.component.state is not None:
+            columns.update(holder.component.state.local_slice)
+        for input_ in holder.component_inputs:
+            if input_.connected and input_.dtype == float_base_type and input_.external_output not in loop:
+                columns.update(input_.external_output.jacobian_columns)
+        return sorted(columns)
+
+    def _set_jacobian_structure(self):
+        """Sets the structural state dependencies of all outputs and states from the connections in the system.
+
+        The jacobian of each output is stored as row major block over its structural columns in a flat buffer.
+        The blocks of the states form the data of the CSR matrix of the system jacobian.
+        """
+        output_jacobian_length = 0
+        # All float outputs of an algebraic loop depend on the union of the dependencies of the loop
+        loops = {output: loop for loop in self._output_ordering.algebraic_loops for output in loop}
+        loop_columns = dict()
+        for output in self._outputs.values():
+            if output in loops:
+                loop = loops[output]
+                if output not in loop_columns:
+                    columns = sorted(set().union(*(self._structural_columns(member, loop) for member in loop)))
+                    for member in loop:
+                        loop_columns[member] = columns if member.dtype == float_base_type else []
+                output.jacobian_columns = loop_columns[output]
+            else:
+                output.jacobian_columns = self._structural_columns(output)
+            output.jacobian_offset = output_jacobian_length
+            output_jacobian_length += output.size * len(output.jacobian_columns)
+        indices = []
+        indptr = [0]
+        for state in self._states.values():
+            state.jacobian_columns = self._structural_columns(state)
+            state.jacobian_offset = indptr[-1]
+            for _ in range(state.size):
+                indices.extend(state.jacobian_columns)
+                indptr.append(indptr[-1] + len(state.jacobian_columns))
+        self._output_jacobian_length = output_jacobian_length
+        self._jacobian_indices = np.array(indices, dtype=np.int64)
+        self._jacobian_indptr = np.array(indptr, dtype=np.int64)
+
+    def _has_jacobian_equations(self):
+        holders = [output for output in self._outputs.values() if output in self._live_outputs] \
+            + list(self._states.values())
+        return all(holder.jacobian_equation is not None for holder in holders if len(holder.jacobian_columns) > 0)
+
+    def _get_compiled_system_jacobian(self):
+        if self._compiled_system_jacobian is None:
+            # Concurrent run contexts create the jacobian once (see _get_fixed_step_simulation)
+            with self._simulation_lock:
+                if self._compiled_system_jacobian is None:
+                    self._compiled_system_jacobian = self._create_system_jacobian()
+        return self._compiled_system_jacobian
+
+    def _create_system_jacobian(self):
+        # The chain rule through the outputs requires an output order without algebraic loops
+        if self._has_jacobian_equations() and len(self._output_ordering.algebraic_loops) == 0:
+            live_outputs = tuple(output for output in self._outputs.values() if output in self._live_outputs)
+            for output in live_outputs:
+                output.compile_jacobian(self._global_extra_type)
+            for state in self._states.values():
+                state.compile_jacobian(self._global_extra_type)
+            outputs = tuple(output for output in live_outputs if output.jacobian_function is not None)
+            states = tuple(state for state in self._states.values() if state.jacobian_function is not None)
+            return create_system_jacobian(
+                tuple(output.output_function for output in live_outputs),
+                tuple(output.argument_slices for output in live_outputs),
+                tuple(output.jacobian_function for output in outputs),
+                tuple(output.argument_slices for output in outputs),
+                tuple(state.jacobian_function for state in states),
+                tuple(state.argument_slices for state in states),
+                len(self._float_output_values),
+                len(self._int_output_values),
+                self._output_jacobian_length,
+                len(self._jacobian_indices),
+                self._global_extra_type
+            )
+        else:
+            colors = sb.utils.color_columns(self._jacobian_indices, self._jacobian_indptr, self._state_length)
+            entry_colors = colors[self._jacobian_indices]
+            color_entries = np.argsort(entry_colors, kind='stable')
+            color_pointers = np.searchsorted(entry_colors[color_entries], np.arange(colors.max(initial=-1) + 2))
+            return create_colored_finite_difference_jacobian(
+                self._compiled_system_equation, self._jacobian_indices, self._jacobian_indptr, color_entries,
+                color_pointers.astype(np.int64), self._global_extra_type
+            )
+
+    def _get_compiled_dense_jacobian(self):
+        if self._compiled_dense_jacobian is None:
+            with self._simulation_lock:
+                if self._compiled_dense_jacobian is None:
+                    self._compiled_dense_jacobian = create_dense_jacobian(
+                        self._get_compiled_system_jacobian(), self._jacobian_indices, self._jacobian_indptr,
+                        self._state_length, self._global_extra_type
+                    )
+        return self._compiled_dense_jacobian
+
+    def simulate(
+        self, t_span, x0, dt=None, method='euler', t_eval=None, rtol=1e-6, atol=1e-9, max_step=np.inf, sink=None
+    ):
+        """Simulates the system within a single compiled call.
+
+        The fixed step methods ('euler', 'heun', 'rk4') integrate on an equidistant grid with the step size dt. Their
+        whole trajectory kernel is generated around the system equation and compiled on its first use. The adaptive
+        method 'dopri5' integrates with error control and interpolates the states on the output grid t_eval (or an
+        equidistant grid with spacing dt). If no output grid is specified, the accepted steps are returned.
+        The implicit methods 'implicit_euler' and 'bdf2' are meant for stiff systems. They integrate with the fixed
+        step size dt, which may be orders of magnitude larger than the fastest time constant of the system.
+        The loggers of the system are reset and record their inputs at the accepted steps of the simulation.
+        Zero crossing events and discrete updates of the components are supported by the explicit methods. 'dopri5'
+        locates the zero crossings and stops at the sample hits. The fixed step methods handle both at the grid points.
+        With a sink (see simba.sinks), a fixed step simulation runs in chunks, that are written into files by a
+        separate thread, so that trajectories larger than the memory can be simulated.
+
+        Args:
+            t_span(Tuple(float, float)): Start and end time of the simulation.
+            x0(np.ndarray): Initial state of the system.
+            dt(float): Step size of the fixed step methods. Spacing of the output grid for adaptive methods.
+            method(str): Integration method. One of 'euler', 'heun', 'rk4', 'dopri5', 'implicit_euler' and 'bdf2'.
+            t_eval(np.ndarray): Output grid of adaptive methods. Takes precedence over dt.
+            rtol(float): Relative tolerance of adaptive methods and of the Newton iteration of implicit methods.
+            atol(float): Absolute tolerance of adaptive methods and of the Newton iteration of implicit methods.
+            max_step(float): Maximal step size of adaptive methods.
+            sink(ResultSink): Sink, that the states and the samples of the loggers are streamed into. Only for the
+                explicit fixed step methods. The samples of the loggers are read with sink.load().
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray): The time grid of shape (n_steps,) and the states of shape
+            (n_steps, state_length). With a sink, they are read lazily from its files.
+        """
+        return self._simulate(self._extras, t_span, x0, dt, method, t_eval, rtol, atol, max_step, sink)
+
+    def _simulate(self, extras, t_span, x0, dt, method, t_eval, rtol, atol, max_step, sink):
+        """Simulates the system (see simulate) with the extras of a run context."""
+        assert self._compiled, 'The system has to be compiled before the simulation.'
+        t0, t1 = float(t_span[0]), float(t_span[1])
+        assert t1 > t0
+        x0 = np.asarray(x0, dtype=float)
+        assert x0.shape == (self._state_length,), \
+            f'Shape mismatch: x0 has shape {x0.shape}, the system has {self._state_length} states.'
+        if method in ('dopri5', 'implicit_euler', 'bdf2'):
+            assert type(self._compiled_system_equation) == nb.core.registry.CPUDispatcher, \
+                f'The method {method} requires a numba compiled system.'
+        for logger in self._loggers.values():
+            logger.reset(extras)
+        if method == 'dopri5':
+            if t_eval is None and dt is not None:
+                t_eval = t0 + np.arange(int(round((t1 - t0) / dt)) + 1) * dt
+            grid = np.asarray(t_eval if t_eval is not None else (), dtype=float)
+            t_steps, x_steps, x_eval, status = self._get_adaptive_simulation()(
+                t0, t1, x0, grid, extras, float(rtol), float(atol), float(max_step)
+            )
+            assert status == 0, f'The integration failed with status {status} at t={t_steps[-1]}.'
+            if t_eval is None:
+                return t_steps, x_steps
+            return grid, x_eval
+        assert dt is not None and dt > 0.0, 'Fixed step methods require a step size dt > 0.'
+        n_steps = int(round((t1 - t0) / dt)) + 1
+        if sink is not None:
+            assert method in fixed_step_methods, \
+                f'Sinks support only the explicit fixed step methods {fixed_step_methods}.'
+            return self._simulate_into_sink(extras, t0, float(dt), n_steps, x0, method, sink)
+        if method in ('implicit_euler', 'bdf2'):
+            assert self._events is None and self._discrete is None, \
+                f'The method {method} does not support events and discrete updates.'
+            order = 1 if method == 'implicit_euler' else 2
+            states, status, _ = self._get_implicit_simulation()(
+                t0, float(dt), n_steps, x0, extras, order, float(rtol), float(atol)
+            )
+            assert status == 0, f'The integration failed with status {status} at t={t0 + (len(states) - 1) * dt}.'
+            return t0 + np.arange(n_steps) * dt, states
+        states = self._get_fixed_step_simulation(method)(t0, float(dt), n_steps, x0, extras)
+        return t0 + np.arange(n_steps) * dt, states
+
+    def simulate_batch(self, t_span, x0s, dt, method='euler', extras=None, parameters=None):
+        """Simulates an ensemble of systems with different initial states and extras within a single compiled call.
+
+        The members are integrated in parallel on all cores with a fixed step method. Each member works on its own
+        copy of the extras, so that components with memory in their extras (e.g. integrators of controllers) do
+        not influence each other. The runtime parameters of the members are varied with the parameters argument.
+        The member extras are stacked over the ensemble. Therefore, all extras have to be numpy arrays.
+
+        Args:
+            t_span(Tuple(float, float)): Start and end time of the simulation.
+            x0s(np.ndarray): Initial states of the members of shape (n_members, state_length).
+            dt(float): Step size.
+            method(str): Integration method. One of 'euler', 'heun' and 'rk4'.
+            extras(Sequence(tuple)): One extras tuple per member with the structure of System.extras.
+                If not passed, every member starts with a copy of the current System.extras.
+            parameters(Mapping(str, np.ndarray)): Values of runtime parameters per member by their names
+                'component.parameter'. Parameters that are not passed keep their current values for all members.
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray): The time grid of shape (n_steps,) and the states of shape
+            (n_members, n_steps, state_length).
+        """
+        assert self._compiled, 'The system has to be compiled before the simulation.'
+        t0, t1 = float(t_span[0]), float(t_span[1])
+        assert t1 > t0
+        assert dt > 0.0, 'The step size dt has to be positive.'
+        x0s = np.ascontiguousarray(x0s, dtype=float)
+        assert x0s.ndim == 2 and x0s.shape[1] == self._state_length, \
+            f'Shape mismatch: x0s has shape {x0s.shape}, expected (n_members, {self._state_length}).'
+        batch_extras = self._stack_extras(x0s.shape[0], extras, parameters)
+        key = ('batch', method)
+        with self._simulation_lock:
+            if key not in self._simulations:
+                batch_extra_type = nb.types.Tuple(tuple(nb.typeof(extra) for extra in batch_extras))
+                self._simulations[key] = create_batch_simulation(
+                    self._get_fixed_step_simulation(method), self._state_length, len(self._extras), batch_extra_type
+                )
+        n_steps = int(round((t1 - t0) / dt)) + 1
+        states = self._simulations[key](t0, float(dt), n_steps, x0s, batch_extras)
+        return t0 + np.arange(n_steps) * dt, states
+
+    def _stack_extras(self, n_members, extras, parameters):
+        """Stacks the extras of the members of a batch and sets the runtime parameters of each member."""
+        if extras is None:
+            extras = [self._extras] * n_members
+        assert len(extras) == n_members, 'Pass one extras tuple per member.'
+        assert all(isinstance(extra, np.ndarray) for extra in self._extras), \
+            'Batch computations require all extras to be numpy arrays.'
+        batch_extras = tuple(
+            np.ascontiguousarray(np.stack([member_extras[i] for member_extras in extras]), dtype=extra.dtype)
+            for i, extra in enumerate(self._extras)
+        )
+        for name, values in (parameters or {}).items():
+            values = np.asarray(values, dtype=float)
+            assert values.shape == (n_members,), f'Pass one value of {name} per member.'
+            batch_extras[self._parameter_buffer_index][:, self._parameter_index(name)] = values
+        return batch_extras
+
+    def find_operating_point(self, inputs=None, x_guess=None, t=0.0, rtol=1e-10, atol=1e-12, max_iterations=100):
+        """Finds an operating point (steady state) x of the system with system_equation(t, x) = 0.
+
+        The compiled system equation is solved with a damped Newton iteration with the system jacobian, that falls
+        back to Levenberg-Marquardt steps far from the solution (see simba.solvers.create_levenberg_marquardt). The
+        operating conditions are given by runtime parameters of the components, e.g. the load torque of a mechanical
+        load. They are applied to a copy of the extras, so that the system keeps its parameters. Time dependent
+        outputs (e.g. of a TFunction) are evaluated at the time t.
+
+        Args:
+            inputs(Mapping(str, float)): Values of runtime parameters by their names 'component.parameter'.
+                Parameters that are not passed keep their current values.
+            x_guess(np.ndarray): Initial guess of the state. Zeros, if not passed.
+            t(float): Time of the operating point.
+            rtol(float): Relative tolerance of the state.
+            atol(float): Absolute tolerance of the state.
+            max_iterations(int): Maximal number of iterations.
+
+        Returns:
+            np.ndarray: The state of the operating point.
+        """
+        assert self._compiled, 'The system has to be compiled before searching an operating point.'
+        assert type(self._compiled_system_equation) == nb.core.registry.CPUDispatcher, \
+            'The operating point search requires a numba compiled system.'
+        x_guess = np.zeros(self._state_length) if x_guess is None else np.asarray(x_guess, dtype=float)
+        assert x_guess.shape == (self._state_length,), \
+            f'Shape mismatch: x_guess has shape {x_guess.shape}, the system has {self._state_length} states.'
+        extras = tuple(copy.deepcopy(extra) for extra in self._extras)
+        for name, value in (inputs or {}).items():
+            extras[self._parameter_buffer_index][self._parameter_index(name)] = value
+        with self._simulation_lock:
+            if 'operating_point' not in self._simulations:
+                self._simulations['operating_point'] = create_operating_point(
+                    self._compiled_system_equation_inplace, self._get_compiled_dense_jacobian(),
+                    self._create_workspace, self._global_extra_type
+                )
+        x, status, iterations = self._simulations['operating_point'](
+            float(t), x_guess, extras, float(rtol), float(atol), int(max_iterations)
+        )
+        assert status == 0, f'The operating point search failed with status {status} after {iterations} iterations.'
+        return x
+
+    def find_operating_points(
+        self, inputs=None, x_guesses=None, n_members=None, t=0.0, rtol=1e-10, atol=1e-12, max_iterations=100
+    ):
+        """Finds the operating points of an ensemble of operating conditions within a single compiled call.
+
+        The members are solved in parallel on all cores like in find_operating_point. Each member works on its own
+        copy of the extras, whose runtime parameters are set by the inputs. As in simulate_batch, all extras have
+        to be numpy arrays.
+
+        Args:
+            inputs(Mapping(str, np.ndarray)): Values of runtime parameters per member by their names
+                'component.parameter'. Parameters that are not passed keep their current values for all members.
+            x_guesses(np.ndarray): Initial guesses of shape (n_members, state_length). Zeros, if not passed.
+            n_members(int): Number of members. Only required, if neither inputs nor x_guesses are passed.
+            t(float): Time of the operating points.
+            rtol(float): Relative tolerance of the states.
+            atol(float): Absolute tolerance of the states.
+            max_iterations(int): Maximal number of iterations per member.
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray): The states of shape (n_members, state_length) and the status of each
+            member (see simba.solvers.create_levenberg_marquardt). The states of members with a status other than 0
+            are no operating points.
+        """
+        assert self._compiled, 'The system has to be compiled before searching operating points.'
+        assert type(self._compiled_system_equation) == nb.core.registry.CPUDispatcher, \
+            'The operating point search requires a numba compiled system.'
+        inputs = inputs or {}
+        if n_members is None:
+            if x_guesses is not None:
+                n_members = len(x_guesses)
+            else:
+                assert len(inputs) > 0, 'Pass the inputs, the initial guesses or the number of members.'
+                n_members = len(next(iter(inputs.values())))
+        if x_guesses is None:
+            x_guesses = np.zeros((n_members, self._state_length))
+        x_guesses = np.ascontiguousarray(x_guesses, dtype=float)
+        assert x_guesses.shape == (n_members, self._state_length), \
+            f'Shape mismatch: x_guesses has shape {x_guesses.shape}, expected ({n_members}, {self._state_length}).'
+        batch_extras = self._stack_extras(n_members, None, inputs)
+        key = ('operating_point',)
+        with self._simulation_lock:
+            if key not in self._simulations:
+                batch_extra_type = nb.types.Tuple(tuple(nb.typeof(extra) for extra in batch_extras))
+                self._simulations[key] = create_batch_operating_point(
+                    self._compiled_system_equation_inplace, self._get_compiled_dense_jacobian(),
+                    self._create_workspace, self._state_length, len(self._extras), batch_extra_type
+                )
+        return self._simulations[key](float(t), x_guesses, batch_extras, rtol, atol, max_iterations)
+
+    def find_rate_groups(self, t, x, dt, max_ratio=1024):
+        """Assigns the states to rate groups by their time constants at a point of operation.
+
+        The time constant of each state is the inverse of the magnitude of the eigenvalue of the system jacobian, whose
+        mode participates most in the state. The fastest state gets the step size dt. Every other state gets dt times
+        the largest power of two, that does not exceed the ratio of its time constant to the fastest one and
+        max_ratio. The heuristic holds only near the point of operation. Check the result against a single rate
+        simulation.
+
+        Args:
+            t(float): Time of the point of operation.
+            x(np.ndarray): State of the point of operation.
+            dt(float): Step size of the fastest states.
+            max_ratio(int): Largest ratio of the step size of a state to dt. A power of two.
+
+        Returns:
+            dict: The step size of each state by its name (see simulate_multirate).
+        """
+        assert self._compiled, 'The system has to be compiled before finding the rate groups.'
+        jacobian = self._get_compiled_dense_jacobian()(float(t), np.asarray(x, dtype=float), self._extras)
+        eigenvalues, right_vectors = np.linalg.eig(jacobian)
+        # The participation of the mode k in the state i is |right_vectors[i, k] * left_vectors[k, i]|
+        participation = np.abs(right_vectors * np.linalg.pinv(right_vectors).T)
+        time_constants = dict()
+        for name, state in self._states.items():
+            mode = np.argmax(np.sum(participation[state.slice_start:state.slice_stop], axis=0))
+            time_constants[name] = 1.0 / np.abs(eigenvalues[mode]) if eigenvalues[mode] != 0.0 else np.inf
+        fastest = min(time_constants.values())
+        if not np.isfinite(fastest):
+            return {name: dt * max_ratio for name in self._states}
+        return {
+            name: dt * min(2 ** int(np.floor(np.log2(time_constant / fastest))), max_ratio)
+            if np.isfinite(time_constant) else dt * max_ratio
+            for name, time_constant in time_constants.items()
+        }
+
+    def simulate_multirate(self, t_span, x0, dt=None, rate_groups=None, method='rk4', max_ratio=1024):
+        """Simulates the system with a separate step size for each rate group of states.
+
+        States with equal step sizes form a rate group. The groups are integrated with the explicit fixed step method
+        over macro steps of the largest step size. Each group evaluates only its own state functions and the outputs
+        they depend on, so that slow states do not pay for the small steps of fast states. The coupling between the
+        groups is approximated. The fastest group is integrated first. The states of faster groups are interpolated
+        linearly over the macro step and the states of slower groups are extrapolated linearly from its start (see
+        create_multirate_simulation). The loggers record at the macro steps.
+
+        Args:
+            t_span(Tuple(float, float)): Start and end time of the simulation.
+            x0(np.ndarray): Initial state of the system.
+            dt(float): Step size of the fastest states, if the rate groups are assigned automatically.
+            rate_groups(Mapping(str, float)): The step size of the states by their names 'component.State'. States,
+                that are not passed, get the smallest step size. All step sizes have to divide the largest one.
+                If not passed, the groups are found with find_rate_groups at the initial state.
+            method(str): Integration method of all groups. One of 'euler', 'heun' and 'rk4'.
+            max_ratio(int): Largest ratio of the step sizes of automatically assigned rate groups.
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray): The macro time grid of shape (n_steps,) and the states of shape
+            (n_steps, state_length).
+        """
+        assert self._compiled, 'The system has to be compiled before the simulation.'
+        assert self._events is None and self._discrete is None, \
+            'Multirate simulations do not support events and discrete updates.'
+        t0, t1 = float(t_span[0]), float(t_span[1])
+        assert t1 > t0
+        x0 = np.asarray(x0, dtype=float)
+        assert x0.shape == (self._state_length,), \
+            f'Shape mismatch: x0 has shape {x0.shape}, the system has {self._state_length} states.'
+        if rate_groups is None:
+            assert dt is not None and dt > 0.0, 'Pass the step size dt of the fastest states or the rate groups.'
+            rate_groups = self.find_rate_groups(t0, x0, dt, max_ratio)
+        unknown = set(rate_groups) - set(self._states)
+        assert not unknown, f'Unknown states {unknown}. Choose from {tuple(self._states.keys())}.'
+        smallest_step = min(rate_groups.values())
+        steps = {name: float(rate_groups.get(name, smallest_step)) for name in self._states}
+        group_steps = tuple(sorted(set(steps.values())))
+        macro_step = group_steps[-1]
+        for step in group_steps:
+            assert step > 0.0 and abs(macro_step / step - round(macro_step / step)) < 1e-9, \
+                f'The step size {step} does not divide the largest step size {macro_step}.'
+        if len(group_steps) == 1:
+            return self.simulate(t_span, x0, macro_step, method)
+        for logger in self._loggers.values():
+            logger.reset()
+        key = ('multirate', method, tuple(steps.items()))
+        with self._simulation_lock:
+            if key not in self._simulations:
+                groups = tuple(
+                    tuple(state for name, state in self._states.items() if steps[name] == step) for step in group_steps
+                )
+                self._simulations[key] = create_multirate_simulation(
+                    tuple(self._create_group_equation(group) for group in groups),
+                    tuple(
+                        np.concatenate(
+                            [np.arange(state.slice_start, state.slice_stop) for state in group]
+                        ).astype(np.int64)
+                        for group in groups
+                    ),
+                    group_steps, self._create_workspace, method, self._state_length, self._global_extra_type,
+                    self._log_step
+                )
+        n_steps = int(round((t1 - t0) / macro_step)) + 1
+        states = self._simulations[key](t0, n_steps, x0, self._extras)
+        return t0 + np.arange(n_steps) * macro_step, states
+
+    def _create_group_equation(self, states):
+        """Creates an in-place system equation, that computes only the derivatives of the states and the outputs, that
+        they depend on."""
+        required_outputs = self._find_required_outputs(
+            [input_ for state in states for input_ in state.component_inputs]
+        )
+        outputs = tuple(output for output in self._outputs.values() if output in required_outputs)
+        loops = tuple(loop for loop in self._algebraic_loop_functions if loop[0][0] in required_outputs)
+        output_functions, output_slices, constant_count, time_count = self._grouped_output_calls(outputs, loops)
+        group_equation, _ = create_system_equation_inplace(
+            tuple(state.state_function for state in states),
+            tuple(state.argument_slices for state in states),
+            output_functions,
+            output_slices,
+            self._global_extra_type,
+            constant_count,
+            time_count
+        )
+        return group_equation
+
+    def _simulate_into_sink(self, extras, t0, dt, n_steps, x0, method, sink):
+        """Simulates the trajectory in chunks of sink.chunk_size steps and passes them to the writer thread of the sink.
+
+        Each chunk continues from the last state of the previous one. The compiled chunks release the GIL, so that the
+        writer thread writes the previous chunk meanwhile.
+        """
+        # A zero crossing at the end of a chunk would be missed, as the next chunk starts from the crossed state
+        assert self._events is None, 'Sinks do not support systems with zero crossing events.'
+        key = ('sink', method)
+        with self._simulation_lock:
+            if key not in self._simulations:
+                self._simulations[key] = create_fixed_step_simulation(
+                    self._compiled_system_equation_inplace, self._create_workspace, method, self._state_length,
+                    self._global_extra_type, self._log_step, log_last_step=False, nogil=True, discrete=self._discrete
+                )
+        simulation = self._simulations[key]
+        sink.start(
+            self._state_length, n_steps,
+            {name: (logger.inputs['In'].size, logger.values_dtype) for name, logger in self._loggers.items()}
+        )
+        try:
+            state = x0
+            step = 0
+            while step < n_steps - 1:
+                chunk_steps = min(sink.chunk_size, n_steps - 1 - step)
+                states = simulation(t0 + step * dt, dt, chunk_steps + 1, state, extras)
+                state = states[-1].copy()
+                # The first state of a chunk is the last state of the previous chunk
+                first = 0 if step == 0 else 1
+                t = t0 + np.arange(step + first, step + chunk_steps + 1) * dt
+                sink.put(t, states[first:], {name: logger.drain(extras) for name, logger in self._loggers.items()})
+                step += chunk_steps
+            if n_steps == 1:
+                sink.put(np.array([t0]), np.atleast_2d(x0), dict())
+            # The last state is logged after the last chunk
+            if self._log_step is not None:
+                self._log_step(t0 + (n_steps - 1) * dt, state, self._create_workspace(), extras, False)
+            sink.put(np.zeros(0), np.zeros((0, self._state_length)),
+                     {name: logger.drain(extras) for name, logger in self._loggers.items()})
+        finally:
+            t, states = sink.finish()
+        return t, states
+
+    def _get_adaptive_simulation(self):
+        with self._simulation_lock:
+            if 'dopri5' not in self._simulations:
+                self._simulations['dopri5'] = create_adaptive_simulation(
+                    self._compiled_system_equation_inplace, self._create_workspace, self._global_extra_type,
+                    self._log_step, events=self._events, discrete=self._discrete
+                )
+        return self._simulations['dopri5']
+
+    def _get_implicit_simulation(self):
+        with self._simulation_lock:
+            if 'bdf' not in self._simulations:
+                self._simulations['bdf'] = create_implicit_simulation(
+                    self._compiled_system_equation_inplace, self._get_compiled_dense_jacobian(), self._create_workspace,
+                    self._global_extra_type, self._log_step
+                )
+        return self._simulations['bdf']
+
+    def _get_fixed_step_simulation(self, method):
+        # The kernels are created once, also if several run contexts are simulated concurrently
+        with self._simulation_lock:
+            if method not in self._simulations:
+                self._simulations[method] = create_fixed_step_simulation(
+                    self._compiled_system_equation_inplace, self._create_workspace, method, self._state_length,
+                    self._global_extra_type, self._log_step, nogil=True, events=self._events,
+                    discrete=self._discrete
+                )
+        return self._simulations[method]
@@ -4,7 +4,10 @@ import numpy as np
 from .output import Output
 from .input import Input
 from .state import State
+from .parameters import Parameters
+from .discrete import ZeroCrossingEvent, DiscreteTask
 from simba.types import float_base_type, float_array
+from simba.core.function_factories.compilation_cache import njit
 
 
 class SystemComponent:
@@ -29,6 +32,21 @@ class SystemComponent:
     def local_state_slice(self):
         return self._state.local_slice if self._state is not None else np.arange(0)
 
+    @property
+    def parameters(self):
+        """The runtime parameters of the component. None, if the component does not declare parameters."""
+        return self._parameters
+
+    @property
+    def events(self):
+        """The zero crossing events of the component by their names."""
+        return self._events
+
+    @property
+    def discrete_tasks(self):
+        """The discrete updates of the component by the names of their update equations."""
+        return self._discrete_tasks
+
     @property
     def extra_index(self):
         return self._extra_index
@@ -37,7 +55,7 @@ class SystemComponent:
     def extra(self):
         return self._extra
 
-    def __init__(self, name: str, inputs=(), outputs=(), state=None):
+    def __init__(self, name: str, inputs=(), outputs=(), state=None, parameters=None):
         assert all(isinstance(o, Output) for o in outputs)
         assert all(isinstance(i, Input) for i in inputs)
         assert state is None or isinstance(state, State)
@@ -48,47 +66,182 @@ class SystemComponent:
         self._state = state
         self._extra_index = None
         self._extra = None
+        self._events = dict()
+        self._discrete_tasks = dict()
+        # Parameters are passed after the local state to the equations of the component
+        self._parameters = Parameters(self, parameters) if parameters else None
 
     def compile(self, get_extra_indices, numba_compile=True):
         raise NotImplementedError
 
-    def output_equation(self, output_name: str, numba_compile: bool = True):
+    @staticmethod
+    def _signal_type(signal, scalar, contiguous=False):
+        """The numba type of a signal passed to an equation. Size-1 signals of scalar equations are scalars."""
+        if scalar and signal.size == 1:
+            return signal.dtype
+        return signal.dtype[::1] if contiguous else signal.dtype[:]
+
+    def output_equation(self, output_name: str, numba_compile: bool = True, scalar: bool = False):
+        """Declares the equation of an output.
+
+        Args:
+            output_name(str): Name of the output.
+            numba_compile(bool): Flag, if the equation is compiled with numba.
+            scalar(bool): Flag, if the local state, inputs and the returned output of size one are scalars instead of
+                arrays of length one. Scalar equations do not allocate memory for size-1 signals.
+        """
 
         def wrapper(func):
+            output = self._outputs[output_name]
+            output.scalar = scalar
             if numba_compile:
-                output_dtype = self._outputs[output_name].dtype[:]
+                output_dtype = self._signal_type(output, scalar)
                 time_dtype = float_base_type
                 input_signature = [time_dtype]
                 if self._state is not None:
-                    input_signature.append(self._state.dtype[:])
+                    input_signature.append(self._signal_type(self._state, scalar))
+                if self._parameters is not None:
+                    input_signature.append(float_array)
                 if self._extra is not None:
                     input_signature.append(nb.typeof(self._extra))
-                for inp in self._outputs[output_name].component_inputs:
-                    if inp.connected:
-                        input_signature.append(inp.dtype[:])
-                    else:
-                        input_signature.append(inp.dtype[::1])
+                for inp in output.component_inputs:
+                    input_signature.append(self._signal_type(inp, scalar, contiguous=not inp.connected))
                 input_signature = tuple(input_signature)
                 signature = output_dtype(*input_signature)
-                func = nb.njit(signature)(func)
-            self._outputs[output_name].output_equation = func
+                func = njit(func, signature)
+            output.output_equation = func
 
         return wrapper
 
-    def state_equation(self, numba_compile: bool = True):
+    def state_equation(self, numba_compile: bool = True, scalar: bool = False):
+        """Declares the equation of the derivatives of the state.
+
+        Args:
+            numba_compile(bool): Flag, if the equation is compiled with numba.
+            scalar(bool): Flag, if the local state, inputs and the returned derivatives of size one are scalars
+                instead of arrays of length one.
+        """
         assert self._state is not None
 
         def wrapper(func):
+            self._state.scalar = scalar
             if numba_compile:
                 time_dtype = float_base_type
-                input_signature = [time_dtype, self._state.dtype[:]]
+                input_signature = [time_dtype, self._signal_type(self._state, scalar)]
+                if self._parameters is not None:
+                    input_signature.append(float_array)
                 if self._extra is not None:
                     input_signature.append(nb.typeof(self._extra))
                 for inp in self._state.component_inputs:
-                    input_signature.append(inp.dtype[:])
+                    input_signature.append(self._signal_type(inp, scalar))
                 input_signature = tuple(input_signature)
-                signature = float_array(*input_signature)
-                func = nb.njit(signature)(func)
+                signature = self._signal_type(self._state, scalar)(*input_signature)
+                func = njit(func, signature)
             self._state.state_equation = func
 
         return wrapper
+
+    def jacobian_equation(self, output_name: str = None, numba_compile: bool = True):
+        """Declares the local partial derivatives of an output or, if no output name is passed, of the state.
+
+        The decorated function takes the same arguments as the corresponding output or state equation. It returns
+        a matrix with one row per signal of the output (or state) and one column per signal of the local state (if the
+        component has a state) followed by the signals of all component inputs of the output (or state) in their order.
+        Size-1 signals are passed as scalars, if the output (or state) equation is scalar. So, the jacobian equation
+        has to be declared after the output (or state) equation.
+        """
+        holder = self._state if output_name is None else self._outputs[output_name]
+        assert holder is not None
+
+        def wrapper(func):
+            if numba_compile:
+                time_dtype = float_base_type
+                input_signature = [time_dtype]
+                if self._state is not None:
+                    input_signature.append(self._signal_type(self._state, holder.scalar))
+                if self._parameters is not None:
+                    input_signature.append(float_array)
+                if self._extra is not None:
+                    input_signature.append(nb.typeof(self._extra))
+                for inp in holder.component_inputs:
+                    contiguous = not (inp.connected or output_name is None)
+                    input_signature.append(self._signal_type(inp, holder.scalar, contiguous))
+                input_signature = tuple(input_signature)
+                signature = float_base_type[:, :](*input_signature)
+                func = njit(func, signature)
+            holder.jacobian_equation = func
+
+        return wrapper
+
+    def _discrete_signature(self, return_type):
+        """The signature of event and discrete update equations. They take all inputs of the component as arrays."""
+        input_signature = [float_base_type]
+        if self._state is not None:
+            input_signature.append(self._state.dtype[:])
+        if self._parameters is not None:
+            input_signature.append(float_array)
+        if self._extra is not None:
+            input_signature.append(nb.typeof(self._extra))
+        for inp in self._inputs.values():
+            input_signature.append(inp.dtype[:])
+        return return_type(*input_signature)
+
+    def event_equation(self, event_name: str, direction: int = 0, numba_compile: bool = True):
+        """Declares the equation of a zero crossing event (see ZeroCrossingEvent).
+
+        The equation takes the time, the local state, the parameters, the extra and all inputs of the component as
+        arrays and returns a float. The update at the event is declared with event_update.
+
+        Args:
+            event_name(str): Name of the event.
+            direction(int): 1 to detect only rising, -1 only falling and 0 all zero crossings.
+            numba_compile(bool): Flag, if the equation is compiled with numba.
+        """
+
+        def wrapper(func):
+            event = ZeroCrossingEvent(self, event_name, direction)
+            if event_name in self._events:
+                event.update_equation = self._events[event_name].update_equation
+            if numba_compile:
+                func = njit(func, self._discrete_signature(float_base_type))
+            event.event_equation = func
+            self._events[event_name] = event
+
+        return wrapper
+
+    def event_update(self, event_name: str, numba_compile: bool = True):
+        """Declares the update of the local state or the extra at a zero crossing event.
+
+        The update equation takes the same arguments as the event equation and changes the local state or the extra
+        in place. The event equation has to be declared first.
+        """
+        assert event_name in self._events, f'Declare the event equation of {event_name} before its update.'
+
+        def wrapper(func):
+            if numba_compile:
+                func = njit(func, self._discrete_signature(nb.none))
+            self._events[event_name].update_equation = func
+
+        return wrapper
+
+    def discrete_update(self, sample_period: float, offset: float = 0.0, numba_compile: bool = True):
+        """Declares a discrete update, that is executed at the sample hits t = offset + k * sample_period.
+
+        The update equation takes the time, the local state, the parameters, the extra and all inputs of the
+        component as arrays. It changes the local state or the extra in place (see DiscreteTask).
+
+        Args:
+            sample_period(float): Time between two sample hits.
+            offset(float): Time of the first sample hit.
+            numba_compile(bool): Flag, if the equation is compiled with numba.
+        """
+
+        def wrapper(func):
+            task = DiscreteTask(self, sample_period, offset)
+            name = func.__name__
+            if numba_compile:
+                func = njit(func, self._discrete_signature(nb.none))
+            task.update_equation = func
+            self._discrete_tasks[name] = task
+
+        return wrapper
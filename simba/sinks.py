@@ -0,0 +1,246 @@
+import os
+import queue
+import shutil
+import threading
+
+import numpy as np
+
+
+class ResultSink:
+    """Base class of the sinks, that stream the results of a simulation into files (see System.simulate).
+
+    The simulation runs in chunks of a fixed number of steps. The time grid, the states and the samples of the loggers
+    of each chunk are passed to a writer thread, that writes them while the next chunk is simulated. At most
+    max_pending chunks wait for the writer. So, the memory stays bounded, if the files are written slower than the
+    simulation runs. After the simulation, the results are reopened lazily from the files.
+    """
+
+    @property
+    def chunk_size(self):
+        """Number of steps simulated and written at once."""
+        return self._chunk_size
+
+    def __init__(self, chunk_size=100_000, max_pending=2):
+        assert chunk_size > 0, 'The chunk size has to be positive.'
+        assert max_pending > 0, 'At least one chunk has to be allowed to wait for the writer.'
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._error = None
+
+    def start(self, state_length, n_steps, loggers):
+        """Opens the files and starts the writer thread.
+
+        Args:
+            state_length(int): Length of the state of the system.
+            n_steps(int): Number of points of the time grid including the initial state.
+            loggers(dict): The size and the numpy dtype of the values of each logger by its name.
+        """
+        assert self._thread is None, 'The sink is already in use by another simulation.'
+        self._error = None
+        self._open(state_length, n_steps, loggers)
+        self._thread = threading.Thread(target=self._run, name=f'{type(self).__name__}Writer', daemon=True)
+        self._thread.start()
+
+    def put(self, t, states, logs):
+        """Passes the results of a chunk to the writer thread. Blocks, while max_pending chunks are waiting.
+
+        Args:
+            t(np.ndarray): The times of the chunk.
+            states(np.ndarray): The states of the chunk of shape (len(t), state_length).
+            logs(dict): The times and the values of the new samples of each logger by its name.
+        """
+        self._queue.put((t, states, logs))
+
+    def finish(self):
+        """Waits for the writer thread, closes the files and reopens the results.
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray): The time grid and the states read lazily from the files (see load).
+        """
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._close()
+        if self._error is not None:
+            raise self._error
+        t, states, _ = self.load()
+        return t, states
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            # After an error, the remaining chunks are consumed to not block the simulation
+            if self._error is None:
+                try:
+                    self._write(*chunk)
+                except Exception as error:
+                    self._error = error
+
+    def load(self):
+        """Reopens the results of the last simulation lazily from the files.
+
+        Returns:
+            Tuple(array_like, array_like, dict): The time grid, the states and the times 't' and the values
+            'signals' of each logger by its name.
+        """
+        raise NotImplementedError
+
+    def _open(self, state_length, n_steps, loggers):
+        raise NotImplementedError
+
+    def _write(self, t, states, logs):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class NpySink(ResultSink):
+    """Streams the results into .npy files in a directory, that are reopened as memory maps.
+
+    The time grid and the states are written into preallocated memory mapped files t.npy and states.npy. The number
+    of samples of the loggers is not known in advance. Their samples are appended to raw files, that are converted
+    into {logger}.t.npy and {logger}.signals.npy after the simulation.
+    """
+
+    def __init__(self, directory, chunk_size=100_000, max_pending=2):
+        super().__init__(chunk_size, max_pending)
+        self._directory = directory
+        self._t = None
+        self._states = None
+        self._position = 0
+        self._log_files = dict()
+        self._logger_names = ()
+
+    def _path(self, name):
+        return os.path.join(self._directory, name)
+
+    def _open(self, state_length, n_steps, loggers):
+        os.makedirs(self._directory, exist_ok=True)
+        self._t = np.lib.format.open_memmap(self._path('t.npy'), mode='w+', dtype=np.float64, shape=(n_steps,))
+        self._states = np.lib.format.open_memmap(
+            self._path('states.npy'), mode='w+', dtype=np.float64, shape=(n_steps, state_length)
+        )
+        self._position = 0
+        self._logger_names = tuple(loggers.keys())
+        self._log_files = {
+            name: {
+                key: (open(self._path(f'{name}.{key}.bin'), 'wb'), shape, dtype, [0])
+                for key, shape, dtype in (('t', (), np.dtype(np.float64)), ('signals', (size,), np.dtype(dtype)))
+            }
+            for name, (size, dtype) in loggers.items()
+        }
+
+    def _write(self, t, states, logs):
+        stop = self._position + len(t)
+        self._t[self._position:stop] = t
+        self._states[self._position:stop] = states
+        self._position = stop
+        for name, samples in logs.items():
+            for key, (file, _, dtype, length) in self._log_files[name].items():
+                file.write(np.ascontiguousarray(samples[key], dtype=dtype).tobytes())
+                length[0] += len(samples[key])
+
+    def _close(self):
+        self._t.flush()
+        self._states.flush()
+        self._t = None
+        self._states = None
+        for files in self._log_files.values():
+            for key, (file, shape, dtype, length) in files.items():
+                file.close()
+                # Prepend the header of the .npy format to the raw samples
+                raw_path = file.name
+                header = {
+                    'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (length[0],) + shape
+                }
+                with open(raw_path[:-len('.bin')] + '.npy', 'wb') as npy_file, open(raw_path, 'rb') as raw_file:
+                    np.lib.format.write_array_header_1_0(npy_file, header)
+                    shutil.copyfileobj(raw_file, npy_file)
+                os.remove(raw_path)
+        self._log_files = dict()
+
+    def load(self):
+        t = np.load(self._path('t.npy'), mmap_mode='r')
+        states = np.load(self._path('states.npy'), mmap_mode='r')
+        logs = {
+            name: {
+                key: np.load(self._path(f'{name}.{key}.npy'), mmap_mode='r') for key in ('t', 'signals')
+            }
+            for name in self._logger_names
+        }
+        return t, states, logs
+
+
+class Hdf5Sink(ResultSink):
+    """Streams the results into chunked datasets of an HDF5 file. Requires the optional package h5py.
+
+    The file contains the datasets 't' and 'states' and a group 'logs' with the datasets 't' and 'signals' of each
+    logger. The results are reopened as h5py datasets, that read the data lazily.
+    """
+
+    def __init__(self, path, chunk_size=100_000, max_pending=2, compression=None):
+        try:
+            import h5py
+        except ImportError as error:
+            raise ImportError('The HDF5 sink requires the optional package h5py.') from error
+        super().__init__(chunk_size, max_pending)
+        self._h5py = h5py
+        self._path = path
+        self._compression = compression
+        self._file = None
+        self._position = 0
+        self._read_file = None
+
+    def _open(self, state_length, n_steps, loggers):
+        if self._read_file is not None:
+            self._read_file.close()
+            self._read_file = None
+        self._file = self._h5py.File(self._path, 'w')
+        chunk_length = max(1, min(self.chunk_size, n_steps))
+        self._file.create_dataset(
+            't', shape=(n_steps,), dtype=np.float64, chunks=(chunk_length,), compression=self._compression
+        )
+        self._file.create_dataset(
+            'states', shape=(n_steps, state_length), dtype=np.float64, chunks=(chunk_length, max(1, state_length)),
+            compression=self._compression
+        )
+        logs = self._file.create_group('logs')
+        for name, (size, dtype) in loggers.items():
+            group = logs.create_group(name)
+            group.create_dataset(
+                't', shape=(0,), maxshape=(None,), dtype=np.float64, chunks=(chunk_length,),
+                compression=self._compression
+            )
+            group.create_dataset(
+                'signals', shape=(0, size), maxshape=(None, size), dtype=dtype, chunks=(chunk_length, max(1, size)),
+                compression=self._compression
+            )
+        self._position = 0
+
+    def _write(self, t, states, logs):
+        stop = self._position + len(t)
+        self._file['t'][self._position:stop] = t
+        self._file['states'][self._position:stop] = states
+        self._position = stop
+        for name, samples in logs.items():
+            for key in ('t', 'signals'):
+                dataset = self._file['logs'][name][key]
+                start = dataset.shape[0]
+                dataset.resize(start + len(samples[key]), axis=0)
+                dataset[start:] = samples[key]
+
+    def _close(self):
+        self._file.close()
+        self._file = None
+
+    def load(self):
+        if self._read_file is None:
+            self._read_file = self._h5py.File(self._path, 'r')
+        logs = {
+            name: {key: group[key] for key in ('t', 'signals')} for name, group in self._read_file['logs'].items()
+        }
+        return self._read_file['t'], self._read_file['states'], logs
@@ -0,0 +1,6 @@
+from .dormand_prince import create_dopri5, dense_output
+from .bdf import create_bdf
+from .finite_differences import finite_difference_jacobian, create_colored_finite_differences
+from .linalg import lu_factor, lu_solve, solve_inplace
+from .algebraic_loop import create_algebraic_loop_solver
+from .operating_point import create_levenberg_marquardt
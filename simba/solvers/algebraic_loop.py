@@ -0,0 +1,88 @@
+import numba as nb
+import numpy as np
+
+from .linalg import solve_inplace
+
+
+def create_algebraic_loop_solver(evaluate):
+    """Creates the function that solves the outputs of an algebraic loop in the output buffer with a Newton iteration.
+
+    One evaluation of the loop computes all outputs of the loop in their order from the current values in the output
+    buffer. The values z of the loop outputs are consistent, if they reproduce themselves: G(z) = z. The Newton
+    iteration approximates the Jacobian of G(z) - z by forward differences. It starts from the values in the buffer,
+    which are the solution of the previous call of the system equation. All intermediate values are kept in the
+    preallocated buffer, so that the iteration does not allocate. The evaluation of the loop is bound in the closure of
+    the solver, so that the functions calling the solver can be cached.
+
+    Args:
+        evaluate(CPUDispatcher): Evaluates all outputs of the loop once with the signature
+            evaluate(t, global_state, global_float_outputs, global_int_outputs, global_extras).
+
+    Returns:
+        CPUDispatcher: The solver solve_algebraic_loop(t, global_state, global_float_outputs, global_int_outputs,
+        global_extras, indices, buffer, rtol=1e-10, atol=1e-12, max_iterations=50).
+    """
+
+    @nb.njit
+    def solve_algebraic_loop(
+        t, global_state, global_float_outputs, global_int_outputs, global_extras, indices, buffer, rtol=1e-10,
+        atol=1e-12, max_iterations=50
+    ):
+        """Solves the outputs of the loop in place.
+
+        Args:
+            t(float): Current time.
+            global_state(np.ndarray): Current state of the system.
+            global_float_outputs(np.ndarray): Buffer of the float outputs. The loop outputs are solved in place.
+            global_int_outputs(np.ndarray): Buffer of the int outputs.
+            global_extras(tuple): Extra data of the system.
+            indices(np.ndarray): Positions of the float outputs of the loop in global_float_outputs.
+            buffer(np.ndarray): Scratch buffer of length n * (n + 3) for the n float outputs of the loop (see
+                algebraic_loop_buffer_length).
+            rtol(float): Relative tolerance of the loop outputs.
+            atol(float): Absolute tolerance of the loop outputs.
+            max_iterations(int): Maximal number of Newton iterations.
+        """
+        n = indices.shape[0]
+        z = buffer[:n]
+        g = buffer[n:2 * n]
+        residual = buffer[2 * n:3 * n]
+        # The jacobian in row-major order
+        jacobian = buffer[3 * n:n * (n + 3)]
+        for i in range(n):
+            z[i] = global_float_outputs[indices[i]]
+        converged = False
+        for _ in range(max_iterations):
+            for i in range(n):
+                global_float_outputs[indices[i]] = z[i]
+            evaluate(t, global_state, global_float_outputs, global_int_outputs, global_extras)
+            for i in range(n):
+                g[i] = global_float_outputs[indices[i]]
+            norm = 0.0
+            for i in range(n):
+                residual[i] = g[i] - z[i]
+                norm = max(norm, np.abs(residual[i]) / (atol + rtol * np.abs(g[i])))
+            if norm <= 1.0:
+                # The buffer holds G(z), which is the solution within the tolerances
+                converged = True
+                break
+            for j in range(n):
+                z_j = z[j]
+                h = np.sqrt(np.finfo(np.float64).eps) * max(1.0, np.abs(z_j))
+                for i in range(n):
+                    global_float_outputs[indices[i]] = z[i]
+                global_float_outputs[indices[j]] = z_j + h
+                evaluate(t, global_state, global_float_outputs, global_int_outputs, global_extras)
+                for i in range(n):
+                    jacobian[i * n + j] = (global_float_outputs[indices[i]] - g[i]) / h
+                jacobian[j * n + j] -= 1.0
+            for i in range(n):
+                residual[i] = -residual[i]
+            # The residual is overwritten with the Newton step
+            if not solve_inplace(jacobian, residual):
+                break
+            for i in range(n):
+                z[i] += residual[i]
+        assert converged, 'The Newton iteration of an algebraic loop did not converge.'
+
+    return solve_algebraic_loop
@@ -0,0 +1,141 @@
+import numba as nb
+import numpy as np
+
+from .linalg import lu_factor, lu_solve
+
+# Status codes of the integration
+SUCCESS = 0
+NEWTON_FAILED = -1
+SINGULAR_MATRIX = -2
+
+_max_newton_iterations = 7
+
+
+def create_bdf(fun, jac, log_step=None):
+    """Creates the fixed step backward differentiation formula of order one or two for a stiff ODE.
+
+    Each step solves the implicit BDF equation with a simplified Newton iteration. The iteration matrix
+    I - gamma * dt * J is LU-factorized once and reused over the following steps as long as the Newton iteration
+    converges. Only if it fails, the Jacobian J is evaluated anew at the current state and the step is repeated.
+    The first step of the second order formula is taken with the first order formula.
+
+    The right hand side, the Jacobian and the log function are bound in the closure of the returned function, so that
+    the integration and the functions calling it can be loaded from the compilation cache.
+
+    Args:
+        fun(CPUDispatcher): In-place right hand side of the ODE with the signature
+            fun(t, x, dxdt, workspace, global_extras) that writes the derivatives into dxdt.
+        jac(CPUDispatcher): Jacobian of the right hand side with the signature jac(t, x, global_extras) -> J.
+        log_step(CPUDispatcher): Optional function log_step(t, x, workspace, global_extras, evaluated), that is called
+            at the start and after each accepted step. The Newton iteration ends with an update of the state, so
+            fun was not evaluated at the accepted step.
+
+    Returns:
+        CPUDispatcher: The integration bdf(t0, dt, n_steps, x0, workspace, global_extras, order=2, rtol=1e-6,
+        atol=1e-9).
+    """
+
+    @nb.njit
+    def iteration_matrix(t, x, global_extras, gamma_h):
+        jacobian = jac(t, x, global_extras)
+        matrix = -gamma_h * jacobian
+        for i in range(x.shape[0]):
+            matrix[i, i] += 1.0
+        return lu_factor(matrix)
+
+    @nb.njit(nogil=True)
+    def bdf(t0, dt, n_steps, x0, workspace, global_extras, order=2, rtol=1e-6, atol=1e-9):
+        """Integrates the ODE on the grid t0 + k * dt.
+
+        Args:
+            t0(float): Start time of the integration.
+            dt(float): Step size.
+            n_steps(int): Number of grid points including the initial state.
+            x0(np.ndarray): Initial state.
+            workspace(tuple): Workspace passed to every evaluation of fun.
+            global_extras(tuple): Extra data of the system passed to every evaluation of fun.
+            order(int): Order of the formula. 1 (implicit Euler) or 2.
+            rtol(float): Relative tolerance of the Newton iteration.
+            atol(float): Absolute tolerance of the Newton iteration.
+
+        Returns:
+            Tuple(np.ndarray, int, int): The states of shape (n_steps, state_length), the status of the integration
+            (SUCCESS=0, NEWTON_FAILED=-1, SINGULAR_MATRIX=-2) and the number of Jacobian evaluations.
+        """
+        state_length = x0.shape[0]
+        states = np.empty((n_steps, state_length))
+        x = x0.astype(np.float64)
+        x_previous = x.copy()
+        psi = np.empty(state_length)
+        z = np.empty(state_length)
+        dxdt = np.empty(state_length)
+        residual = np.empty(state_length)
+        states[0] = x
+        if log_step is not None:
+            log_step(t0, x, workspace, global_extras, False)
+        status = SUCCESS
+        jacobian_evaluations = 0
+        # The iteration matrix depends on the formula. It is factorized anew, when BDF2 takes over from the BDF1 start.
+        gamma_h = dt
+        lu, piv, regular = iteration_matrix(t0, x, global_extras, gamma_h)
+        jacobian_evaluations += 1
+        current_order = 1
+        for step in range(1, n_steps):
+            t_new = t0 + step * dt
+            if current_order == 1:
+                psi[:] = x
+            else:
+                for i in range(state_length):
+                    psi[i] = 4.0 / 3.0 * x[i] - 1.0 / 3.0 * x_previous[i]
+            fresh_jacobian = False
+            converged = False
+            while not converged:
+                if not regular:
+                    status = SINGULAR_MATRIX
+                    break
+                # Extrapolation of the last states as prediction
+                if current_order == 1:
+                    z[:] = x
+                else:
+                    for i in range(state_length):
+                        z[i] = 2.0 * x[i] - x_previous[i]
+                previous_norm = np.inf
+                for _ in range(_max_newton_iterations):
+                    fun(t_new, z, dxdt, workspace, global_extras)
+                    for i in range(state_length):
+                        residual[i] = psi[i] + gamma_h * dxdt[i] - z[i]
+                    dz = lu_solve(lu, piv, residual)
+                    norm = 0.0
+                    for i in range(state_length):
+                        z[i] += dz[i]
+                        norm += (dz[i] / (atol + rtol * abs(z[i]))) ** 2
+                    norm = np.sqrt(norm / state_length)
+                    if norm <= 1.0:
+                        converged = True
+                        break
+                    if norm >= previous_norm:
+                        # Diverging or stagnating iteration
+                        break
+                    previous_norm = norm
+                if not converged:
+                    if fresh_jacobian:
+                        status = NEWTON_FAILED
+                        break
+                    lu, piv, regular = iteration_matrix(t_new - dt, x, global_extras, gamma_h)
+                    jacobian_evaluations += 1
+                    fresh_jacobian = True
+            if status != SUCCESS:
+                return states[:step], status, jacobian_evaluations
+            x_previous[:] = x
+            x[:] = z
+            states[step] = x
+            if log_step is not None:
+                log_step(t_new, x, workspace, global_extras, False)
+            if current_order < order:
+                current_order = order
+                gamma_h = 2.0 / 3.0 * dt
+                lu, piv, regular = iteration_matrix(t_new, x, global_extras, gamma_h)
+                jacobian_evaluations += 1
+        return states, status, jacobian_evaluations
+
+    return bdf
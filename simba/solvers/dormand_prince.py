@@ -0,0 +1,360 @@
+import numba as nb
+import numpy as np
+
+from .events import first_sample_counts, next_sample_hit, due_tasks, event_crossed
+
+# Dormand-Prince 5(4) coefficients
+_c = np.array([0.0, 1.0 / 5.0, 3.0 / 10.0, 4.0 / 5.0, 8.0 / 9.0, 1.0, 1.0])
+_a = np.array([
+    [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [1.0 / 5.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    [3.0 / 40.0, 9.0 / 40.0, 0.0, 0.0, 0.0, 0.0],
+    [44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0, 0.0, 0.0, 0.0],
+    [19372.0 / 6561.0, -25360.0 / 2187.0, 64448.0 / 6561.0, -212.0 / 729.0, 0.0, 0.0],
+    [9017.0 / 3168.0, -355.0 / 33.0, 46732.0 / 5247.0, 49.0 / 176.0, -5103.0 / 18656.0, 0.0],
+])
+_b = np.array([35.0 / 384.0, 0.0, 500.0 / 1113.0, 125.0 / 192.0, -2187.0 / 6784.0, 11.0 / 84.0])
+# Difference between the fifth and the embedded fourth order solution. The last entry belongs to the FSAL stage.
+_e = np.array([
+    -71.0 / 57600.0, 0.0, 71.0 / 16695.0, -71.0 / 1920.0, 17253.0 / 339200.0, -22.0 / 525.0, 1.0 / 40.0
+])
+# Coefficients of the fourth order continuous extension (dense output) in powers of the normalized step time
+_p = np.array([
+    [1.0, -8048581381.0 / 2820520608.0, 8663915743.0 / 2820520608.0, -12715105075.0 / 11282082432.0],
+    [0.0, 0.0, 0.0, 0.0],
+    [0.0, 131558114200.0 / 32700410799.0, -68118460800.0 / 10900136933.0, 87487479700.0 / 32700410799.0],
+    [0.0, -1754552775.0 / 470086768.0, 14199869525.0 / 1410260304.0, -10690763975.0 / 1880347072.0],
+    [0.0, 127303824393.0 / 49829197408.0, -318862633887.0 / 49829197408.0, 701980252875.0 / 199316789632.0],
+    [0.0, -282668133.0 / 205662961.0, 2019193451.0 / 616988883.0, -1453857185.0 / 822651844.0],
+    [0.0, 40617522.0 / 29380423.0, -110615467.0 / 29380423.0, 69997945.0 / 29380423.0],
+])
+
+_max_root_iterations = 100
+
+_safety = 0.9
+_min_factor = 0.2
+_max_factor = 10.0
+_error_exponent = -1.0 / 5.0
+
+# Status codes of the integration
+SUCCESS = 0
+STEP_SIZE_TOO_SMALL = -1
+TOO_MANY_STEPS = -2
+
+
+@nb.njit
+def _rms_norm(x, scale):
+    return np.sqrt(np.mean((x / scale) ** 2))
+
+
+@nb.njit
+def dense_output(t_old, h, x_old, k, t):
+    """Evaluates the continuous extension of an accepted Dormand-Prince step.
+
+    Args:
+        t_old(float): Start time of the step.
+        h(float): Size of the step.
+        x_old(np.ndarray): State at the start of the step.
+        k(np.ndarray): The seven stage derivatives of the step of shape (7, state_length).
+        t(float): Time within [t_old, t_old + h] to evaluate the interpolant at.
+
+    Returns:
+        np.ndarray: The interpolated state at time t.
+    """
+    s = (t - t_old) / h
+    x = x_old.copy()
+    for i in range(7):
+        weight = s * (_p[i, 0] + s * (_p[i, 1] + s * (_p[i, 2] + s * _p[i, 3])))
+        x += h * weight * k[i]
+    return x
+
+
+@nb.njit
+def _grow(array, length):
+    grown = np.empty((length,) + array.shape[1:], dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+
+
+
+def create_dopri5(fun, log_step=None, evaluate_events=None, apply_event=None, directions=None, discrete_update=None,
+                  periods=None, offsets=None):
+    """Creates the adaptive explicit Runge-Kutta method of Dormand and Prince for an ODE.
+
+    The method is of order 5 with an embedded order 4 error estimator. It uses the first-same-as-last property, so
+    that each accepted step costs six evaluations of the right hand side. Values on the output grid are interpolated
+    with the fourth order continuous extension of the method.
+
+    Zero crossings of event equations are located on the continuous extension of the step. The step is cut at the
+    crossing, the state or the extras are updated and the integration restarts from there. The steps end exactly at
+    the sample hits of discrete updates. So, the step size does not collapse at discontinuities. Zero crossings, that
+    cancel out within a single step, are not detected. Limit max_step below the time between such crossings.
+
+    The right hand side and the other functions are bound in the closure of the returned function. Therefore, the
+    whole adaptive integration including all evaluations of the system equation runs within a single compiled call.
+    Unlike compiled functions passed as arguments, the bound functions do not prevent the caching of the compiled
+    integration (see simba.config.set_cache_dir). The stage buffers are allocated once, so that the step loop does not
+    allocate apart from the growth of the returned arrays.
+
+    Args:
+        fun(CPUDispatcher): In-place right hand side of the ODE with the signature
+            fun(t, x, dxdt, workspace, global_extras) that writes the derivatives into dxdt.
+        log_step(CPUDispatcher): Optional function log_step(t, x, workspace, global_extras, evaluated), that is called
+            at the start and after each accepted step. The last evaluation of fun was at the accepted step (FSAL).
+        evaluate_events(CPUDispatcher): Optional function evaluate_events(t, x, workspace, global_extras, values,
+            evaluated), that evaluates the equations of the zero crossing events.
+        apply_event(CPUDispatcher): Function apply_event(index, t, x, workspace, global_extras), that updates x or
+            the extras in place at a zero crossing. Required with evaluate_events.
+        directions(np.ndarray): Direction of each event. Required with evaluate_events.
+        discrete_update(CPUDispatcher): Optional function discrete_update(t, x, workspace, global_extras, due), that
+            executes the due discrete updates at a sample hit.
+        periods(np.ndarray): Sample period of each discrete update. Required with discrete_update.
+        offsets(np.ndarray): Offset of each discrete update. Required with discrete_update.
+
+    Returns:
+        CPUDispatcher: The integration dopri5(t0, t1, x0, t_eval, workspace, global_extras, rtol=1e-6, atol=1e-9,
+        first_step=0.0, max_step=np.inf, max_steps=10_000_000).
+    """
+
+    @nb.njit
+    def initial_step(t0, x0, f0, workspace, global_extras, rtol, atol, max_step):
+        """Estimates a first step size following Hairer, Norsett and Wanner, Solving ODEs I, p. 169."""
+        scale = atol + np.abs(x0) * rtol
+        d0 = _rms_norm(x0, scale)
+        d1 = _rms_norm(f0, scale)
+        if d0 < 1e-5 or d1 < 1e-5:
+            h0 = 1e-6
+        else:
+            h0 = 0.01 * d0 / d1
+        h0 = min(h0, max_step)
+        x1 = x0 + h0 * f0
+        f1 = np.empty(x0.shape[0])
+        fun(t0 + h0, x1, f1, workspace, global_extras)
+        d2 = _rms_norm(f1 - f0, scale) / h0
+        if d1 <= 1e-15 and d2 <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** (1.0 / 5.0)
+        return min(100.0 * h0, h1, max_step)
+
+    @nb.njit
+    def locate_event(t, h, x, k, old_values, new_values, workspace, global_extras):
+        """Locates the earliest zero crossing of the event equations within an accepted Dormand-Prince step.
+
+        The crossing of each event is bracketed by the start and the end of the step and located on the continuous
+        extension of the step with the Illinois variant of the regula falsi.
+
+        Args:
+            t(float): Start time of the step.
+            h(float): Size of the step.
+            x(np.ndarray): State at the start of the step.
+            k(np.ndarray): The stage derivatives of the step.
+            old_values(np.ndarray): Values of the event equations at the start of the step.
+            new_values(np.ndarray): Values of the event equations at the end of the step.
+            workspace(tuple): Workspace of the system equation.
+            global_extras(tuple): Extra data of the system.
+
+        Returns:
+            Tuple(int, float): The index of the earliest event and the time just after its zero crossing. The index
+            is -1, if no event occurs within the step.
+        """
+        values = np.empty(old_values.shape[0])
+        event_index = -1
+        t_event = t + h
+        for j in range(old_values.shape[0]):
+            if not event_crossed(old_values[j], new_values[j], directions[j]):
+                continue
+            a = t
+            b = t + h
+            g_a = old_values[j]
+            g_b = new_values[j]
+            side = 0
+            for _ in range(_max_root_iterations):
+                if b - a <= 4.0 * np.spacing(max(abs(a), abs(b))) or b - a <= 1e-12 * h:
+                    break
+                c = (a * g_b - b * g_a) / (g_b - g_a)
+                if not a < c < b:
+                    c = 0.5 * (a + b)
+                evaluate_events(c, dense_output(t, h, x, k, c), workspace, global_extras, values, False)
+                g_c = values[j]
+                if g_c == 0.0 or (g_c > 0.0) != (g_a > 0.0):
+                    # The crossing is before c
+                    b = c
+                    g_b = g_c
+                    if side == -1:
+                        g_a *= 0.5
+                    side = -1
+                else:
+                    a = c
+                    g_a = g_c
+                    if side == 1:
+                        g_b *= 0.5
+                    side = 1
+            # The end of the bracket is after the crossing, so that the event does not trigger again after the restart
+            if b < t_event or event_index == -1:
+                t_event = b
+                event_index = j
+        return event_index, t_event
+
+    @nb.njit(nogil=True)
+    def dopri5(t0, t1, x0, t_eval, workspace, global_extras, rtol=1e-6, atol=1e-9, first_step=0.0, max_step=np.inf,
+               max_steps=10_000_000):
+        """Integrates the ODE from t0 to t1.
+
+        Args:
+            t0(float): Start time of the integration.
+            t1(float): End time of the integration.
+            x0(np.ndarray): Initial state.
+            t_eval(np.ndarray): Monotonically increasing output grid within [t0, t1]. May be empty.
+            workspace(tuple): Workspace passed to every evaluation of fun.
+            global_extras(tuple): Extra data of the system passed to every evaluation of fun.
+            rtol(float): Relative tolerance of the local error.
+            atol(float): Absolute tolerance of the local error.
+            first_step(float): Initial step size. Estimated automatically, if zero.
+            max_step(float): Maximal step size.
+            max_steps(int): Maximal number of accepted and rejected steps before aborting.
+
+        Returns:
+            Tuple(np.ndarray, np.ndarray, np.ndarray, int): The times of the accepted steps (including t0),
+            the states at the accepted steps, the interpolated states on the output grid t_eval and the status of the
+            integration (SUCCESS=0, STEP_SIZE_TOO_SMALL=-1, TOO_MANY_STEPS=-2).
+        """
+        state_length = x0.shape[0]
+        x = x0.astype(np.float64)
+        t = t0
+        capacity = 1024
+        t_steps = np.empty(capacity)
+        x_steps = np.empty((capacity, state_length))
+        t_steps[0] = t
+        x_steps[0] = x
+        n_accepted = 1
+        x_eval = np.full((t_eval.shape[0], state_length), np.nan)
+        eval_index = 0
+        while eval_index < t_eval.shape[0] and t_eval[eval_index] <= t0:
+            x_eval[eval_index] = x
+            eval_index += 1
+
+        k = np.empty((7, state_length))
+        x_stage = np.empty(state_length)
+        x_new = np.empty(state_length)
+        n_events = 0
+        if evaluate_events is not None:
+            n_events = directions.shape[0]
+        old_values = np.empty(n_events)
+        new_values = np.empty(n_events)
+        n_tasks = 0
+        if discrete_update is not None:
+            n_tasks = periods.shape[0]
+        counts = np.zeros(n_tasks, dtype=np.int64)
+        due = np.zeros(n_tasks, dtype=np.bool_)
+        if discrete_update is not None:
+            counts[:] = first_sample_counts(t0, periods, offsets)
+            if due_tasks(t, periods, offsets, counts, due):
+                discrete_update(t, x, workspace, global_extras, due)
+                x_steps[0] = x
+        fun(t, x, k[0], workspace, global_extras)
+        if evaluate_events is not None:
+            evaluate_events(t, x, workspace, global_extras, old_values, True)
+        if log_step is not None:
+            log_step(t, x, workspace, global_extras, True)
+        if first_step > 0.0:
+            h = first_step
+        else:
+            h = initial_step(t, x, k[0], workspace, global_extras, rtol, atol, max_step)
+        status = SUCCESS
+        steps = 0
+        while t < t1:
+            if steps >= max_steps:
+                status = TOO_MANY_STEPS
+                break
+            steps += 1
+            min_step = 10.0 * np.abs(np.nextafter(t, np.inf) - t)
+            h = min(max(h, min_step), max_step)
+            if t + h > t1:
+                h = t1 - t
+            if discrete_update is not None:
+                t_hit = next_sample_hit(periods, offsets, counts)
+                if t + h > t_hit:
+                    h = t_hit - t
+
+            # Stages 2 to 6 and the fifth order solution, that is evaluated as the seventh (FSAL) stage
+            for i in range(1, 6):
+                for m in range(state_length):
+                    dx = 0.0
+                    for j in range(i):
+                        dx += _a[i, j] * k[j, m]
+                    x_stage[m] = x[m] + h * dx
+                fun(t + _c[i] * h, x_stage, k[i], workspace, global_extras)
+            for m in range(state_length):
+                dx = 0.0
+                for j in range(6):
+                    dx += _b[j] * k[j, m]
+                x_new[m] = x[m] + h * dx
+            t_new = t + h
+            fun(t_new, x_new, k[6], workspace, global_extras)
+
+            error_norm = 0.0
+            for m in range(state_length):
+                error = 0.0
+                for j in range(7):
+                    error += _e[j] * k[j, m]
+                scale = atol + max(abs(x[m]), abs(x_new[m])) * rtol
+                error_norm += (h * error / scale) ** 2
+            error_norm = np.sqrt(error_norm / max(state_length, 1))
+
+            if error_norm <= 1.0:
+                # The step ends at the earliest zero crossing of an event within the step
+                event_index = -1
+                if evaluate_events is not None:
+                    evaluate_events(t_new, x_new, workspace, global_extras, new_values, True)
+                    event_index, t_event = locate_event(t, h, x, k, old_values, new_values, workspace, global_extras)
+                    if event_index >= 0 and t_event < t_new:
+                        t_new = t_event
+                        x_new[:] = dense_output(t, h, x, k, t_event)
+                # Accept the step and interpolate the output grid points within the step
+                while eval_index < t_eval.shape[0] and t_eval[eval_index] <= t_new:
+                    x_eval[eval_index] = dense_output(t, h, x, k, t_eval[eval_index])
+                    eval_index += 1
+                t = t_new
+                x[:] = x_new
+                # Events and discrete updates change the state or the extras, so that the FSAL stage is outdated
+                updated = False
+                if evaluate_events is not None:
+                    if event_index >= 0:
+                        apply_event(event_index, t, x, workspace, global_extras)
+                        updated = True
+                if discrete_update is not None:
+                    if due_tasks(t, periods, offsets, counts, due):
+                        discrete_update(t, x, workspace, global_extras, due)
+                        updated = True
+                if updated:
+                    fun(t, x, k[0], workspace, global_extras)
+                    if evaluate_events is not None:
+                        evaluate_events(t, x, workspace, global_extras, old_values, True)
+                else:
+                    k[0] = k[6]
+                    old_values[:] = new_values
+                if n_accepted == capacity:
+                    capacity *= 2
+                    t_steps = _grow(t_steps, capacity)
+                    x_steps = _grow(x_steps, capacity)
+                t_steps[n_accepted] = t
+                x_steps[n_accepted] = x
+                n_accepted += 1
+                if log_step is not None:
+                    log_step(t, x, workspace, global_extras, True)
+                if error_norm == 0.0:
+                    factor = _max_factor
+                else:
+                    factor = min(_max_factor, _safety * error_norm ** _error_exponent)
+                h = h * factor
+            else:
+                if h <= min_step:
+                    status = STEP_SIZE_TOO_SMALL
+                    break
+                h = h * max(_min_factor, _safety * error_norm ** _error_exponent)
+
+        return t_steps[:n_accepted].copy(), x_steps[:n_accepted].copy(), x_eval, status
+
+    return dopri5
@@ -0,0 +1,64 @@
+import numba as nb
+import numpy as np
+
+
+@nb.njit
+def _hit_tolerance(t):
+    # Sample hits are reached up to the rounding of the time
+    return 1e-9 * max(1.0, abs(t))
+
+
+@nb.njit
+def first_sample_counts(t0, periods, offsets):
+    """The number k of the first sample hit offset + k * period at or after t0 of each discrete task."""
+    counts = np.zeros(periods.shape[0], dtype=np.int64)
+    for j in range(periods.shape[0]):
+        counts[j] = max(0, int(np.ceil((t0 - _hit_tolerance(t0) - offsets[j]) / periods[j])))
+    return counts
+
+
+@nb.njit
+def next_sample_hit(periods, offsets, counts):
+    """The time of the next sample hit of all discrete tasks."""
+    t_hit = np.inf
+    for j in range(periods.shape[0]):
+        t_hit = min(t_hit, offsets[j] + counts[j] * periods[j])
+    return t_hit
+
+
+@nb.njit
+def due_tasks(t, periods, offsets, counts, due):
+    """Marks the discrete tasks, that have a sample hit at (or before) t, and advances their schedule beyond t.
+
+    Args:
+        t(float): Current time.
+        periods(np.ndarray): Sample periods of the tasks.
+        offsets(np.ndarray): Offsets of the tasks.
+        counts(np.ndarray): Number of the next sample hit of each task. Updated in place.
+        due(np.ndarray): Flags of the due tasks. Written in place.
+
+    Returns:
+        bool: True, if any task is due.
+    """
+    any_due = False
+    tolerance = _hit_tolerance(t)
+    for j in range(periods.shape[0]):
+        due[j] = False
+        # Hits, that a fixed step size larger than the sample period skips, are executed only once
+        while offsets[j] + counts[j] * periods[j] <= t + tolerance:
+            due[j] = True
+            counts[j] += 1
+        any_due = any_due or due[j]
+    return any_due
+
+
+@nb.njit
+def event_crossed(old_value, new_value, direction):
+    """Checks, if an event equation crossed zero in the direction (1 rising, -1 falling, 0 both)."""
+    rising = old_value < 0.0 <= new_value
+    falling = old_value > 0.0 >= new_value
+    if direction > 0:
+        return rising
+    if direction < 0:
+        return falling
+    return rising or falling
@@ -0,0 +1,86 @@
+import numba as nb
+import numpy as np
+
+
+@nb.njit
+def finite_difference_jacobian(fun, t, x, f0, global_extras):
+    """Approximates the Jacobian of fun with respect to x by forward differences.
+
+    Args:
+        fun(CPUDispatcher): Right hand side of the ODE with the signature fun(t, x, global_extras) -> dxdt.
+        t(float): Time of the evaluation.
+        x(np.ndarray): State of the evaluation.
+        f0(np.ndarray): fun(t, x, global_extras), that has already been evaluated.
+        global_extras(tuple): Extra data of the system passed to every evaluation of fun.
+
+    Returns:
+        np.ndarray: The Jacobian matrix of shape (state_length, state_length).
+    """
+    n = x.shape[0]
+    jacobian = np.empty((n, n))
+    x_perturbed = x.copy()
+    for j in range(n):
+        h = np.sqrt(np.finfo(np.float64).eps) * max(1.0, np.abs(x[j]))
+        x_perturbed[j] = x[j] + h
+        h = x_perturbed[j] - x[j]
+        jacobian[:, j] = (fun(t, x_perturbed, global_extras) - f0) / h
+        x_perturbed[j] = x[j]
+    return jacobian
+
+
+def create_colored_finite_differences(fun):
+    """Creates the function that approximates a sparse Jacobian of fun with respect to x by forward differences of
+    grouped columns.
+
+    Structurally orthogonal columns (columns without a common nonzero row) share a color and are perturbed at once.
+    Therefore, the Jacobian costs one evaluation of fun per color instead of one per state. fun is bound in the closure
+    of the returned function, so that the functions calling it can be cached.
+
+    Args:
+        fun(CPUDispatcher): Right hand side of the ODE with the signature fun(t, x, global_extras) -> dxdt.
+
+    Returns:
+        CPUDispatcher: The function colored_finite_difference_jacobian(t, x, f0, global_extras, indices, indptr,
+        color_entries, color_pointers), that returns the CSR data of the Jacobian matrix.
+    """
+
+    @nb.njit
+    def colored_finite_difference_jacobian(t, x, f0, global_extras, indices, indptr, color_entries, color_pointers):
+        """Approximates the CSR data of the Jacobian at (t, x).
+
+        Args:
+            t(float): Time of the evaluation.
+            x(np.ndarray): State of the evaluation.
+            f0(np.ndarray): fun(t, x, global_extras), that has already been evaluated.
+            global_extras(tuple): Extra data of the system passed to every evaluation of fun.
+            indices(np.ndarray): Column indices of the CSR sparsity pattern.
+            indptr(np.ndarray): Row pointers of the CSR sparsity pattern.
+            color_entries(np.ndarray): Indices of the CSR entries grouped by the color of their column.
+            color_pointers(np.ndarray): Start of the entries of each color in color_entries (n_colors + 1 values).
+
+        Returns:
+            np.ndarray: The CSR data of the Jacobian matrix.
+        """
+        n = x.shape[0]
+        data = np.zeros(indices.shape[0])
+        rows = np.empty(indices.shape[0], dtype=np.int64)
+        for row in range(n):
+            for k in range(indptr[row], indptr[row + 1]):
+                rows[k] = row
+        steps = np.empty(n)
+        x_perturbed = x.copy()
+        for color in range(color_pointers.shape[0] - 1):
+            for entry in range(color_pointers[color], color_pointers[color + 1]):
+                column = indices[color_entries[entry]]
+                h = np.sqrt(np.finfo(np.float64).eps) * max(1.0, np.abs(x[column]))
+                x_perturbed[column] = x[column] + h
+                steps[column] = x_perturbed[column] - x[column]
+            df = fun(t, x_perturbed, global_extras) - f0
+            for entry in range(color_pointers[color], color_pointers[color + 1]):
+                k = color_entries[entry]
+                column = indices[k]
+                data[k] = df[rows[k]] / steps[column]
+                x_perturbed[column] = x[column]
+        return data
+
+    return colored_finite_difference_jacobian
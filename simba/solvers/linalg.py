@@ -0,0 +1,113 @@
+import numba as nb
+import numpy as np
+
+
+@nb.njit
+def lu_factor(a):
+    """Computes the LU factorization of a square matrix with partial pivoting.
+
+    Args:
+        a(np.ndarray): The square matrix to factorize. It is not modified.
+
+    Returns:
+        Tuple(np.ndarray, np.ndarray, bool): The combined factors (L below the diagonal with an implicit unit diagonal,
+        U on and above the diagonal), the row pivot indices and a flag that is False for singular matrices.
+    """
+    n = a.shape[0]
+    lu = a.copy()
+    piv = np.arange(n)
+    regular = True
+    for k in range(n):
+        pivot_row = k
+        pivot_value = np.abs(lu[k, k])
+        for i in range(k + 1, n):
+            if np.abs(lu[i, k]) > pivot_value:
+                pivot_row = i
+                pivot_value = np.abs(lu[i, k])
+        if pivot_value == 0.0:
+            regular = False
+            continue
+        if pivot_row != k:
+            for j in range(n):
+                tmp = lu[k, j]
+                lu[k, j] = lu[pivot_row, j]
+                lu[pivot_row, j] = tmp
+            tmp_piv = piv[k]
+            piv[k] = piv[pivot_row]
+            piv[pivot_row] = tmp_piv
+        for i in range(k + 1, n):
+            lu[i, k] /= lu[k, k]
+            factor = lu[i, k]
+            if factor != 0.0:
+                for j in range(k + 1, n):
+                    lu[i, j] -= factor * lu[k, j]
+    return lu, piv, regular
+
+
+@nb.njit
+def lu_solve(lu, piv, b):
+    """Solves the linear system a x = b with the factorization of a from lu_factor.
+
+    Args:
+        lu(np.ndarray): The combined LU factors.
+        piv(np.ndarray): The row pivot indices.
+        b(np.ndarray): The right hand side.
+
+    Returns:
+        np.ndarray: The solution x.
+    """
+    n = lu.shape[0]
+    x = np.empty(n)
+    for i in range(n):
+        x[i] = b[piv[i]]
+    for i in range(n):
+        for j in range(i):
+            x[i] -= lu[i, j] * x[j]
+    for i in range(n - 1, -1, -1):
+        for j in range(i + 1, n):
+            x[i] -= lu[i, j] * x[j]
+        x[i] /= lu[i, i]
+    return x
+
+
+@nb.njit
+def solve_inplace(a, b):
+    """Solves the linear system a x = b by Gaussian elimination with partial pivoting without allocations.
+
+    Args:
+        a(np.ndarray): The square matrix of size n as flat array of length n * n in row-major order, e.g. a view into
+            a preallocated buffer. It is overwritten with its eliminated form.
+        b(np.ndarray): The right hand side of length n. It is overwritten with the solution x.
+
+    Returns:
+        bool: False for singular matrices. Then, a and b hold intermediate values.
+    """
+    n = b.shape[0]
+    for k in range(n):
+        pivot_row = k
+        pivot_value = np.abs(a[k * n + k])
+        for i in range(k + 1, n):
+            if np.abs(a[i * n + k]) > pivot_value:
+                pivot_row = i
+                pivot_value = np.abs(a[i * n + k])
+        if pivot_value == 0.0:
+            return False
+        if pivot_row != k:
+            for j in range(k, n):
+                tmp = a[k * n + j]
+                a[k * n + j] = a[pivot_row * n + j]
+                a[pivot_row * n + j] = tmp
+            tmp = b[k]
+            b[k] = b[pivot_row]
+            b[pivot_row] = tmp
+        for i in range(k + 1, n):
+            factor = a[i * n + k] / a[k * n + k]
+            if factor != 0.0:
+                for j in range(k + 1, n):
+                    a[i * n + j] -= factor * a[k * n + j]
+                b[i] -= factor * b[k]
+    for i in range(n - 1, -1, -1):
+        for j in range(i + 1, n):
+            b[i] -= a[i * n + j] * b[j]
+        b[i] /= a[i * n + i]
+    return True
@@ -0,0 +1,120 @@
+import numba as nb
+import numpy as np
+
+from .linalg import lu_factor, lu_solve
+
+# Status codes of the operating point search
+SUCCESS = 0
+NOT_CONVERGED = -1
+STALLED = -2
+
+_initial_damping = 1e-3
+_max_damping = 1e16
+
+
+@nb.njit
+def _squared_norm(f):
+    return np.sum(f * f)
+
+
+@nb.njit
+def _normal_equations(jacobian, f):
+    # J^T J and J^T f
+    n = jacobian.shape[0]
+    normal = np.zeros((n, n))
+    gradient = np.zeros(n)
+    for k in range(n):
+        for i in range(n):
+            gradient[i] += jacobian[k, i] * f[k]
+            for j in range(n):
+                normal[i, j] += jacobian[k, i] * jacobian[k, j]
+    return normal, gradient
+
+
+def create_levenberg_marquardt(fun, jac):
+    """Creates the function that finds a state x with fun(t, x) = 0 with a damped Newton iteration, that falls back to
+    Levenberg-Marquardt steps.
+
+    Each iteration evaluates the Jacobian J at the current state. If J is regular and the Newton step
+    dx = -J^-1 f is within the tolerances, the iteration has converged. Otherwise, the state is updated with the
+    Levenberg-Marquardt step (J^T J + lambda D) dx = -J^T f, whose damping lambda is increased until the step reduces
+    the norm of the residual and decreased after each accepted step. D is the diagonal of J^T J (Marquardt scaling).
+    For a small damping, the step approaches the Newton step. For a large damping, it approaches a short step along
+    the steepest descent of the residual norm, so that the iteration also converges from poor initial guesses.
+    fun and jac are bound in the closure of the returned function, so that the search can be cached.
+
+    Args:
+        fun(CPUDispatcher): In-place right hand side of the ODE with the signature
+            fun(t, x, dxdt, workspace, global_extras) that writes the derivatives into dxdt.
+        jac(CPUDispatcher): Jacobian of the right hand side with the signature jac(t, x, global_extras) -> J.
+
+    Returns:
+        CPUDispatcher: The search levenberg_marquardt(t, x0, workspace, global_extras, rtol=1e-10, atol=1e-12,
+        max_iterations=100).
+    """
+
+    @nb.njit(nogil=True)
+    def levenberg_marquardt(t, x0, workspace, global_extras, rtol=1e-10, atol=1e-12, max_iterations=100):
+        """Searches the operating point from the initial guess x0.
+
+        Args:
+            t(float): Time of the operating point.
+            x0(np.ndarray): Initial guess of the state.
+            workspace(tuple): Workspace passed to every evaluation of fun.
+            global_extras(tuple): Extra data of the system passed to every evaluation of fun.
+            rtol(float): Relative tolerance of the state.
+            atol(float): Absolute tolerance of the state.
+            max_iterations(int): Maximal number of iterations.
+
+        Returns:
+            Tuple(np.ndarray, int, int): The state, the status of the search (SUCCESS=0, NOT_CONVERGED=-1,
+            STALLED=-2) and the number of iterations. STALLED means that no step reduced the residual any further,
+            e.g. at a local minimum of the residual norm or at a singular Jacobian.
+        """
+        state_length = x0.shape[0]
+        x = x0.astype(np.float64)
+        x_trial = np.empty(state_length)
+        f = np.empty(state_length)
+        f_trial = np.empty(state_length)
+        fun(t, x, f, workspace, global_extras)
+        cost = _squared_norm(f)
+        damping = _initial_damping
+        for iteration in range(max_iterations):
+            if cost == 0.0:
+                return x, SUCCESS, iteration
+            jacobian = jac(t, x, global_extras)
+            lu, piv, regular = lu_factor(jacobian)
+            if regular:
+                dx = lu_solve(lu, piv, -f)
+                converged = True
+                for i in range(state_length):
+                    converged = converged and np.abs(dx[i]) <= atol + rtol * np.abs(x[i])
+                if converged:
+                    x += dx
+                    return x, SUCCESS, iteration + 1
+            normal, gradient = _normal_equations(jacobian, f)
+            scaling = np.diag(normal).copy()
+            # Columns without influence on the residual get a small positive scaling, that keeps the matrix regular
+            scaling = np.maximum(scaling, np.finfo(np.float64).eps * max(1.0, np.max(scaling)))
+            while True:
+                matrix = normal.copy()
+                for i in range(state_length):
+                    matrix[i, i] += damping * scaling[i]
+                lu, piv, regular = lu_factor(matrix)
+                if regular:
+                    dx = lu_solve(lu, piv, -gradient)
+                    x_trial[:] = x + dx
+                    fun(t, x_trial, f_trial, workspace, global_extras)
+                    cost_trial = _squared_norm(f_trial)
+                    if cost_trial < cost:
+                        x[:] = x_trial
+                        f[:] = f_trial
+                        cost = cost_trial
+                        damping = max(damping / 3.0, 1e-12)
+                        break
+                damping *= 4.0
+                if damping > _max_damping:
+                    return x, STALLED, iteration + 1
+        return x, NOT_CONVERGED, max_iterations
+
+    return levenberg_marquardt
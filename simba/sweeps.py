@@ -0,0 +1,187 @@
+import itertools
+import multiprocessing
+import pickle
+import tempfile
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import simba as sb
+from simba.config import get_cache_dir, set_cache_dir
+
+
+class SystemSpec:
+    """A picklable declaration of a system, that is built into a System by build.
+
+    The spec stores the type and the constructor arguments of each component and the connections by names instead of
+    the components themselves. So, it can be sent to worker processes, that build and compile their own system. The
+    component types, the constructor arguments and the functions passed to components (e.g. of a TFunction) have to be
+    picklable, i.e. be defined at the top level of a module.
+    """
+
+    @property
+    def component_names(self):
+        return tuple(name for name, _, _, _ in self._components)
+
+    def __init__(self):
+        self._components = []
+        self._connections = []
+        self._system_outputs = []
+
+    def add(self, name, component_type, *args, **kwargs):
+        """Declares a component. The name is passed to the constructor of the component.
+
+        Args:
+            name(str): Unique name of the component.
+            component_type(type): The class of the component.
+            args: Positional arguments of the constructor.
+            kwargs: Keyword arguments of the constructor.
+
+        Returns:
+            str: The name of the component.
+        """
+        assert name not in self.component_names, f'Duplicate component name {name}.'
+        self._components.append((name, component_type, args, kwargs))
+        return name
+
+    def connect(self, input_name, output_name):
+        """Declares a connection from an output to an input.
+
+        Args:
+            input_name(str): The input in the form 'component.input', e.g. 'sub.In2'.
+            output_name(str): The output in the form 'component.output', e.g. 'load.omega'.
+        """
+        self._connections.append((input_name, output_name))
+
+    def add_system_output(self, output_name):
+        """Declares an output of a component as system output in the form 'component.output'."""
+        self._system_outputs.append(output_name)
+
+    def build(self):
+        """Creates the components, connects them and returns the uncompiled system."""
+        components = dict()
+        for name, component_type, args, kwargs in self._components:
+            components[name] = component_type(*args, name=name, **kwargs)
+
+        def split(signal_name):
+            component_name, _, signal = signal_name.rpartition('.')
+            assert component_name in components, f'No component {component_name} in the spec.'
+            return components[component_name], signal
+
+        for input_name, output_name in self._connections:
+            input_component, input_ = split(input_name)
+            output_component, output = split(output_name)
+            assert input_ in input_component.inputs, f'No input {input_name}.'
+            assert output in output_component.outputs, f'No output {output_name}.'
+            input_component.inputs[input_].connect(output_component.outputs[output])
+        system_outputs = tuple(
+            component.outputs[output] for component, output in map(split, self._system_outputs)
+        )
+        return sb.core.System(tuple(components.values()), system_outputs=system_outputs)
+
+
+def parameter_points(param_grid):
+    """The cartesian product of a parameter grid.
+
+    Args:
+        param_grid(Mapping(str, Sequence(float))): The values of each runtime parameter by its name.
+
+    Returns:
+        List(dict): The value of each parameter by its name for each point of the grid.
+    """
+    names = tuple(param_grid.keys())
+    values = (np.asarray(param_grid[name], dtype=float).tolist() for name in names)
+    return [dict(zip(names, point)) for point in itertools.product(*values)]
+
+
+# The system and the shared results of a worker process
+_worker = dict()
+
+
+def _initialize_worker(spec, cache_dir, numba_compile, memory_name, shape):
+    set_cache_dir(cache_dir)
+    system = spec.build()
+    system.compile(numba_compile=numba_compile)
+    _worker['system'] = system
+    _worker['memory'] = shared_memory.SharedMemory(name=memory_name)
+    _worker['states'] = np.ndarray(shape, dtype=np.float64, buffer=_worker['memory'].buf)
+
+
+def _run_point(task):
+    index, parameters, t_span, x0, dt, method = task
+    # Each point starts from the initial extras of the system, e.g. with empty memories of the controllers
+    context = _worker['system'].new_context()
+    for name, value in parameters.items():
+        context.set_parameter(name, value)
+    _, states = context.simulate(t_span, x0, dt, method=method)
+    _worker['states'][index] = states
+    return index
+
+
+def sweep(spec, param_grid, n_workers, t_span, x0, dt, method='rk4', cache_dir=None, numba_compile=True):
+    """Simulates a system for all points of a parameter grid in a pool of worker processes.
+
+    The parent process builds and compiles the system once to fill the on-disk compilation cache. Each worker builds
+    the system from the spec and loads the compiled code from the cache instead of compiling it again. The workers
+    write the states into an array in shared memory, so that the trajectories are not pickled back to the parent.
+
+    Args:
+        spec(SystemSpec): The declaration of the system.
+        param_grid(Mapping(str, Sequence(float))): The values of the runtime parameters 'component.parameter'. All
+            combinations of the values are simulated (see parameter_points).
+        n_workers(int): Number of worker processes.
+        t_span(Tuple(float, float)): Start and end time of the simulations.
+        x0(np.ndarray): Initial state of all simulations.
+        dt(float): Step size of fixed step methods. Spacing of the output grid of 'dopri5'.
+        method(str): Integration method (see System.simulate).
+        cache_dir(str): Directory of the shared compilation cache. The cache directory of simba.config or a
+            temporary directory, that is removed after the sweep, if not passed.
+        numba_compile(bool): Flag, if the system is compiled with numba.
+
+    Returns:
+        Tuple(List(dict), np.ndarray, np.ndarray): The parameters of each point, the time grid of shape (n_steps,) and
+        the states of shape (n_points, n_steps, state_length).
+    """
+    assert n_workers > 0, 'At least one worker is required.'
+    try:
+        pickle.dumps(spec)
+    except (pickle.PicklingError, AttributeError, TypeError) as error:
+        raise ValueError(f'The system spec is not picklable: {error}') from error
+    if cache_dir is None and get_cache_dir() is None:
+        # The temporary cache is only shared by the processes of this sweep
+        with tempfile.TemporaryDirectory(prefix='simba_sweep_cache_') as temporary_cache_dir:
+            return sweep(
+                spec, param_grid, n_workers, t_span, x0, dt, method, temporary_cache_dir, numba_compile
+            )
+    if cache_dir is None:
+        cache_dir = get_cache_dir()
+    points = parameter_points(param_grid)
+    x0 = np.asarray(x0, dtype=float)
+    # Compile the system and the simulation kernel once into the cache, that all workers start from
+    previous_cache_dir = get_cache_dir()
+    set_cache_dir(cache_dir)
+    try:
+        system = spec.build()
+        system.compile(numba_compile=numba_compile)
+        t0 = float(t_span[0])
+        system.new_context().simulate((t0, t0 + dt), x0, dt, method=method)
+    finally:
+        set_cache_dir(previous_cache_dir)
+    n_steps = int(round((float(t_span[1]) - t0) / dt)) + 1
+    shape = (len(points), n_steps, system.state_length)
+    memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    try:
+        # Spawned workers start from a clean interpreter, that does not inherit the threads of numba
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(
+            n_workers, initializer=_initialize_worker,
+            initargs=(spec, cache_dir, numba_compile, memory.name, shape)
+        ) as pool:
+            tasks = [(index, point, t_span, x0, dt, method) for index, point in enumerate(points)]
+            for _ in pool.imap_unordered(_run_point, tasks):
+                pass
+        states = np.ndarray(shape, dtype=np.float64, buffer=memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
+    return points, t0 + np.arange(n_steps) * dt, states
@@ -1,56 +1,406 @@
-from typing import Iterable, List, TYPE_CHECKING
+import dis
+import weakref
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Union, TYPE_CHECKING
 import simba as sb
 from collections import deque
 
 if TYPE_CHECKING:
-    from simba.core import Output
+    from simba.core import Input, Output, State
 
 
 class Event:
-    
+
     def __init__(self):
         self._callee_list = set()
 
     def __iadd__(self, fct):
-        return self._callee_list.add(fct)
+        self._callee_list.add(fct)
+        return self
 
     def __isub__(self, fct):
-        return self._callee_list.remove(fct)
+        self._callee_list.remove(fct)
+        return self
+
+    def subscribe(self, fct, weak=False):
+        """Adds a callee. A weak subscription of a bound method does not keep its object alive and ends with it."""
+        self._callee_list.add(weakref.WeakMethod(fct) if weak else fct)
+
+    def unsubscribe(self, fct):
+        """Removes a callee, that was subscribed strongly or weakly."""
+        if fct in self._callee_list:
+            self._callee_list.remove(fct)
+        else:
+            self._callee_list.remove(weakref.WeakMethod(fct))
 
     def __call__(self, sender, *event_args):
-        for callee in self._callee_list:
+        for callee in tuple(self._callee_list):
+            if isinstance(callee, weakref.WeakMethod):
+                method = callee()
+                if method is None:
+                    # The object of the callee has been collected
+                    self._callee_list.discard(callee)
+                    continue
+                callee = method
             callee(sender, *event_args)
 
 
-def sort_outputs_old(outputs: Iterable['Output']) -> List['Output']:
-    input_degrees = dict()
-    ordering = []
-    next_outputs = deque()
+def _dependent_outputs(outputs: Iterable['Output']) -> Dict['Input', List['Output']]:
+    """Indexes the outputs by the component inputs they depend on."""
+    dependents = dict()
+    for output in outputs:
+        for input_ in output.component_inputs:
+            dependents.setdefault(input_, []).append(output)
+    return dependents
+
+
+def _successor_index(outputs: List['Output']) -> Dict['Output', List['Output']]:
+    """Indexes the outputs, that directly depend on each output. The successors keep the order of the outputs."""
+    successors = {output: [] for output in outputs}
+    for output in outputs:
+        for input_ in output.component_inputs:
+            if input_.connected and input_.external_output in successors:
+                successors[input_.external_output].append(output)
+    return successors
+
+
+def find_algebraic_loops(outputs: Iterable['Output']) -> List[List['Output']]:
+    """Finds the algebraic loops, in which outputs depend directly on each other without a state in between.
+
+    The loops are the strongly connected components of the output graph (Tarjan's algorithm) with more than one
+    output or an output that depends on itself.
+
+    Args:
+        outputs(Iterable[Output]): The outputs to search.
+
+    Returns:
+        List[List[Output]]: The outputs of each loop in their given order.
+    """
+    outputs = list(outputs)
+    positions = {output: position for position, output in enumerate(outputs)}
+    successors = _successor_index(outputs)
+    indices = dict()
+    low_links = dict()
+    on_stack = set()
+    stack = []
+    loops = []
+    index = 0
+    for root in outputs:
+        if root in indices:
+            continue
+        # Iterative depth first search. Each entry holds an output and the iterator over its successors.
+        indices[root] = low_links[root] = index
+        index += 1
+        stack.append(root)
+        on_stack.add(root)
+        search = [(root, iter(successors[root]))]
+        while len(search) > 0:
+            output, successor_iterator = search[-1]
+            successor = next(successor_iterator, None)
+            if successor is None:
+                search.pop()
+                if len(search) > 0:
+                    parent = search[-1][0]
+                    low_links[parent] = min(low_links[parent], low_links[output])
+                if low_links[output] == indices[output]:
+                    component = []
+                    member = None
+                    while member is not output:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+                    if len(component) > 1 or output in successors[output]:
+                        loops.append(sorted(component, key=positions.get))
+            elif successor not in indices:
+                indices[successor] = low_links[successor] = index
+                index += 1
+                stack.append(successor)
+                on_stack.add(successor)
+                search.append((successor, iter(successors[successor])))
+            elif successor in on_stack:
+                low_links[output] = min(low_links[output], indices[successor])
+    return sorted(loops, key=lambda loop: positions[loop[0]])
+
+
+def sort_outputs(outputs: Iterable['Output']) -> List['Output']:
+    """Sorts the outputs topologically, such that each output follows all outputs it depends on.
+
+    The sort (Kahn's algorithm) takes linear time in the number of outputs and connections. Independent outputs keep
+    their order, so that the result does not change between runs. The outputs of an algebraic loop
+    (see find_algebraic_loops) are placed next to each other after all outputs the loop depends on.
+
+    Args:
+        outputs(Iterable[Output]): The outputs to sort.
+
+    Returns:
+        List[Output]: The outputs in topological order.
+    """
+    outputs = list(outputs)
+    # Each algebraic loop is sorted as a single node represented by its first output
+    representatives = {output: output for output in outputs}
+    groups = {output: [output] for output in outputs}
+    for loop in find_algebraic_loops(outputs):
+        for member in loop:
+            representatives[member] = loop[0]
+            del groups[member]
+        groups[loop[0]] = loop
+    nodes = [output for output in outputs if representatives[output] is output]
+    successors = {node: [] for node in nodes}
+    input_degrees = {node: 0 for node in nodes}
     for output in outputs:
-        degree = len([comp_input for comp_input in output.component_inputs if comp_input.connected])
-        input_degrees[output] = degree
-        if input_degrees[output] == 0:
-            next_outputs.append(output)
-    while len(next_outputs) > 0:
-        output = next_outputs.popleft()
-        ordering.append(output)
-        for successor in output.external_inputs:
+        node = representatives[output]
+        for input_ in output.component_inputs:
+            if input_.connected:
+                source = representatives.get(input_.external_output, input_.external_output)
+                if source is node:
+                    continue
+                input_degrees[node] += 1
+                successors.setdefault(source, []).append(node)
+    next_nodes = deque(node for node in nodes if input_degrees[node] == 0)
+    ordering = []
+    while len(next_nodes) > 0:
+        node = next_nodes.popleft()
+        ordering.extend(groups[node])
+        for successor in successors[node]:
             input_degrees[successor] -= 1
             if input_degrees[successor] == 0:
-                next_outputs.append(successor)
+                next_nodes.append(successor)
+    assert len(ordering) == len(outputs), 'The outputs depend on outputs, that are not sorted.'
     return ordering
 
 
-def sort_outputs(outputs: Iterable['Output']) -> List['Output']:
-    remaining_outputs = list(outputs)
-    ordering = []
+class OutputOrdering:
+    """A topological order of outputs, that is updated incrementally when the connections change.
 
-    while len(remaining_outputs) > 0:
-        initial_length = len(remaining_outputs)
-        for output in remaining_outputs:
-            predecessors = [inp.external_output for inp in output.component_inputs if inp.connected]
-            if all([predecessor in ordering for predecessor in predecessors]):
-                remaining_outputs.remove(output)
-                ordering.append(output)
-        assert len(remaining_outputs) < initial_length, 'Circular dependency in the calculation.'
-    return ordering
+    The initial order is computed with sort_outputs. A new connection only reorders the outputs between the positions
+    of its two ends, that are reachable from them (Pearce and Kelly, A dynamic topological sort algorithm for directed
+    acyclic graphs, 2006). Removed connections do not invalidate the order. As long as the outputs contain algebraic
+    loops, or a new connection closes one, the order is sorted anew on each change.
+    """
+
+    @property
+    def algebraic_loops(self) -> List[List['Output']]:
+        """The algebraic loops of the outputs (see find_algebraic_loops)."""
+        return self._algebraic_loops
+
+    def __init__(self, outputs: Iterable['Output']):
+        outputs = list(outputs)
+        self._order = []
+        self._positions = dict()
+        self._algebraic_loops = []
+        self._dependents = _dependent_outputs(outputs)
+        self._sort(outputs)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def position(self, output: 'Output') -> int:
+        return self._positions[output]
+
+    def connection_changed(self, input_: 'Input', output: 'Output' or None):
+        """Event handler of Input.connection_changed, that restores the order after a new connection."""
+        if len(self._algebraic_loops) > 0:
+            self._sort(self._order)
+            return
+        if output is None or output not in self._positions:
+            return
+        for dependent in self._dependents.get(input_, ()):
+            self.add_dependency(output, dependent)
+
+    def _sort(self, outputs: Iterable['Output']):
+        outputs = list(outputs)
+        self._algebraic_loops = find_algebraic_loops(outputs)
+        self._order = sort_outputs(outputs)
+        self._positions = {output: position for position, output in enumerate(self._order)}
+
+    def add_dependency(self, source: 'Output', target: 'Output'):
+        """Restores the topological order after target got a new dependency on source."""
+        lower_bound = self._positions[target]
+        upper_bound = self._positions[source]
+        if upper_bound < lower_bound:
+            return
+        forward = self._reachable(target, self._successors, lambda position: position <= upper_bound)
+        if source in forward:
+            # The new connection closes an algebraic loop
+            self._sort(self._order)
+            return
+        backward = self._reachable(source, self._predecessors, lambda position: position >= lower_bound)
+        # The affected outputs take over their former positions. All predecessors of source precede all successors
+        # of target.
+        affected = sorted(backward, key=self._positions.get) + sorted(forward, key=self._positions.get)
+        positions = sorted(self._positions[output] for output in affected)
+        for position, output in zip(positions, affected):
+            self._order[position] = output
+            self._positions[output] = position
+
+    def _successors(self, output: 'Output') -> Iterable['Output']:
+        for input_ in output.external_inputs:
+            for successor in self._dependents.get(input_, ()):
+                yield successor
+
+    def _predecessors(self, output: 'Output') -> Iterable['Output']:
+        for input_ in output.component_inputs:
+            if input_.connected and input_.external_output in self._positions:
+                yield input_.external_output
+
+    def _reachable(self, start: 'Output', neighbours, in_region) -> List['Output']:
+        reachable = {start}
+        stack = [start]
+        while len(stack) > 0:
+            output = stack.pop()
+            for neighbour in neighbours(output):
+                if neighbour not in reachable and in_region(self._positions[neighbour]):
+                    reachable.add(neighbour)
+                    stack.append(neighbour)
+        return list(reachable)
+
+
+# The kinds of dependencies of an output in increasing order
+dependency_kinds = ('constant', 'time', 'state')
+
+
+def uses_time(equation: Callable) -> bool:
+    """Checks conservatively, if an output equation reads its first argument, the time.
+
+    Args:
+        equation(Callable): The output equation, either a python function or a numba dispatcher.
+
+    Returns:
+        bool: False only if the time is certainly not read by the equation itself.
+    """
+    code = getattr(getattr(equation, 'py_func', equation), '__code__', None)
+    if code is None or code.co_argcount == 0:
+        return True
+    name = code.co_varnames[0]
+    if name in code.co_cellvars:
+        return True
+    for instruction in dis.get_instructions(code):
+        if instruction.opname.startswith('LOAD_') and instruction.opname != 'LOAD_CONST':
+            argval = instruction.argval
+            if argval == name or (isinstance(argval, tuple) and name in argval):
+                return True
+    return False
+
+
+def find_output_dependencies(
+        outputs: Iterable['Output'], algebraic_loops: Iterable[List['Output']] = ()
+) -> Dict['Output', str]:
+    """Finds the kind of dependency of each output (see dependency_kinds).
+
+    An output of a component with a state or with extras depends on the state, because the extras may change
+    between calls. Otherwise, it depends on the time, if its equation reads the time or any of its sources depends on
+    the time or the state. All other outputs are constant. All outputs of an algebraic loop share the highest kind of
+    dependency of the loop.
+
+    Args:
+        outputs(Iterable[Output]): The outputs in topological order (see sort_outputs).
+        algebraic_loops(Iterable[List[Output]]): The algebraic loops of the outputs.
+
+    Returns:
+        Dict[Output, str]: The kind of dependency of each output.
+    """
+    loops = {output: loop for loop in algebraic_loops for output in loop}
+    levels = dict()
+
+    def level(output):
+        component = output.component
+        if component.state is not None or component.extra_index is not None:
+            return 2
+        level_ = 1 if uses_time(output.output_equation) else 0
+        for input_ in output.component_inputs:
+            if input_.connected:
+                level_ = max(level_, levels.get(input_.external_output, 0))
+        return level_
+
+    for output in outputs:
+        if output in levels:
+            continue
+        if output in loops:
+            loop_level = max(level(member) for member in loops[output])
+            for member in loops[output]:
+                levels[member] = loop_level
+        else:
+            levels[output] = level(output)
+    return {output: dependency_kinds[level_] for output, level_ in levels.items()}
+
+
+def find_partitions(
+        outputs: Iterable['Output'], states: Iterable['State'], algebraic_loops: Iterable[List['Output']] = ()
+) -> Dict[Union['Output', 'State'], int]:
+    """Splits the outputs and the states into weakly connected partitions.
+
+    An output or a state belongs to the partition of every passed output, that one of its inputs is connected to, and
+    to the partition of the other outputs and the state of its component. So, the outputs and the states of different
+    partitions neither read each other nor share the extras of a component and each partition can be computed
+    independently of the others. All outputs of an algebraic loop share one partition.
+
+    Args:
+        outputs(Iterable[Output]): The outputs in topological order (see sort_outputs).
+        states(Iterable[State]): The states, whose inputs may read the outputs.
+        algebraic_loops(Iterable[List[Output]]): The algebraic loops of the outputs.
+
+    Returns:
+        Dict[Union[Output, State], int]: The partition of each output and each state. The partitions are numbered in
+        the order of their first output, followed by the partitions of states, that read none of the outputs.
+    """
+    outputs = list(outputs)
+    states = list(states)
+    parents = {holder: holder for holder in outputs + states}
+
+    def root(holder):
+        while parents[holder] is not holder:
+            parents[holder] = parents[parents[holder]]
+            holder = parents[holder]
+        return holder
+
+    def join(first, second):
+        parents[root(first)] = root(second)
+
+    for loop in algebraic_loops:
+        for output in loop[1:]:
+            if output in parents and loop[0] in parents:
+                join(output, loop[0])
+    components = dict()
+    for holder in outputs + states:
+        join(holder, components.setdefault(holder.component, holder))
+        for input_ in holder.component_inputs:
+            if input_.connected and input_.external_output in parents:
+                join(holder, input_.external_output)
+    partitions = dict()
+    roots = dict()
+    for holder in outputs + states:
+        partitions[holder] = roots.setdefault(root(holder), len(roots))
+    return partitions
+
+
+def color_columns(indices: np.ndarray, indptr: np.ndarray, n_columns: int) -> np.ndarray:
+    """Greedily colors the columns of a CSR sparsity pattern, such that columns of equal color share no row.
+
+    Args:
+        indices(np.ndarray): Column indices of the CSR sparsity pattern.
+        indptr(np.ndarray): Row pointers of the CSR sparsity pattern.
+        n_columns(int): Number of columns of the matrix.
+
+    Returns:
+        np.ndarray: The color of each column. Colors are numbered consecutively starting at zero.
+    """
+    column_rows = [[] for _ in range(n_columns)]
+    for row in range(len(indptr) - 1):
+        for column in indices[indptr[row]:indptr[row + 1]]:
+            column_rows[column].append(row)
+    colors = np.full(n_columns, -1, dtype=np.int64)
+    row_colors = [set() for _ in range(len(indptr) - 1)]
+    for column in range(n_columns):
+        forbidden = set()
+        for row in column_rows[column]:
+            forbidden.update(row_colors[row])
+        color = 0
+        while color in forbidden:
+            color += 1
+        colors[column] = color
+        for row in column_rows[column]:
+            row_colors[row].add(color)
+    return colors